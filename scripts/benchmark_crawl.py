@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端爬取基准
+在本地仿X服务器上用无头Chrome运行 TwitterSearchService.search_user_and_get_tweets，
+统计 tweets/sec、每条推文的WebDriver命令数、每个用户的耗时以及浏览器JS堆峰值
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.twitter_search_service import TwitterSearchService
+from utils.browser_utils import setup_driver
+from utils.command_accounting import CommandAccounting
+from utils.fake_x_server import FakeXConfig, start_fake_x_server
+from utils.crawl_metrics import metrics, start_metrics_server
+from utils.tracing import tracer
+from utils.webdriver_cassette import CassetteRecorder
+
+
+def sample_js_heap(driver):
+    """通过CDP读取当前页面JS堆占用（字节）"""
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+        return int(next(m['value'] for m in metrics if m['name'] == 'JSHeapUsedSize'))
+    except Exception:
+        return 0
+
+
+def run_benchmark(users, max_tweets, config, cassette_path=None):
+    """
+    运行基准
+
+    Args:
+        cassette_path (str): 同时录制WebDriver命令到该cassette文件
+
+    Returns:
+        dict: 汇总结果与每个用户的明细
+    """
+    server = start_fake_x_server(config)
+    driver = setup_driver()
+    if not driver:
+        server.shutdown()
+        raise RuntimeError("无法启动无头Chrome")
+
+    service = TwitterSearchService(base_url=server.base_url)
+    service.attach_driver(driver)
+    metrics.command_accounting = service.command_accounting
+    recorder = CassetteRecorder.install(driver) if cassette_path else None
+
+    per_user = []
+    peak_heap = 0
+    run_started = time.perf_counter()
+    try:
+        for username in users:
+            started = time.perf_counter()
+            metrics.user_started(username)
+            if recorder:
+                recorder.begin_user(username, max_tweets)
+            result = service.search_user_and_get_tweets(username, max_tweets=max_tweets)
+            if recorder:
+                recorder.end_user(result)
+            elapsed = time.perf_counter() - started
+            tweets = result.get('tweets_count', 0) if isinstance(result, dict) else 0
+            metrics.user_finished('done' if tweets else 'failed')
+            commands = CommandAccounting.totals(service.last_command_stats)[0]
+            heap = sample_js_heap(driver)
+            peak_heap = max(peak_heap, heap)
+            per_user.append({
+                'username': username,
+                'tweets': tweets,
+                'seconds': round(elapsed, 3),
+                'commands': commands,
+                'commands_per_tweet': round(commands / tweets, 2) if tweets else None,
+                'js_heap_bytes': heap,
+                'stop_reason': result.get('stop_reason') if isinstance(result, dict) else None,
+            })
+    finally:
+        run_seconds = time.perf_counter() - run_started
+        command_stats = service.command_accounting.snapshot()
+        if recorder:
+            recorder.meta['base_url'] = server.base_url
+            recorder.save(cassette_path)
+        service.close_connection()
+        server.shutdown()
+
+    total_tweets = sum(u['tweets'] for u in per_user)
+    total_commands = sum(u['commands'] for u in per_user)
+    return {
+        'users': len(per_user),
+        'tweets': total_tweets,
+        'wall_seconds': round(run_seconds, 3),
+        'tweets_per_second': round(total_tweets / run_seconds, 3) if run_seconds else 0,
+        'commands_per_tweet': round(total_commands / total_tweets, 2) if total_tweets else None,
+        'seconds_per_user': round(run_seconds / len(per_user), 3) if per_user else None,
+        'peak_js_heap_bytes': peak_heap,
+        'server_requests': server.request_count,
+        'command_stats': command_stats,
+        'per_user': per_user,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端爬取基准（本地仿X服务器 + 无头Chrome）')
+    parser.add_argument('--users', type=int, default=3, help='合成用户数')
+    parser.add_argument('--max-tweets', type=int, default=50)
+    parser.add_argument('--timeline-length', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--virtual-window', type=int, default=30)
+    parser.add_argument('--latency-ms', type=int, default=50)
+    parser.add_argument('--rate-limit-every', type=int, default=0,
+                        help='每第N次时间线请求返回429，验证错误页检测与退避重试')
+    parser.add_argument('--json', help='将结果写入JSON文件')
+    parser.add_argument('--trace', help='导出阶段追踪（trace-event JSON）')
+    parser.add_argument('--metrics-port', type=int, help='运行期间暴露Prometheus格式指标的端口')
+    parser.add_argument('--record-cassette', help='录制WebDriver命令，供 scripts/benchmark_replay.py 回放')
+    args = parser.parse_args()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    if args.trace:
+        tracer.enable()
+
+    config = FakeXConfig(
+        timeline_length=args.timeline_length, page_size=args.page_size,
+        virtual_window=args.virtual_window, latency_ms=args.latency_ms,
+        rate_limit_every=args.rate_limit_every,
+    )
+    users = [f"bench_user{i}" for i in range(1, args.users + 1)]
+    report = run_benchmark(users, args.max_tweets, config, args.record_cassette)
+
+    print("\n📊 基准结果")
+    print("=" * 60)
+    print(f"{'username':<16} {'tweets':>6} {'seconds':>9} {'commands':>9} {'cmd/tweet':>10} {'heap_MB':>8}")
+    for u in report['per_user']:
+        print(f"{u['username']:<16} {u['tweets']:>6} {u['seconds']:>9.2f} {u['commands']:>9} "
+              f"{u['commands_per_tweet'] or 0:>10.2f} {u['js_heap_bytes'] / 1e6:>8.1f}")
+    print("-" * 60)
+    print(f"tweets/sec: {report['tweets_per_second']}")
+    print(f"WebDriver commands/tweet: {report['commands_per_tweet']}")
+    print(f"wall time/user: {report['seconds_per_user']}s")
+    print(f"peak JS heap: {report['peak_js_heap_bytes'] / 1e6:.1f} MB")
+    print()
+    print(CommandAccounting.format_summary(report['command_stats'], tweets=report['tweets']))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📁 结果已保存: {args.json}")
+    if args.trace:
+        print(f"🧭 阶段追踪已导出: {args.trace} ({tracer.export(args.trace)} 个区间)")
+
+
+if __name__ == "__main__":
+    main()
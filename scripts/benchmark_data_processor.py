@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DataProcessor 解析函数的微基准与回归检查
+语料取自 results/ 下结果文件中的 full_text 字段（每篇推文的完整文本），对以下函数逐条运行：
+  - extract_tweet_date
+  - extract_interactions
+  - _assign_numbers_intelligently（输入为 full_text 中按出现顺序去重的数字，同元素提取的方法2）
+  - convert_to_numeric（输入为上述数字及已保存的互动数）
+输出与 golden 文件逐条比对（以输入内容的哈希为键），防止提速时悄悄改变提取出的日期或计数；
+计时结果写成JSON报告并与阈值比较。任一不一致或超过阈值时退出码为1，可直接用于CI。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.data_processor import DataProcessor
+from utils.result_reader import iter_users, open_result_file, result_file_paths
+
+DEFAULT_GOLDEN = os.path.join('scripts', 'data', 'data_processor_golden.json.gz')
+
+# 每次调用的耗时上限（微秒），约为开发机实测值的10倍，以容忍CI机器的波动
+DEFAULT_THRESHOLDS_US = {
+    'extract_tweet_date': 40.0,
+    'extract_interactions': 160.0,
+    '_assign_numbers_intelligently': 50.0,
+    'convert_to_numeric': 5.0,
+}
+
+_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?[KMB万]?)')
+
+
+def _digest(value):
+    """输入内容的短哈希（golden的键）"""
+    return hashlib.blake2b(json.dumps(value, ensure_ascii=False).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def build_corpus(paths):
+    """
+    从结果文件构建各函数的输入语料（去重，顺序稳定）
+
+    Returns:
+        dict: {函数名: [输入, ...]}
+    """
+    full_texts, numbers_lists, values = {}, {}, {}
+    for path in paths:
+        for user in iter_users(path):
+            if not isinstance(user, dict):
+                continue
+            for tweet in user.get('recent_tweets') or []:
+                for value in (tweet.get('interactions') or {}).values():
+                    values.setdefault(str(value), None)
+                full_text = tweet.get('full_text')
+                if not full_text:
+                    continue
+                full_texts.setdefault(full_text, None)
+                found = list(dict.fromkeys(_NUMBER_RE.findall(full_text)))
+                if found:
+                    numbers_lists.setdefault(tuple(found), None)
+                for num in found:
+                    values.setdefault(num, None)
+    return {
+        'extract_tweet_date': list(full_texts),
+        'extract_interactions': list(full_texts),
+        '_assign_numbers_intelligently': [list(n) for n in numbers_lists],
+        'convert_to_numeric': list(values),
+    }
+
+
+def make_callers(processor):
+    """各函数的调用方式（返回可JSON化的输出）"""
+    def assign(numbers):
+        interactions = {'likes': '0', 'retweets': '0', 'replies': '0', 'views': '0'}
+        processor._assign_numbers_intelligently(numbers, interactions)
+        return interactions
+
+    return {
+        'extract_tweet_date': processor.extract_tweet_date,
+        'extract_interactions': processor.extract_interactions,
+        '_assign_numbers_intelligently': assign,
+        'convert_to_numeric': processor.convert_to_numeric,
+    }
+
+
+def run_outputs(corpus, callers):
+    """计算每条输入的输出 {函数名: {输入哈希: 输出}}"""
+    return {
+        name: {_digest(item): callers[name](item) for item in items}
+        for name, items in corpus.items()
+    }
+
+
+def time_functions(corpus, callers, repeat):
+    """
+    对每个函数在整份语料上计时，取最快一轮
+
+    Returns:
+        dict: {函数名: {'calls', 'best_seconds', 'us_per_call'}}
+    """
+    timings = {}
+    for name, items in corpus.items():
+        func = callers[name]
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for item in items:
+                func(item)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = {
+            'calls': len(items),
+            'best_seconds': round(best, 6),
+            'us_per_call': round(best / len(items) * 1e6, 3) if items else 0.0,
+        }
+    return timings
+
+
+def compare_golden(outputs, golden):
+    """
+    与golden比对（只比较双方都有的输入；语料新增的输入单独计数）
+
+    Returns:
+        tuple: (不一致列表, 无golden的输入数)
+    """
+    mismatches, unseen = [], 0
+    for name, results in outputs.items():
+        expected = golden.get(name, {})
+        for key, actual in results.items():
+            if key not in expected:
+                unseen += 1
+            elif json.loads(json.dumps(actual)) != expected[key]:
+                mismatches.append((name, key, expected[key], actual))
+    return mismatches, unseen
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='DataProcessor parsing micro-benchmark and golden regression check')
+    parser.add_argument('paths', nargs='*', help='result files for the corpus (default: results/)')
+    parser.add_argument('--golden', default=DEFAULT_GOLDEN, help='golden outputs file')
+    parser.add_argument('--update-golden', action='store_true', help='rewrite the golden file from current outputs')
+    parser.add_argument('--repeat', type=int, default=5, help='timing rounds per function (best is kept)')
+    parser.add_argument('--thresholds', help='JSON file {function: max_us_per_call} overriding the defaults')
+    parser.add_argument('--report', help='write the timing/regression report as JSON')
+    args = parser.parse_args()
+
+    paths = args.paths or result_file_paths('results')
+    corpus = build_corpus(paths)
+    if not corpus['extract_tweet_date']:
+        print("No full_text found in result files; nothing to benchmark.")
+        return 0
+
+    processor = DataProcessor()
+    callers = make_callers(processor)
+    outputs = run_outputs(corpus, callers)
+
+    if args.update_golden:
+        os.makedirs(os.path.dirname(args.golden) or '.', exist_ok=True)
+        with open_result_file(args.golden, 'w') as f:
+            json.dump(outputs, f, ensure_ascii=False, sort_keys=True)
+        print(f"golden updated: {args.golden} ({sum(len(v) for v in outputs.values())} outputs)")
+
+    mismatches, unseen = [], 0
+    if os.path.exists(args.golden):
+        with open_result_file(args.golden) as f:
+            mismatches, unseen = compare_golden(outputs, json.load(f))
+    else:
+        print(f"golden file not found: {args.golden} (run with --update-golden to create it)")
+
+    thresholds = dict(DEFAULT_THRESHOLDS_US)
+    if args.thresholds:
+        with open(args.thresholds, encoding='utf-8') as f:
+            thresholds.update(json.load(f))
+    timings = time_functions(corpus, callers, args.repeat)
+
+    print(f"corpus: {len(paths)} file(s), {len(corpus['extract_tweet_date'])} full_text inputs")
+    print(f"{'function':<32} {'calls':>7} {'best_s':>9} {'us/call':>9} {'limit':>8}  status")
+    failed = False
+    for name, t in timings.items():
+        limit = thresholds.get(name)
+        t['threshold_us'] = limit
+        t['passed'] = limit is None or t['us_per_call'] <= limit
+        failed |= not t['passed']
+        print(f"{name:<32} {t['calls']:>7} {t['best_seconds']:>9.4f} {t['us_per_call']:>9.2f} "
+              f"{limit or 0:>8.1f}  {'ok' if t['passed'] else 'SLOW'}")
+
+    print(f"golden: {len(mismatches)} mismatch(es), {unseen} input(s) without a golden value")
+    for name, key, expected, actual in mismatches[:20]:
+        print(f"  {name} [{key}]: expected {expected!r}, got {actual!r}")
+    failed |= bool(mismatches)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({
+                'corpus_files': paths,
+                'timings': timings,
+                'golden_mismatches': len(mismatches),
+                'golden_unseen': unseen,
+                'passed': not failed,
+            }, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
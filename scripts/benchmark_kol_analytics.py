@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+kol_analytics 向量化统计的规模基准
+生成不同规模的合成数据，验证 compute_user_metrics 的耗时随推文数线性增长
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.kol_analytics import TweetArrays, compute_user_metrics
+
+
+def make_synthetic_arrays(tweet_count, tweets_per_user=50, seed=0):
+    """生成与真实结果分布相近的合成数据"""
+    rng = np.random.default_rng(seed)
+    user_count = max(1, tweet_count // tweets_per_user)
+    user_idx = rng.integers(0, user_count, tweet_count)
+    likes = np.floor(rng.lognormal(3, 2, tweet_count))
+    base_day = np.datetime64('2025-01-01', 'D')
+    days = base_day + rng.integers(0, 365, tweet_count).astype('timedelta64[D]')
+    days[rng.random(tweet_count) < 0.02] = np.datetime64('NaT')
+    return TweetArrays(
+        usernames=np.array([f"user{i}" for i in range(user_count)], dtype=object),
+        display_names=np.array([f"User {i}" for i in range(user_count)], dtype=object),
+        followers=np.floor(rng.lognormal(9, 1.5, user_count)),
+        user_idx=user_idx,
+        is_retweet=rng.random(tweet_count) < 0.5,
+        likes=likes,
+        retweets=np.floor(likes * rng.random(tweet_count) * 0.3),
+        replies=np.floor(likes * rng.random(tweet_count) * 0.2),
+        views=np.floor(likes * rng.lognormal(4, 1, tweet_count)),
+        days=days,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='kol_analytics 规模基准')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100_000, 300_000, 1_000_000, 3_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help='每个规模重复次数，取最小值')
+    args = parser.parse_args()
+
+    print(f"{'tweets':>12} {'users':>9} {'best_s':>9} {'ns/tweet':>10} {'vs_first':>9}")
+    first_cost = None
+    for size in args.sizes:
+        arrays = make_synthetic_arrays(size)
+        best = float('inf')
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            compute_user_metrics(arrays)
+            best = min(best, time.perf_counter() - started)
+        per_tweet = best / size * 1e9
+        if first_cost is None:
+            first_cost = per_tweet
+        # 线性扩展时 ns/tweet 应基本不变（vs_first 接近 1.0；排序部分为 n·log n）
+        print(f"{size:>12} {arrays.user_count:>9} {best:>9.3f} {per_tweet:>10.1f} {per_tweet / first_cost:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver回放基准
+用录制的cassette（--record-cassette 生成）在无浏览器、无网络的环境下重跑
+TwitterSearchService.search_user_and_get_tweets，统计每个用户的CPU时间与墙钟时间，
+并可与golden结果比对，确认提取逻辑（去重、日期解析、互动数分配、终止条件）的输出没有变化。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.base_service import BaseService
+from services.twitter_search_service import TwitterSearchService
+from utils.command_accounting import CommandAccounting
+from utils.webdriver_cassette import ReplayDriver, load_cassette
+
+
+def extracted_output(result):
+    """search_user_and_get_tweets 结果中用于回归比对的部分"""
+    if not isinstance(result, dict):
+        return None
+    if result.get('error'):
+        return {'error': result['error']}
+    return {
+        'user_info': result['user_info'],
+        'stop_reason': result.get('stop_reason'),
+        'tweets': [tweet.to_dict() for tweet in result['tweets']],
+    }
+
+
+def replay(cassette, repeat=1, strict=True):
+    """
+    回放cassette中的所有用户
+
+    Args:
+        cassette (dict): load_cassette 的结果
+        repeat (int): 每个用户重复回放次数（取最小CPU时间）
+        strict (bool): 未录制命令时报错
+
+    Returns:
+        tuple: (每个用户的统计列表, {username: 提取结果})
+    """
+    # 回放没有真实的页面加载，固定等待全部跳过
+    BaseService.sleep_scale = 0
+    driver = ReplayDriver(cassette, strict=strict)
+    service = TwitterSearchService()
+    service.attach_driver(driver)
+
+    rows, outputs = [], {}
+    for index, segment in enumerate(cassette['users']):
+        best_cpu = best_wall = None
+        for _ in range(repeat):
+            driver.use_user(index)
+            # 年份推断以录制时间为准，回放结果不随运行日期变化
+            service.tweet_extractor.reference_time = datetime.fromisoformat(segment['started_at'])
+            cpu_started, wall_started = time.process_time(), time.perf_counter()
+            result = service.search_user_and_get_tweets(segment['username'], max_tweets=segment['max_tweets'])
+            cpu = time.process_time() - cpu_started
+            wall = time.perf_counter() - wall_started
+            best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+            best_wall = wall if best_wall is None else min(best_wall, wall)
+        output = extracted_output(result)
+        outputs[segment['username']] = output
+        tweets = len(output['tweets']) if output and 'tweets' in output else 0
+        rows.append({
+            'username': segment['username'],
+            'tweets': tweets,
+            'recorded_tweets': segment.get('tweets_count'),
+            'stop_reason': output.get('stop_reason') if output else None,
+            'recorded_stop_reason': segment.get('stop_reason'),
+            'commands': CommandAccounting.totals(service.last_command_stats)[0],
+            'unused_commands': driver.command_executor.remaining(),
+            'cpu_seconds': round(best_cpu, 4),
+            'wall_seconds': round(best_wall, 4),
+        })
+    return rows, outputs
+
+
+def compare_outputs(outputs, golden):
+    """返回与golden不一致的用户及首个差异"""
+    problems = []
+    for username, expected in golden.items():
+        actual = outputs.get(username)
+        if actual == expected:
+            continue
+        if not actual or not expected or 'tweets' not in actual or 'tweets' not in expected:
+            problems.append(f"@{username}: {expected!r:.80} -> {actual!r:.80}")
+            continue
+        if actual['user_info'] != expected['user_info']:
+            problems.append(f"@{username}: user_info differs")
+        if actual['stop_reason'] != expected['stop_reason']:
+            problems.append(f"@{username}: stop_reason {expected['stop_reason']} -> {actual['stop_reason']}")
+        if len(actual['tweets']) != len(expected['tweets']):
+            problems.append(f"@{username}: {len(expected['tweets'])} tweets -> {len(actual['tweets'])}")
+        for a, e in zip(actual['tweets'], expected['tweets']):
+            if a != e:
+                diff = sorted(k for k in set(a) | set(e) if a.get(k) != e.get(k))
+                problems.append(f"@{username}: tweet {e.get('index')} differs in {', '.join(diff)}")
+                break
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='WebDriver回放基准（无浏览器）')
+    parser.add_argument('cassette', help='录制文件（.json / .json.gz / .json.zst）')
+    parser.add_argument('--repeat', type=int, default=3, help='每个用户重复次数，取最小值')
+    parser.add_argument('--lenient', action='store_true', help='未录制的命令返回空值而不是报错')
+    parser.add_argument('--golden', help='与该golden文件比对提取结果，不一致时退出码为1')
+    parser.add_argument('--write-golden', help='把本次提取结果写为golden文件')
+    parser.add_argument('--json', help='将计时结果写入JSON文件')
+    args = parser.parse_args()
+
+    cassette = load_cassette(args.cassette)
+    rows, outputs = replay(cassette, repeat=args.repeat, strict=not args.lenient)
+
+    print(f"\n📼 回放 {args.cassette}: {len(rows)} 个用户, {len(cassette['interactions'])} 条录制命令")
+    print("=" * 78)
+    print(f"{'username':<20} {'tweets':>6} {'recorded':>8} {'commands':>9} {'unused':>7} {'cpu_s':>8} {'wall_s':>8}")
+    for r in rows:
+        print(f"{r['username']:<20} {r['tweets']:>6} {r['recorded_tweets'] or 0:>8} {r['commands']:>9} "
+              f"{r['unused_commands']:>7} {r['cpu_seconds']:>8.3f} {r['wall_seconds']:>8.3f}")
+        if r['stop_reason'] != r['recorded_stop_reason']:
+            print(f"  ⚠️ 终止原因不同: 录制 {r['recorded_stop_reason']} / 回放 {r['stop_reason']}")
+    total_cpu = sum(r['cpu_seconds'] for r in rows)
+    total_tweets = sum(r['tweets'] for r in rows)
+    print("-" * 78)
+    print(f"CPU total: {total_cpu:.3f}s, CPU/tweet: {total_cpu / total_tweets * 1000 if total_tweets else 0:.2f}ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'cassette': args.cassette, 'users': rows}, f, ensure_ascii=False, indent=2)
+    if args.write_golden:
+        with open(args.write_golden, 'w', encoding='utf-8') as f:
+            json.dump(outputs, f, ensure_ascii=False, indent=2)
+        print(f"📁 golden已写入: {args.write_golden}")
+    if args.golden:
+        with open(args.golden, encoding='utf-8') as f:
+            problems = compare_outputs(outputs, json.load(f))
+        if problems:
+            print(f"❌ 与golden不一致 ({len(problems)}):")
+            for p in problems[:20]:
+                print(f"  {p}")
+            return 1
+        print("✅ 提取结果与golden一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
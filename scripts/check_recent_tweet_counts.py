@@ -1,8 +1,13 @@
-import json
-import glob
+import argparse
 import os
+import sys
 from collections import Counter
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiling import profile_run
+from utils.result_reader import iter_users, result_file_paths, scan_files
+
 
 def safe_len_recent_tweets(user_obj: dict) -> int:
     recent = user_obj.get("recent_tweets", [])
@@ -11,27 +16,38 @@ def safe_len_recent_tweets(user_obj: dict) -> int:
     return 0
 
 
-def analyze_file(path: str) -> None:
+def summarize_file(path: str) -> dict:
+    """Stream one result file and return its tweet-count summary (cached by scan_files)."""
+    distribution: Counter[int] = Counter()
+    anomalies = []
+
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        for user in iter_users(path):
+            if not isinstance(user, dict):
+                continue
+            cnt = safe_len_recent_tweets(user)
+            distribution[cnt] += 1
+            if cnt != 50:
+                anomalies.append((user.get("username") or user.get("url"), cnt))
     except Exception as exc:
-        print(f"FILE: {path}\n  error loading json: {exc}")
-        return
+        return {"error": str(exc)}
 
-    if not isinstance(data, list):
-        return
+    return {
+        # JSON object keys must be strings; converted back in analyze_file
+        "distribution": {str(k): v for k, v in distribution.items()},
+        "anomalies": anomalies,
+    }
 
-    distribution: Counter[int] = Counter()
-    anomalies = []
 
-    for user in data:
-        if not isinstance(user, dict):
-            continue
-        cnt = safe_len_recent_tweets(user)
-        distribution[cnt] += 1
-        if cnt != 50:
-            anomalies.append((user.get("username") or user.get("url"), cnt))
+def analyze_file(path: str, summary: dict) -> None:
+    if "error" in summary:
+        print(f"FILE: {path}\n  error loading json: {summary['error']}")
+        return
+
+    distribution = {int(k): v for k, v in summary["distribution"].items()}
+    anomalies = summary["anomalies"]
+    if not distribution:
+        return
 
     total_users = sum(distribution.values())
     eq50 = distribution.get(50, 0)
@@ -48,12 +64,27 @@ def analyze_file(path: str) -> None:
 
 
 def main() -> None:
-    paths = sorted(glob.glob(os.path.join("results", "*.json")))
+    parser = argparse.ArgumentParser(description="Check recent_tweets counts in result files")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the scan cache")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile a single-process, uncached scan; reports go to results/")
+    args = parser.parse_args()
+
+    paths = result_file_paths("results")
     if not paths:
         print("No JSON files found under results/.")
         return
-    for p in paths:
-        analyze_file(p)
+    if args.profile:
+        # Worker processes and cache hits would hide the work from the profiler.
+        with profile_run("check_recent_tweet_counts_profile") as profiler:
+            for p in paths:
+                analyze_file(p, summarize_file(p))
+                profiler.checkpoint(os.path.basename(p))
+        return
+    cache_path = None if args.no_cache else os.path.join("results", ".scan_cache.json")
+    for p, summary in scan_files(paths, summarize_file, workers=args.workers, cache_path=cache_path):
+        analyze_file(p, summary)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文日期检查
+对 results/ 下的结果文件重新推断 date_iso，检查日期不晚于爬取时间、tweet_sort_key 的排序正确；
+并用手写的时间线样例（跨年、置顶旧推文、转发原推日期）核对按时间线顺序推断的年份。
+有问题时退出码为1。
+"""
+
+import os
+import sys
+from collections import Counter
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.data_processor import DataProcessor
+from utils.result_reader import iter_users, result_file_paths
+
+
+# Hand-written timelines (newest first, as on the page) with the years a reader would assign.
+# Each case: (name, scraped_at, [(tweet fields, expected date_iso), ...]).
+TIMELINE_CASES = [
+    ("cross-year", datetime(2026, 1, 10), [
+        ({"date": "Jan 8"}, "2026-01-08"),
+        ({"date": "Jan 2"}, "2026-01-02"),
+        ({"date": "Dec 30"}, "2025-12-30"),
+        ({"date": "Nov 5"}, "2025-11-05"),
+    ]),
+    # An old pinned tweet must not become the ceiling for the recent tweets below it.
+    ("pinned old tweet", datetime(2026, 1, 10), [
+        ({"date": "Mar 3, 2022", "is_pinned": True}, "2022-03-03"),
+        ({"date": "Jan 5"}, "2026-01-05"),
+        ({"date": "Dec 28"}, "2025-12-28"),
+    ]),
+    # Older result files have no is_pinned flag; the socialContext line in full_text marks the pin.
+    ("pinned via full_text", datetime(2026, 1, 10), [
+        ({"date": "Jun 1", "full_text": "Pinned\nName\n@handle\n·\nJun 1\ntext"}, "2025-06-01"),
+        ({"date": "Jan 3"}, "2026-01-03"),
+        ({"date": "Oct 12"}, "2025-10-12"),
+    ]),
+    # A retweet shows the original tweet's date and must not move the ceiling either.
+    ("retweet date", datetime(2026, 1, 10), [
+        ({"date": "Jan 9"}, "2026-01-09"),
+        ({"date": "Feb 20", "is_retweet": True}, "2025-02-20"),
+        ({"date": "Jan 4"}, "2026-01-04"),
+    ]),
+]
+
+
+def check_timeline_inference(processor: DataProcessor) -> list:
+    """Run normalize_timeline_dates over TIMELINE_CASES and return mismatches."""
+    problems = []
+    for name, scraped_at, rows in TIMELINE_CASES:
+        tweets = [dict(fields) for fields, _ in rows]
+        processor.normalize_timeline_dates(tweets, scraped_at, timeline_order=True)
+        for tweet, (fields, expected) in zip(tweets, rows):
+            if tweet["date_iso"] != expected:
+                problems.append(f"{name}: {fields['date']} -> {tweet['date_iso']}, expected {expected}")
+    return problems
+
+
+def check_user(user: dict, processor: DataProcessor, stats: Counter) -> list:
+    """Normalize one user's stored tweets and return a list of problems found."""
+    problems = []
+    tweets = user.get("recent_tweets") or []
+    try:
+        scraped_at = datetime.fromisoformat(user.get("scraped_at", ""))
+    except (TypeError, ValueError):
+        return [f"bad scraped_at: {user.get('scraped_at')!r}"]
+
+    # Stored files are already re-sorted by date, so only the scrape time can anchor the year.
+    processor.normalize_timeline_dates(tweets, scraped_at, timeline_order=False)
+    stats["stored_parsed"] += sum(1 for t in tweets if t["date_iso"])
+    processor.normalize_timeline_dates(tweets, scraped_at, timeline_order=False, reparse_full_text=True)
+
+    for tweet in tweets:
+        stats["tweets"] += 1
+        if not tweet["date_iso"]:
+            stats["unparsed"] += 1
+            continue
+        if date.fromisoformat(tweet["date_iso"]) > scraped_at.date():
+            problems.append(f"tweet {tweet.get('index')}: {tweet['date_iso']} is after scrape time")
+
+    # Sorting with the precomputed key: dates non-decreasing, unknown dates last.
+    ordered = sorted(tweets, key=DataProcessor.tweet_sort_key)
+    known = [t["date_iso"] for t in ordered if t["date_iso"]]
+    if known != sorted(known) or any(t["date_iso"] for t in ordered[len(known):]):
+        problems.append("tweet_sort_key produced a bad order")
+
+    return problems
+
+
+def main() -> int:
+    processor = DataProcessor()
+    timeline_problems = check_timeline_inference(processor)
+    print(f"TIMELINE CASES: {len(TIMELINE_CASES)}")
+    for p in timeline_problems:
+        print(f"    {p}")
+    print("  OK" if not timeline_problems else f"  {len(timeline_problems)} problem(s)")
+    failed = bool(timeline_problems)
+
+    paths = result_file_paths("results")
+    if not paths:
+        print("No JSON files found under results/.")
+        return 1 if failed else 0
+
+    for path in paths:
+        stats: Counter = Counter()
+        problems = []
+        for user in iter_users(path):
+            if isinstance(user, dict):
+                problems.extend(f"@{user.get('username')}: {p}" for p in check_user(user, processor, stats))
+        recovered = stats["tweets"] - stats["unparsed"] - stats["stored_parsed"]
+        print(f"FILE: {path}")
+        print(f"  tweets: {stats['tweets']}, parsed from stored date: {stats['stored_parsed']}, "
+              f"recovered from full_text: {recovered}, unparsed: {stats['unparsed']}")
+        if problems:
+            failed = True
+            print(f"  {len(problems)} problem(s):")
+            for p in problems[:20]:
+                print(f"    {p}")
+        else:
+            print("  OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
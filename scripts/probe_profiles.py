@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资料页快速筛选
+只访问资料页、不滚动时间线，按粉丝数 / 位置 / 认证状态筛选大量账户，结果逐行写入JSONL。
+每个调试端口（一个浏览器）一个线程，各自开多个窗口并行加载，共享同一个用户队列。
+--pool N 时由 ChromePool 启动N个浏览器（后台健康检查），浏览器失效时探测线程重新从池中取实例继续。
+
+示例:
+  python scripts/probe_profiles.py users.txt --min-followers 10000 --location Tokyo --location 東京
+  python scripts/probe_profiles.py users.txt --ports 9300 9301 9302 --windows 6 --selected-list kol.txt
+  python scripts/probe_profiles.py users.txt --pool 3 --session x_session.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.profile_probe import ProfileFilter, ProfileProbe
+from utils.browser_utils import connect_to_existing_chrome
+from utils.chrome_pool import ChromePool
+from utils.fake_x_server import start_fake_x_server
+from utils.selector_registry import selector_registry
+from utils.session_cookies import setup_session_driver
+
+# 使用实例池时，单个探测线程因浏览器失效重新取实例的次数上限
+MAX_POOL_RECONNECTS = 3
+
+
+def read_usernames(paths, extra=()):
+    """读取用户名（每行一个，忽略空行、#注释与前导@），去重保持顺序"""
+    usernames = list(extra)
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip().lstrip('@')
+                if line:
+                    usernames.append(line)
+    return list(dict.fromkeys(u.lstrip('@') for u in usernames))
+
+
+def inject_session(port, path):
+    """以普通加载策略连接浏览器并注入登录会话（实例池新启动的浏览器未登录）"""
+    driver = connect_to_existing_chrome(port)
+    if not driver:
+        return False
+    try:
+        return setup_session_driver(path, driver=driver) is not None
+    finally:
+        try:
+            # 附加到已有浏览器的会话只结束 chromedriver，浏览器继续运行
+            driver.quit()
+        except Exception:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='资料页快速筛选（不滚动时间线）')
+    parser.add_argument('files', nargs='*', help='用户名列表文件（每行一个）')
+    parser.add_argument('--user', action='append', default=[], help='直接指定用户名（可多次）')
+    parser.add_argument('--ports', type=int, nargs='+', default=[9222], help='Chrome调试端口（每个端口一个线程）')
+    parser.add_argument('--pool', type=int, default=0, help='用Chrome实例池启动N个浏览器（代替 --ports）')
+    parser.add_argument('--pool-base-port', type=int, default=9300, help='实例池第一个实例的调试端口')
+    parser.add_argument('--headful', action='store_true', help='实例池显示浏览器窗口（默认无头）')
+    parser.add_argument('--session', help='探测前注入浏览器的登录会话文件（utils.session_cookies export 导出，实例池新启动的浏览器需要）')
+    parser.add_argument('--windows', type=int, default=4, help='每个浏览器同时加载的窗口数')
+    parser.add_argument('--timeout', type=float, default=20, help='单个资料页超时（秒）')
+    parser.add_argument('--min-followers', type=float, help='粉丝数下限')
+    parser.add_argument('--max-followers', type=float, help='粉丝数上限')
+    parser.add_argument('--location', action='append', default=[], help='位置关键词（可多次，任一匹配）')
+    parser.add_argument('--verified-only', action='store_true', help='只保留认证账户')
+    parser.add_argument('--output', help='结果JSONL（默认 results/profile_probe_<时间>.jsonl）')
+    parser.add_argument('--matched-only', action='store_true', help='JSONL中只写符合条件的账户')
+    parser.add_argument('--selected-list', help='另存符合条件的用户名列表（每行一个）')
+    parser.add_argument('--base-url', default='https://x.com', help='站点根地址')
+    parser.add_argument('--fake-server', action='store_true', help='启动本地仿X服务器并探测它（用于测速）')
+    args = parser.parse_args()
+
+    usernames = read_usernames(args.files, args.user)
+    if not usernames:
+        parser.error('没有要探测的用户名')
+
+    pool = None
+    if args.pool > 0:
+        try:
+            pool = ChromePool(args.pool, args.pool_base_port, headless=not args.headful, block_images=True)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        if not pool.start():
+            pool.close()
+            return 1
+
+    server = None
+    base_url = args.base_url
+    if args.fake_server:
+        server = start_fake_x_server()
+        base_url = server.base_url
+
+    output = args.output or os.path.join(
+        'results', f"profile_probe_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    profile_filter = ProfileFilter(args.min_followers, args.max_followers, args.location, args.verified_only)
+
+    queue = deque(usernames)
+    # 所有浏览器共享：出错的用户无论由哪个浏览器取到，合计只重试一次
+    retried = set()
+    write_lock = threading.Lock()
+    matched = []
+    finished = []
+    started = time.time()
+    browsers = len(pool.instances) if pool else len(args.ports)
+    print(f"🔎 探测 {len(usernames)} 个资料页（{browsers} 个浏览器 × {args.windows} 个窗口）→ {output}")
+
+    with open(output, 'w', encoding='utf-8') as out:
+        def on_result(result):
+            with write_lock:
+                finished.append(result['username'])
+                if result['matched']:
+                    matched.append(result['username'])
+                if result['matched'] or not args.matched_only:
+                    out.write(json.dumps(result, ensure_ascii=False) + '\n')
+                    out.flush()
+                mark = '✅' if result['matched'] else '·'
+                print(f"{mark} @{result['username']} {result['status']} 粉丝 {result['followers_count']} "
+                      f"{result['location']}（{len(finished)}/{len(usernames)}）")
+
+        def run_probe(port):
+            probe = ProfileProbe(port, base_url=base_url, windows=args.windows, page_timeout=args.timeout,
+                                 profile_filter=profile_filter, retried=retried)
+            if args.session and not inject_session(port, args.session):
+                print(f"❌ 端口 {port} 注入登录会话失败，跳过该浏览器")
+                return
+            if not probe.connect_to_browser():
+                print(f"❌ 端口 {port} 无法连接，跳过该浏览器")
+                return
+            try:
+                probe.probe(queue, on_result)
+            except Exception as e:
+                print(f"❌ 端口 {port} 探测中断: {e}")
+
+        def pool_worker():
+            # 探测器在浏览器失效时把进行中的用户放回队列后返回；队列未空就重新取实例（acquire 会重启失效实例）
+            for _ in range(MAX_POOL_RECONNECTS + 1):
+                if not queue:
+                    return
+                with pool.lease() as instance:
+                    run_probe(instance.port)
+
+        if pool:
+            threads = [threading.Thread(target=pool_worker, name=f'probe-pool-{i}') for i in range(len(pool.instances))]
+        else:
+            threads = [threading.Thread(target=run_probe, args=(port,), name=f'probe-{port}') for port in args.ports]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            selector_registry.save()
+            if server:
+                server.shutdown()
+            if pool:
+                pool.close()
+
+    elapsed = time.time() - started
+    probed = len(finished)
+    print(f"\n📊 探测 {probed} 个，符合条件 {len(matched)} 个，用时 {elapsed:.1f} 秒"
+          f"（{probed / elapsed * 3600 if elapsed else 0:.0f} 个/小时）")
+    if args.selected_list:
+        with open(args.selected_list, 'w', encoding='utf-8') as f:
+            f.write(''.join(u + '\n' for u in matched))
+        print(f"💾 符合条件的用户名已保存到 {args.selected_list}")
+    return 0 if probed == len(usernames) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大DOM提取压力测试
+在本地仿X服务器的静态时间线页面（一次性包含 10 / 100 / 1,000 / 10,000 条推文，含媒体、引用、转发、置顶）上，
+对每个提取后端测量 _find_tweet_elements + 逐条提取的耗时、WebDriver命令数、Python内存峰值以及浏览器JS堆/DOM节点数，
+并检查每条推文的耗时是否随推文数增长（超线性），便于发现长时间滚动会话中的性能退化。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.tweet_extractor import TweetExtractor
+from utils.browser_utils import setup_driver
+from utils.command_accounting import CommandAccounting
+from utils.fake_x_server import FakeXConfig, render_static_timeline_page, start_fake_x_server
+
+
+def extract_webdriver(extractor, elements):
+    """生产路径：_extract_tweets_from_elements（正文整批一次脚本调用，日期/互动数/转发逐条往返）"""
+    return extractor._extract_tweets_from_elements(elements)
+
+
+def extract_full_text(extractor, elements):
+    """下限参考：每篇推文只读一次 .text，日期/互动数/转发全部从 full_text 离线解析（不含正文提取）"""
+    processor = extractor.data_processor
+    records = []
+    for element in elements:
+        full_text = element.text
+        records.append({
+            'date': processor.extract_tweet_date(full_text),
+            'interactions': processor.extract_interactions(full_text),
+            'is_retweet': processor.detect_retweet_from_full_text(full_text),
+        })
+    return records
+
+
+def extract_in_page_script(extractor, elements):
+    """页面内脚本：全部推文的正文四级回退在一次脚本调用中完成（返回 text 与命中的方法）"""
+    return extractor.extract_tweet_texts(elements)
+
+
+# 提取后端：名称 -> fn(extractor, elements) -> 记录列表
+EXTRACTION_BACKENDS = {
+    'webdriver': extract_webdriver,
+    'full_text': extract_full_text,
+    'in_page_script': extract_in_page_script,
+}
+
+
+def page_metrics(driver):
+    """浏览器侧的JS堆与DOM节点数"""
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+        values = {m['name']: m['value'] for m in metrics}
+        return int(values.get('JSHeapUsedSize', 0)), int(values.get('Nodes', 0))
+    except Exception:
+        return 0, 0
+
+
+def load_static_page(driver, url, article_count, timeout=120):
+    """打开静态页面并等待全部推文渲染"""
+    driver.get(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        rendered = driver.execute_script('return document.querySelectorAll(\'article[data-testid="tweet"]\').length')
+        if rendered >= article_count:
+            return rendered
+        time.sleep(0.2)
+    raise RuntimeError(f"页面 {url} 在 {timeout}s 内未渲染完 {article_count} 条推文")
+
+
+def run_case(driver, extractor, accounting, backend, url, article_count):
+    """测量一个 (后端, 推文数) 组合"""
+    load_static_page(driver, url, article_count)
+    heap_before, nodes = page_metrics(driver)
+
+    before = accounting.snapshot()
+    tracemalloc.start()
+    started = time.perf_counter()
+    elements = extractor._find_tweet_elements()
+    found = time.perf_counter()
+    records = EXTRACTION_BACKENDS[backend](extractor, elements)
+    finished = time.perf_counter()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    commands = CommandAccounting.totals(CommandAccounting.diff(accounting.snapshot(), before))[0]
+    heap_after, _ = page_metrics(driver)
+
+    extract_seconds = finished - found
+    return {
+        'backend': backend,
+        'articles': article_count,
+        'found': len(elements),
+        'extracted': len(records),
+        'find_seconds': round(found - started, 4),
+        'extract_seconds': round(extract_seconds, 4),
+        'us_per_article': round(extract_seconds / len(elements) * 1e6, 1) if elements else None,
+        'commands': commands,
+        'commands_per_article': round(commands / len(elements), 2) if elements else None,
+        'python_peak_bytes': python_peak,
+        'js_heap_bytes': max(heap_before, heap_after),
+        'dom_nodes': nodes,
+    }
+
+
+def scaling_problems(rows, factor):
+    """每个后端：最大规模的单条耗时相对基准规模（>=100条中最小的）超过 factor 倍即视为超线性"""
+    problems = []
+    for backend in sorted({r['backend'] for r in rows}):
+        series = sorted((r for r in rows if r['backend'] == backend and r['us_per_article']),
+                        key=lambda r: r['articles'])
+        baseline = next((r for r in series if r['articles'] >= 100), series[0] if series else None)
+        if not baseline:
+            continue
+        for r in series:
+            if r['articles'] > baseline['articles'] and r['us_per_article'] > baseline['us_per_article'] * factor:
+                problems.append(f"{backend}: {r['articles']} articles cost {r['us_per_article']}us/article, "
+                                f"{r['us_per_article'] / baseline['us_per_article']:.1f}x the "
+                                f"{baseline['articles']}-article baseline")
+    return problems
+
+
+def write_pages(output_dir, counts, config):
+    """把静态页面写成HTML文件（可直接用浏览器打开检查）"""
+    os.makedirs(output_dir, exist_ok=True)
+    for count in counts:
+        path = os.path.join(output_dir, f"timeline_{count}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_static_timeline_page('stress_user', count, config))
+        print(f"📄 {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='大DOM提取压力测试（本地仿X静态页面 + 无头Chrome）')
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 1000, 10000], help='每页推文数')
+    parser.add_argument('--backends', nargs='+', default=list(EXTRACTION_BACKENDS), choices=list(EXTRACTION_BACKENDS))
+    parser.add_argument('--retweet-ratio', type=float, default=0.4)
+    parser.add_argument('--media-ratio', type=float, default=0.1)
+    parser.add_argument('--quote-ratio', type=float, default=0.1)
+    parser.add_argument('--superlinear-factor', type=float, default=2.0,
+                        help='单条耗时超过基准规模的该倍数即判定为超线性（退出码1）')
+    parser.add_argument('--write-pages', metavar='DIR', help='只生成静态HTML页面到目录，不运行浏览器')
+    parser.add_argument('--json', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    config = FakeXConfig(retweet_ratio=args.retweet_ratio, media_ratio=args.media_ratio,
+                         quote_ratio=args.quote_ratio)
+    if args.write_pages:
+        write_pages(args.write_pages, args.counts, config)
+        return 0
+
+    server = start_fake_x_server(config)
+    driver = setup_driver()
+    if not driver:
+        server.shutdown()
+        print("❌ 无法启动无头Chrome")
+        return 1
+
+    extractor = TweetExtractor()
+    extractor.attach_driver(driver)
+    rows = []
+    try:
+        for count in args.counts:
+            url = f"{server.base_url}/static/stress_user?articles={count}"
+            for backend in args.backends:
+                row = run_case(driver, extractor, extractor.command_accounting, backend, url, count)
+                rows.append(row)
+                print(f"{backend:<10} {count:>6} 条: 提取 {row['extract_seconds']:.2f}s "
+                      f"({row['us_per_article']}us/条, {row['commands_per_article']} 命令/条)")
+    finally:
+        extractor.close_connection()
+        server.shutdown()
+
+    print("\n📊 压力测试结果")
+    print("=" * 96)
+    print(f"{'backend':<10} {'articles':>8} {'find_s':>8} {'extract_s':>10} {'us/article':>11} "
+          f"{'cmd/article':>12} {'py_peak_MB':>11} {'js_heap_MB':>11} {'nodes':>8}")
+    for r in rows:
+        print(f"{r['backend']:<10} {r['articles']:>8} {r['find_seconds']:>8.3f} {r['extract_seconds']:>10.3f} "
+              f"{r['us_per_article'] or 0:>11.1f} {r['commands_per_article'] or 0:>12.2f} "
+              f"{r['python_peak_bytes'] / 1e6:>11.2f} {r['js_heap_bytes'] / 1e6:>11.1f} {r['dom_nodes']:>8}")
+
+    problems = scaling_problems(rows, args.superlinear_factor)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'rows': rows, 'superlinear': problems}, f, ensure_ascii=False, indent=2)
+        print(f"\n📁 结果已保存: {args.json}")
+    if problems:
+        print("\n❌ 检测到超线性增长:")
+        for p in problems:
+            print(f"  {p}")
+        return 1
+    print("\n✅ 各后端单条耗时随推文数基本线性")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,11 +11,47 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from utils.browser_utils import connect_to_existing_chrome
+from utils.command_accounting import CommandAccounting
+from utils.rate_controller import rate_controller
+from utils.tracing import span
+
+# 错误/限流页面检测（一次脚本调用）：错误提示testid、“重试”按钮、限流提示文本，
+# 以及资源计时中 responseStatus 为429的请求（arguments[0] 为上次检查时的 performance.now()）
+_PAGE_ERROR_SCRIPT = r"""
+var since = arguments[0] || 0, click = arguments[1];
+var now = performance.now();
+if (since > now) since = 0;  // 页面已重新导航
+var http429 = 0;
+var entries = performance.getEntriesByType('resource');
+for (var i = 0; i < entries.length; i++) {
+  if (entries[i].responseStatus === 429 && entries[i].startTime >= since) http429++;
+}
+if (entries.length > 200) performance.clearResourceTimings();  // 缓冲区满后新请求不再记录
+
+var RETRY = ['retry', 'try again', 'reload', '重试', '重新加载', '再試行', 'やり直す'];
+var retry = null;
+var buttons = document.querySelectorAll('button, [role="button"]');
+for (var j = 0; j < buttons.length && !retry; j++) {
+  var label = (buttons[j].textContent || '').trim().toLowerCase();
+  if (label.length < 20 && RETRY.indexOf(label) >= 0) retry = buttons[j];
+}
+var errorEl = document.querySelector('[data-testid="error-detail"]');
+var box = errorEl || (retry && retry.parentElement && retry.parentElement.parentElement);
+var message = box ? (box.innerText || '').trim().slice(0, 200) : '';
+var rateText = /rate limit|too many requests|请求过多|リクエスト.*(多|制限)/i.test(message + ' ' + document.title);
+
+var kind = (http429 || rateText) ? 'rate_limited' : ((errorEl || retry) ? 'page_error' : null);
+if (kind && click && retry) retry.click();
+return {kind: kind, retry: !!retry, message: message, http_429: http429, now: now};
+"""
 
 
 class BaseService:
     """基础服务类，提供浏览器连接和基本功能"""
     
+    # 固定等待的倍率（回放基准等无真实页面加载的场景设为0）
+    sleep_scale = 1.0
+    
     def __init__(self, debug_port=9222):
         """
         初始化基础服务
@@ -25,6 +61,19 @@ class BaseService:
         """
         self.debug_port = debug_port
         self.driver = None
+        self.command_accounting = None
+        self._page_error_checked_at = 0
+    
+    def attach_driver(self, driver, accounting=None):
+        """
+        使用已创建的浏览器驱动，并安装WebDriver命令统计
+        
+        Args:
+            driver: selenium WebDriver
+            accounting (CommandAccounting): 沿用的统计器（重新连接后保留之前的统计），默认新建
+        """
+        self.driver = driver
+        self.command_accounting = CommandAccounting.install(driver, accounting) if driver else None
     
     def connect_to_browser(self):
         """
@@ -34,7 +83,7 @@ class BaseService:
             bool: 是否成功连接
         """
         try:
-            self.driver = connect_to_existing_chrome(self.debug_port)
+            self.attach_driver(connect_to_existing_chrome(self.debug_port))
             if self.driver:
                 print("✅ 成功连接到现有浏览器会话")
                 return True
@@ -94,6 +143,68 @@ class BaseService:
         except TimeoutException:
             return None
     
+    def pause(self, seconds, label='sleep'):
+        """
+        固定等待（记录为追踪区间，便于在时间线上区分等待与实际工作）
+        
+        Args:
+            seconds (float): 等待秒数
+            label (str): 等待原因
+        """
+        with span(f"sleep:{label}", cat='sleep', seconds=seconds):
+            time.sleep(seconds * self.sleep_scale)
+    
+    def detect_page_error(self, click_retry=False):
+        """
+        检测当前页面是否为错误页（“出错了，请重试”）或限流页
+        
+        Args:
+            click_retry (bool): 检测到时是否点击“重试”按钮
+        
+        Returns:
+            dict or None: {'kind': 'rate_limited'/'page_error', 'retry': 是否有重试按钮,
+                           'message': 提示文本, 'http_429': 新出现的429请求数}；正常页面为None
+        """
+        try:
+            state = self.driver.execute_script(_PAGE_ERROR_SCRIPT, self._page_error_checked_at, click_retry)
+        except Exception as e:
+            print(f"检测错误页面时出错: {str(e)}")
+            return None
+        self._page_error_checked_at = state.get('now', 0)
+        return state if state.get('kind') else None
+    
+    def handle_page_error(self, attempt):
+        """
+        检测错误/限流页面；检测到时反馈给全局速率控制器，指数退避后点击重试（没有重试按钮则刷新页面）
+        
+        Args:
+            attempt (int): 当前是第几次处理（从0开始，决定退避时长）
+        
+        Returns:
+            dict or None: detect_page_error 的结果
+        """
+        state = self.detect_page_error()
+        if not state:
+            return None
+        if state['kind'] == 'rate_limited':
+            rate_controller.record_rate_limit()
+        else:
+            rate_controller.record_page_error()
+        delay = rate_controller.backoff_delay(attempt)
+        action = '点击重试' if state['retry'] else '刷新页面'
+        print(f"⚠️ 检测到{'限流' if state['kind'] == 'rate_limited' else '错误'}页面"
+              f"（{state['message'] or 'HTTP 429'}），{delay:.0f}秒后{action}（第{attempt + 1}次）")
+        self.pause(delay, 'error_backoff')
+        try:
+            if state['retry']:
+                self.detect_page_error(click_retry=True)
+            else:
+                self.driver.refresh()
+        except Exception as e:
+            print(f"重试页面时出错: {str(e)}")
+        self.pause(2, 'after_retry')
+        return state
+    
     def scroll_page(self, pixels=600):
         """
         滚动页面
@@ -6,12 +6,65 @@
 """
 
 import re
+from datetime import datetime, timedelta
 from selenium.webdriver.common.by import By
 
 
+# 转发标识：socialContext 中的 "xxx reposted" / "xxx 转发了" / "xxxがリポストしました"
+# 在线检测（TweetExtractor）与离线重分类（utils/reclassify_retweets.py）共用同一规则
+RETWEET_MARKER_RE = re.compile(r'reposted|retweeted|转发|がリポスト', re.IGNORECASE)
+RT_PREFIX_RE = re.compile(r'^\s*RT @')
+
+# 日期规范化：模块级预编译，避免每条推文重复构建
+MONTH_MAP = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4,
+    'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8,
+    'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+}
+_EN_DATE_RE = re.compile(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})(?:,\s*(\d{4}))?$')
+_CN_DATE_RE = re.compile(r'^(?:(\d{4})年)?(\d{1,2})月(\d{1,2})日$')
+_RELATIVE_DATE_RE = re.compile(r'^(\d+)\s*([smhd])$')
+_RELATIVE_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+# full_text 中 "@handle\n·\n日期\n" 结构里的日期行
+_FULL_TEXT_DATE_RE = re.compile(r'\n·\n([^\n]+)\n')
+# 置顶推文的 socialContext（不参与时间线顺序推断）
+PINNED_MARKERS = ('Pinned', '已置顶', '置顶', '固定')
+
+
 class DataProcessor:
     """数据处理器，负责解析和格式化推文数据"""
     
+    def is_retweet_context(self, context_text):
+        """判断socialContext文本是否为转发标识"""
+        return bool(context_text) and RETWEET_MARKER_RE.search(context_text) is not None
+    
+    def detect_retweet_from_full_text(self, full_text, tweet_text=''):
+        """
+        根据保存的 full_text 离线判断是否为转发
+        
+        full_text 结构为 "[socialContext行]\n显示名称\n@handle\n·\n日期\n正文..."，
+        socialContext 只出现在 @handle 之前、显示名称之上，因此只检查这些行，避免正文中的词误判
+        
+        Args:
+            full_text (str): 推文元素完整文本
+            tweet_text (str): 推文正文
+        
+        Returns:
+            bool: 是否为转发
+        """
+        lines = (full_text or '').split('\n')
+        for i, line in enumerate(lines):
+            if line.startswith('@'):
+                # lines[i-1] 为显示名称，之前的都是 socialContext
+                if any(self.is_retweet_context(context) for context in lines[:max(i - 1, 0)]):
+                    return True
+                break
+        return RT_PREFIX_RE.match(tweet_text or '') is not None
+    
+    def is_pinned_full_text(self, full_text):
+        """判断 full_text 首行（socialContext）是否为置顶标识"""
+        return (full_text or '').split('\n', 1)[0].startswith(PINNED_MARKERS)
+    
     def extract_tweet_date(self, full_text):
         """提取推文日期"""
         try:
@@ -45,9 +98,91 @@ class DataProcessor:
                     return match.group(1)
             
             return "未知日期"
-        except:
+        except Exception:
             return "未知日期"
     
+    def parse_tweet_date(self, date_str, ceiling):
+        """
+        将页面显示的日期解析为绝对日期
+        
+        无年份的日期（"Jun 5" / "6月5日"）取不晚于 ceiling 的最近一年
+        
+        Args:
+            date_str (str): extract_tweet_date 提取的日期
+            ceiling (datetime): 该推文不可能晚于的时间（爬取时间或时间线上更新的推文日期）
+        
+        Returns:
+            datetime or None: 解析失败返回 None
+        """
+        date_str = (date_str or '').strip()
+        try:
+            match = _EN_DATE_RE.match(date_str)
+            if match:
+                year, month, day = match.group(3), MONTH_MAP[match.group(1)], int(match.group(2))
+            else:
+                match = _CN_DATE_RE.match(date_str)
+                if match:
+                    year, month, day = match.group(1), int(match.group(2)), int(match.group(3))
+                else:
+                    match = _RELATIVE_DATE_RE.match(date_str)
+                    if match:
+                        delta = timedelta(**{_RELATIVE_UNITS[match.group(2)]: int(match.group(1))})
+                        return (ceiling - delta).replace(hour=0, minute=0, second=0, microsecond=0)
+                    return None
+            
+            if year:
+                return datetime(int(year), month, day)
+            year = ceiling.year
+            if (month, day) > (ceiling.month, ceiling.day):
+                year -= 1
+            if month == 2 and day == 29:
+                # 闰日只能属于闰年
+                while not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+                    year -= 1
+            return datetime(year, month, day)
+        except (ValueError, KeyError):
+            return None
+    
+    def normalize_timeline_dates(self, tweets, scraped_at, timeline_order=True, reparse_full_text=False):
+        """
+        按时间线顺序为推文推断绝对日期，写入 tweet['date_iso']（YYYY-MM-DD，无法解析为 None）
+        
+        时间线从新到旧排列：每条非置顶原创推文的日期成为后续推文的上限，
+        因此跨年的 "Dec 30" 会被正确归到上一年；转发显示的是原推日期，不更新上限。
+        置顶推文以提取时记录的 is_pinned 判断（未保存 full_text 时也有效），旧结果文件退回检查 full_text 首行
+        
+        Args:
+            tweets (list): 按时间线顺序排列的推文（原地修改）
+            scraped_at (datetime): 爬取时间
+            timeline_order (bool): tweets 是否仍为页面时间线顺序；已按日期重排的结果文件应传 False，只以爬取时间推断年份
+            reparse_full_text (bool): 已保存的 date 无法解析时，是否从 full_text 重新提取（用于旧结果文件）
+        
+        Returns:
+            int: 成功解析的推文数
+        """
+        ceiling = scraped_at
+        resolved = 0
+        for tweet in tweets:
+            parsed = self.parse_tweet_date(tweet.get('date'), ceiling)
+            if parsed is None and reparse_full_text and tweet.get('full_text'):
+                match = _FULL_TEXT_DATE_RE.search(tweet['full_text'])
+                if match:
+                    parsed = self.parse_tweet_date(match.group(1), ceiling)
+            tweet['date_iso'] = parsed.date().isoformat() if parsed else None
+            if parsed is None:
+                continue
+            resolved += 1
+            pinned = tweet.get('is_pinned', False) or self.is_pinned_full_text(tweet.get('full_text'))
+            if timeline_order and not tweet.get('is_retweet', False) and not pinned:
+                ceiling = parsed
+        return resolved
+    
+    @staticmethod
+    def tweet_sort_key(tweet):
+        """排序键：已知日期按时间先后，未知日期放在最后"""
+        date_iso = tweet.get('date_iso')
+        return (date_iso is None, date_iso or '')
+    
     def extract_interactions(self, full_text):
         """提取互动数据 - 改进版本"""
         try:
@@ -82,7 +217,7 @@ class DataProcessor:
                         try:
                             numeric_value = self.convert_to_numeric(num)
                             view_candidates.append((num, numeric_value))
-                        except:
+                        except Exception:
                             continue
                 
                 if view_candidates:
@@ -223,7 +358,7 @@ class DataProcessor:
             try:
                 full_text = tweet_element.text
                 interactions = self.extract_interactions(full_text)
-            except:
+            except Exception:
                 pass
         
         return interactions
@@ -237,7 +372,7 @@ class DataProcessor:
                 try:
                     value = self.convert_to_numeric(num)
                     number_values.append((num, value))
-                except:
+                except Exception:
                     number_values.append((num, 0))
             
             # 按数值大小排序
@@ -285,7 +420,7 @@ class DataProcessor:
         else:
             try:
                 return float(value_str)
-            except:
+            except Exception:
                 return 0
     
     def calculate_retweet_ratio(self, tweets):
@@ -9,11 +9,25 @@ import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from services.base_service import BaseService
+from utils.selector_registry import selector_registry
+from utils.tracing import traced
 
 
 class NavigationService(BaseService):
     """导航服务类，处理页面导航和用户搜索"""
     
+    def __init__(self, debug_port=9222, base_url="https://x.com"):
+        """
+        初始化导航服务
+        
+        Args:
+            debug_port (int): Chrome调试端口
+            base_url (str): 站点根地址（基准测试时指向本地仿X服务器）
+        """
+        super().__init__(debug_port)
+        self.base_url = base_url.rstrip('/')
+    
+    @traced(cat='navigation')
     def direct_access_user_page(self, username):
         """
         直接访问用户页面
@@ -28,11 +42,11 @@ class NavigationService(BaseService):
             print(f"直接访问用户 @{username} 的页面...")
             
             # 构建用户页面URL
-            user_url = f"https://x.com/{username}"
+            user_url = f"{self.base_url}/{username}"
             
             # 访问用户页面
             self.driver.get(user_url)
-            time.sleep(3)  # 进一步优化页面加载等待时间到3秒
+            self.pause(3, 'page_load')  # 进一步优化页面加载等待时间到3秒
             
             print(f"✅ 已访问用户页面: {user_url}")
             return True
@@ -69,15 +83,10 @@ class NavigationService(BaseService):
                 'input[placeholder*="Search X"]'
             ]
             
-            search_input = None
-            for selector in search_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        search_input = elements[0]
-                        break
-                except:
-                    continue
+            # 按历史命中率排序尝试，通常第一个选择器即命中；宽泛的兜底选择器（可能命中发推框等）始终最后尝试
+            search_fallbacks = ['input[type="text"]', '[data-testid="SearchBox"]', 'input[placeholder*="What"]']
+            search_input = selector_registry.find(self.driver, 'navigation.search_box', search_selectors,
+                                                  fallbacks=search_fallbacks)
             
             if not search_input:
                 print("❌ 无法找到搜索框")
@@ -113,39 +122,46 @@ class NavigationService(BaseService):
             # 等待搜索结果加载
             time.sleep(3)
             
-            # 查找用户链接 - 更全面的选择器
+            # 查找用户链接 - 更全面的选择器（模板中的用户名在查找时代入，命中率按模板统计）
+            user_link_templates = [
+                'a[href="/{username}"]',
+                'a[href*="/{username}"]',
+                '[data-testid="UserCell"] a[href*="/{username}"]',
+                '[data-testid="User-{username}"]',
+                'a[href*="{username}"]',
+                '[data-testid="UserCell"] a',
+                '[data-testid="UserCell"]',
+                'a[href*="twitter.com/{username}"]',
+                'a[href*="x.com/{username}"]',
+                '[data-testid="UserCell"] div[role="link"]',
+                '[data-testid="UserCell"] span[role="link"]',
+                '[data-testid="UserCell"] a[href*="/{username_lower}"]',
+                'a[href*="/{username_lower}"]'
+            ]
             user_link_selectors = [
-                f'a[href="/{username}"]',
-                f'a[href*="/{username}"]',
-                f'[data-testid="UserCell"] a[href*="/{username}"]',
-                f'[data-testid="User-{username}"]',
-                f'a[href*="{username}"]',
-                f'[data-testid="UserCell"] a',
-                f'[data-testid="UserCell"]',
-                f'a[href*="twitter.com/{username}"]',
-                f'a[href*="x.com/{username}"]',
-                f'[data-testid="UserCell"] div[role="link"]',
-                f'[data-testid="UserCell"] span[role="link"]',
-                f'[data-testid="UserCell"] a[href*="/{username.lower()}"]',
-                f'a[href*="/{username.lower()}"]'
+                template.format(username=username, username_lower=username.lower())
+                for template in user_link_templates
             ]
             
-            user_link = None
-            for selector in user_link_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        # 检查元素是否包含目标用户名
-                        for element in elements:
-                            element_text = element.text.lower()
-                            element_href = element.get_attribute('href') or ''
-                            if username.lower() in element_text or username.lower() in element_href:
-                                user_link = element
-                                break
-                        if user_link:
-                            break
-                except:
-                    continue
+            def is_user_link(element):
+                # 检查元素是否包含目标用户名
+                element_text = element.text.lower()
+                element_href = element.get_attribute('href') or ''
+                if username.lower() in element_text or username.lower() in element_href:
+                    return element
+                return None
+            
+            # 宽泛的模板（用户名子串匹配或不含用户名）只作兜底，不随命中率提前
+            user_link_fallbacks = [
+                'a[href*="{username}"]',
+                '[data-testid="UserCell"] a',
+                '[data-testid="UserCell"]',
+                '[data-testid="UserCell"] div[role="link"]',
+                '[data-testid="UserCell"] span[role="link"]'
+            ]
+            user_link = selector_registry.find(
+                self.driver, 'navigation.user_link', user_link_selectors,
+                accept=is_user_link, keys=user_link_templates, fallbacks=user_link_fallbacks)
             
             # 如果还是找不到，尝试更通用的方法
             if not user_link:
@@ -158,7 +174,7 @@ class NavigationService(BaseService):
                         if f'/{username}' in href or f'/{username.lower()}' in href:
                             user_link = link
                             break
-                except:
+                except Exception:
                     pass
             
             if not user_link:
@@ -166,7 +182,7 @@ class NavigationService(BaseService):
                 print("尝试直接访问用户页面...")
                 try:
                     # 直接访问用户页面
-                    user_url = f"https://x.com/{username}"
+                    user_url = f"{self.base_url}/{username}"
                     self.driver.get(user_url)
                     time.sleep(3)  # 进一步优化页面加载等待时间到3秒
                     print(f"✅ 已直接访问用户页面: {user_url}")
@@ -184,6 +200,7 @@ class NavigationService(BaseService):
             print(f"点击用户链接时出错: {str(e)}")
             return False
     
+    @traced(cat='navigation')
     def verify_user_page(self, username):
         """
         验证是否在正确的用户页面
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资料页快速探测模块
+只为筛选账户（粉丝数、位置、认证状态）时，不需要进入时间线滚动，也不需要逐个元素调用WebDriver：
+  - 每个资料页用 UserInfoExtractor.read_profile 一次脚本调用取出全部字段（页面未加载完成时继续轮询）
+  - 在同一个浏览器里开多个窗口流水线式导航：页面加载策略为 none，导航不阻塞，
+    轮询各窗口，完成一个立即补上下一个用户（用独立窗口而不是后台标签页，避免后台页被节流）
+  - 遇到错误/限流页面时反馈给全局速率控制器，该窗口退避后把用户放回队尾重试一次
+  - 单个窗口的WebDriver命令出错（标签页崩溃、窗口被关闭）时，该用户同样重试一次或记为 error，
+    其他窗口继续；窗口已不存在时用新窗口替换。整个浏览器不可用时把进行中的用户放回队列后停止，
+    由共享队列的其他探测器接手
+多个浏览器（如 ChromePool 的实例）可各开一个探测器共享同一个用户队列（同时共享已重试集合，每个用户总共只重试一次）。
+"""
+
+import threading
+import time
+from collections import deque
+
+from services.user_info_extractor import UserInfoExtractor, build_user_info
+from utils.browser_utils import connect_to_existing_chrome
+from utils.rate_controller import rate_controller
+
+# 多个探测线程共享已重试集合时，判断与记录需原子完成
+_retry_lock = threading.Lock()
+
+
+class ProfileFilter:
+    """按粉丝数、位置、认证状态筛选账户"""
+
+    def __init__(self, min_followers=None, max_followers=None, locations=None, verified_only=False):
+        """
+        Args:
+            min_followers (float): 粉丝数下限
+            max_followers (float): 粉丝数上限
+            locations (list): 位置关键词（任一出现即匹配，不区分大小写）
+            verified_only (bool): 只保留认证账户
+        """
+        self.min_followers = min_followers
+        self.max_followers = max_followers
+        self.locations = [loc.lower() for loc in (locations or []) if loc]
+        self.verified_only = verified_only
+
+    def __call__(self, user_info):
+        """
+        判断账户是否符合条件
+
+        Returns:
+            bool: 是否符合
+        """
+        if user_info.get('status') != 'ok':
+            return False
+        followers = user_info.get('followers_count') or 0
+        if self.min_followers is not None and followers < self.min_followers:
+            return False
+        if self.max_followers is not None and followers > self.max_followers:
+            return False
+        if self.verified_only and not user_info.get('verified'):
+            return False
+        if self.locations:
+            location = (user_info.get('location') or '').lower()
+            if not any(keyword in location for keyword in self.locations):
+                return False
+        return True
+
+
+class ProfileProbe(UserInfoExtractor):
+    """多窗口流水线式资料页探测器"""
+
+    def __init__(self, debug_port=9222, base_url="https://x.com", windows=4, page_timeout=20.0,
+                 poll_interval=0.2, profile_filter=None, retried=None):
+        """
+        Args:
+            debug_port (int): Chrome调试端口
+            base_url (str): 站点根地址（本地仿X服务器时传入其地址）
+            windows (int): 同时加载的窗口数
+            page_timeout (float): 单个资料页的超时（秒）
+            poll_interval (float): 轮询各窗口的间隔（秒）
+            profile_filter (ProfileFilter): 筛选条件，None 表示全部视为符合
+            retried (set): 已重试过的用户名；共享同一个用户队列的探测器应传入同一个集合
+        """
+        super().__init__(debug_port)
+        self.base_url = base_url.rstrip('/')
+        self.windows = max(1, windows)
+        self.page_timeout = page_timeout
+        self.poll_interval = poll_interval
+        self.profile_filter = profile_filter or ProfileFilter()
+        self.stats = {'probed': 0, 'matched': 0, 'errors': 0}
+        self._handles = []
+        self._retried = retried if retried is not None else set()
+        self._queue = deque()
+        self._results = []
+        self._on_result = None
+        self._browser_lost = False
+        self._slots = {}
+        self._cooldown = {}
+        self._failures = {}
+
+    def connect_to_browser(self):
+        """
+        以 pageLoadStrategy=none 连接现有浏览器（导航命令立即返回，页面在各窗口中并行加载）
+
+        Returns:
+            bool: 是否成功连接
+        """
+        self.attach_driver(connect_to_existing_chrome(self.debug_port, page_load_strategy='none'))
+        return self.driver is not None
+
+    def probe(self, usernames, on_result=None):
+        """
+        探测一批用户的资料页
+
+        Args:
+            usernames (deque or list): 用户名队列；多个探测器共享同一个 deque 时各自取用
+            on_result (callable): 每完成一个用户时以结果字典调用（流式输出）
+
+        Returns:
+            list: 全部结果（含 status 与 matched 字段）
+        """
+        queue = usernames if isinstance(usernames, deque) else deque(usernames)
+        self._queue = queue
+        self._results = []
+        self._on_result = on_result
+        self._browser_lost = False
+        self._open_windows()
+        # handle -> [username, 开始时间]；出错的窗口在冷却截止前不再导航
+        self._slots = {handle: None for handle in self._handles}
+        self._cooldown = {handle: 0.0 for handle in self._handles}
+        self._failures = {handle: 0 for handle in self._handles}
+        try:
+            while True:
+                active = False
+                for handle in list(self._handles):
+                    now = time.time()
+                    slot = self._slots[handle]
+                    if slot is None:
+                        if now >= self._cooldown[handle]:
+                            handle = self._start(handle)
+                        active = active or self._slots[handle] is not None or bool(queue)
+                        continue
+                    active = True
+                    username, started = slot
+                    try:
+                        self.driver.switch_to.window(handle)
+                        info = self.read_profile(username)
+                    except Exception as e:
+                        self._window_failed(handle, e)
+                        continue
+                    if info['status'] == 'loading':
+                        if now - started < self.page_timeout:
+                            continue
+                        info = {'status': 'timeout'}
+
+                    self._slots[handle] = None
+                    if info['status'] in ('rate_limited', 'page_error', 'timeout') and self._claim_retry(username):
+                        # 错误/限流：反馈给速率控制器，窗口退避后把用户放回队尾重试一次
+                        if info['status'] == 'rate_limited':
+                            rate_controller.record_rate_limit()
+                        elif info['status'] == 'page_error':
+                            rate_controller.record_page_error()
+                        self._back_off(handle, now)
+                        queue.append(username)
+                        continue
+
+                    self._failures[handle] = 0
+                    self._emit(self._finish(username, info, now - started))
+                    if now >= self._cooldown[handle]:
+                        self._start(handle)
+                if self._browser_lost:
+                    # 整个浏览器不可用：进行中的用户放回队首，由共享队列的其他探测器接手
+                    in_flight = [slot[0] for slot in self._slots.values() if slot]
+                    queue.extendleft(reversed(in_flight))
+                    print(f"❌ 浏览器（端口 {self.debug_port}）已不可用，{len(in_flight)} 个进行中的用户放回队列")
+                    break
+                if not active:
+                    break
+                time.sleep(self.poll_interval)
+        finally:
+            self._close_windows()
+        return self._results
+
+    def _start(self, handle):
+        """
+        在窗口中开始下一个用户
+
+        Returns:
+            str: 之后使用的窗口句柄（导航出错且窗口已不存在时为替换后的新窗口）
+        """
+        try:
+            username = self._queue.popleft()
+        except IndexError:
+            return handle
+        self._slots[handle] = [username, time.time()]
+        try:
+            self.driver.switch_to.window(handle)
+            # pageLoadStrategy=none 下 get 不等待加载完成
+            self.driver.get(f"{self.base_url}/{username}")
+        except Exception as e:
+            return self._window_failed(handle, e)
+        return handle
+
+    def _claim_retry(self, username):
+        """用户还没有重试过时记为已重试并返回True（共享集合时所有探测器合计只重试一次）"""
+        with _retry_lock:
+            if username in self._retried:
+                return False
+            self._retried.add(username)
+            return True
+
+    def _emit(self, result):
+        self._results.append(result)
+        if self._on_result:
+            self._on_result(result)
+
+    def _back_off(self, handle, now):
+        self._cooldown[handle] = now + rate_controller.backoff_delay(self._failures[handle])
+        self._failures[handle] += 1
+
+    def _window_failed(self, handle, error):
+        """
+        窗口内的WebDriver命令出错（标签页崩溃、窗口被关闭）：用户重试一次（放回队尾）或记为 error，
+        窗口退避；窗口已不存在时换一个新窗口，其他窗口不受影响
+
+        Returns:
+            str: 之后使用的窗口句柄（可能是替换后的新窗口）
+        """
+        username, started = self._slots[handle]
+        self._slots[handle] = None
+        now = time.time()
+        message = str(error).strip().split('\n', 1)[0] or type(error).__name__
+        print(f"⚠️ 探测窗口出错（@{username}）: {message}")
+        if self._claim_retry(username):
+            self._queue.append(username)
+        else:
+            self._emit(self._finish(username, {'status': 'error'}, now - started))
+        self._back_off(handle, now)
+        return self._replace_window(handle)
+
+    def _replace_window(self, handle):
+        try:
+            if handle in self.driver.window_handles:
+                return handle
+            self.driver.switch_to.new_window('window')
+            new_handle = self.driver.current_window_handle
+        except Exception:
+            # 连窗口列表都取不到：浏览器本身不可用
+            self._browser_lost = True
+            return handle
+        self._handles[self._handles.index(handle)] = new_handle
+        for state in (self._slots, self._cooldown, self._failures):
+            state[new_handle] = state.pop(handle)
+        return new_handle
+
+    def _finish(self, username, info, elapsed):
+        user_info = build_user_info(username, info)
+        user_info['status'] = info['status']
+        user_info['probe_seconds'] = round(elapsed, 2)
+        user_info['matched'] = self.profile_filter(user_info)
+        self.stats['probed'] += 1
+        if user_info['matched']:
+            self.stats['matched'] += 1
+        if info['status'] != 'ok':
+            self.stats['errors'] += 1
+        else:
+            rate_controller.record_success()
+        return user_info
+
+    def _open_windows(self):
+        self._handles = [self.driver.current_window_handle]
+        for _ in range(self.windows - 1):
+            self.driver.switch_to.new_window('window')
+            self._handles.append(self.driver.current_window_handle)
+
+    def _close_windows(self):
+        # 保留第一个窗口（用户原有的窗口），关闭其余探测窗口
+        for handle in self._handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        if self._handles:
+            try:
+                self.driver.switch_to.window(self._handles[0])
+            except Exception:
+                pass
+        self._handles = []
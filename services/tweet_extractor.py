@@ -10,17 +10,91 @@ import re
 from datetime import datetime, timedelta
 from selenium.webdriver.common.by import By
 from services.base_service import BaseService
-from services.data_processor import DataProcessor
+from services.data_processor import DataProcessor, RT_PREFIX_RE
+from services.tweet_record import TweetRecord
+from utils.crawl_logger import detection_enabled, log_detection
+from utils.crawl_metrics import metrics
+from utils.tracing import span
+from utils.tweet_dedup import TweetDeduper
+
+# 推文正文的四级回退（一次脚本调用，arguments[0] 为推文元素列表）：
+# tweetText → 带lang属性的div → 第一个较长且不像按钮/统计的span → 完整文本中第一个符合条件的行。
+# 每个元素返回 {text, method, status_id}，method 为命中的方法（tweetText / lang / span / full_text），
+# 都未命中为null；status_id 取自包裹发布时间的 /status/<id> 链接（引用推文的链接在其后，不会先命中）
+_TWEET_TEXT_SCRIPT = r"""
+var SPAN_SKIP = ['follow', 'like', 'retweet', 'reply', 'view', 'share', 'more'];
+var LINE_SKIP = SPAN_SKIP.concat(['·', '@']);
+function usable(text, skip) {
+  if (text.length <= 10) return false;
+  var lower = text.toLowerCase();
+  for (var i = 0; i < skip.length; i++) if (lower.indexOf(skip[i]) >= 0) return false;
+  return true;
+}
+function firstText(article, selector) {
+  var el = article.querySelector(selector);
+  return el ? (el.innerText || '').trim() : '';
+}
+function statusId(article) {
+  var time = article.querySelector('a[href*="/status/"] time');
+  var link = time && time.closest('a');
+  var m = link && /\/status\/(\d+)/.exec(link.getAttribute('href') || '');
+  return m ? m[1] : null;
+}
+function extract(article) {
+  var text = firstText(article, '[data-testid="tweetText"]');
+  if (text) return {text: text, method: 'tweetText'};
+  text = firstText(article, 'div[lang]');
+  if (text) return {text: text, method: 'lang'};
+  var spans = article.querySelectorAll('span');
+  for (var i = 0; i < spans.length; i++) {
+    text = (spans[i].innerText || '').trim();
+    if (usable(text, SPAN_SKIP)) return {text: text, method: 'span'};
+  }
+  var lines = (article.innerText || '').split('\n');
+  for (var j = 0; j < lines.length; j++) {
+    text = lines[j].trim();
+    if (usable(text, LINE_SKIP)) return {text: text, method: 'full_text'};
+  }
+  return {text: '', method: null};
+}
+return arguments[0].map(function (article) {
+  var result;
+  try { result = extract(article); } catch (e) { result = {text: '', method: null}; }
+  try { result.status_id = statusId(article); } catch (e) { result.status_id = null; }
+  return result;
+});
+"""
 
 
 class TweetExtractor(BaseService):
     """推文提取器，负责提取和处理Twitter推文数据"""
     
-    def __init__(self, debug_port=9222, debug_retweet_detection=False):
-        """初始化推文提取器"""
+    def __init__(self, debug_port=9222, debug_retweet_detection=False, keep_full_text=None):
+        """
+        初始化推文提取器
+        
+        Args:
+            debug_port (int): Chrome调试端口
+            debug_retweet_detection (bool): 是否启用转发检测调试模式
+            keep_full_text (bool): 是否在记录中保存 full_text，默认跟随调试模式（离线重分类需要）
+        """
         super().__init__(debug_port)
         self.data_processor = DataProcessor()
         self.debug_retweet_detection = debug_retweet_detection
+        self.keep_full_text = debug_retweet_detection if keep_full_text is None else keep_full_text
+        self.last_stop_reason = None
+        # 推断推文年份的参考时间，默认取本次获取开始的时间（回放录制时使用录制时间）
+        self.reference_time = None
+        # 标签页内存治理（TabMemoryGovernor），None 表示不采样
+        self.memory_governor = None
+        # WebDriver看门狗（CrawlWatchdog），用于协作检查单个用户的截止时间
+        self.watchdog = None
+        # 正文提取各回退方法的命中次数（tweetText / lang / span / full_text / None）
+        self.text_methods = {}
+        # 近重复检测：用户时间线内（SimHash）与整批共享的索引（NearDuplicateIndex），默认关闭
+        self.near_duplicates = False
+        self.near_duplicate_distance = 6
+        self.batch_near_duplicates = None
     
     def get_user_tweets(
         self,
@@ -29,81 +103,117 @@ class TweetExtractor(BaseService):
         max_total_wait_seconds=600,
         max_scroll_attempts=1000,
         max_no_new_tweets=200,
+        max_page_errors=5,
     ):
         """
         获取用户推文
         
         Args:
             max_tweets (int): 最大推文数量
+            max_page_errors (int): 错误/限流页面最多处理次数（每次指数退避），超过后以 rate_limited / page_error 终止
         
         Returns:
-            list: 推文列表（去重策略：文本+是否转发 作为唯一键；因此同文本的原创与转发会“都保留”）
+            list: 推文列表（去重策略：状态ID（取不到时为正文哈希）+是否转发 作为唯一键；
+                  因此同一推文的原创与转发会“都保留”，可选再按SimHash去掉近重复）
         """
         tweets = []
-        seen_tweet_keys = set()  # (tweet_text, is_retweet) 作为唯一键，原创与转发可共存
+        self.last_stop_reason = None
+        # (状态ID或正文哈希, is_retweet) 作为唯一键，原创与转发可共存
+        deduper = TweetDeduper(self.near_duplicates, self.batch_near_duplicates, self.near_duplicate_distance)
         try:
             print(f"开始获取用户推文，目标数量: {max_tweets}")
             
             # 多次滚动获取推文
             scroll_attempts = 0
             no_new_tweets_count = 0  # 连续无新推文计数器
+            page_errors = 0  # 错误/限流页面的处理次数
             start_time = time.time()
             
             # 当 wait_until_reach 为 True 时，将尽可能达到目标数量，直到超时或达到滚动/无新推文上限
             while True:
-                # 查找推文元素
-                tweet_elements = self._find_tweet_elements()
-                
-                if not tweet_elements:
-                    print("未找到推文元素，等待页面加载...")
-                    time.sleep(3)  # 优化等待时间到3秒
+                # 每轮迭代（查找、提取、滚动、等待）记录为一个追踪区间
+                metrics.scroll_iteration()
+                with span('scroll_iteration', cat='tweets', attempt=scroll_attempts + 1, collected=len(tweets)):
+                    # 查找推文元素
+                    with span('find_tweet_elements', cat='tweets'):
+                        tweet_elements = self._find_tweet_elements()
+                    
+                    if not tweet_elements:
+                        # 错误/限流页面：退避后重试，不再按普通加载等待空转
+                        error = self.handle_page_error(page_errors)
+                        if error:
+                            page_errors += 1
+                            if page_errors >= max_page_errors:
+                                self._stop(error['kind'], f"累计遇到{max_page_errors}次错误/限流页面，停止")
+                                break
+                            continue
+                        print("未找到推文元素，等待页面加载...")
+                        self.pause(3, 'no_articles')  # 优化等待时间到3秒
+                        scroll_attempts += 1
+                        # 终止条件检查
+                        if self._should_stop(len(tweets), max_tweets, wait_until_reach, start_time, max_total_wait_seconds, scroll_attempts, max_scroll_attempts, no_new_tweets_count, max_no_new_tweets):
+                            break
+                        continue
+                    
+                    # 提取推文（不去重），统一在此处聚合并做“原创优先”去重
+                    with span('extract_articles', cat='tweets', articles=len(tweet_elements)):
+                        extracted = self._extract_tweets_from_elements(tweet_elements)
+                    added_count = 0
+                    for tweet_data in extracted:
+                        if len(tweets) >= max_tweets:
+                            break
+                        if not tweet_data.get('text', ''):
+                            continue
+                        duplicate = deduper.check_and_add(tweet_data)
+                        if duplicate:
+                            if duplicate.endswith('near_duplicate'):
+                                log_detection('duplicate_skipped', reason=duplicate, text=tweet_data['text'][:50])
+                            continue
+                        tweets.append(tweet_data)
+                        added_count += 1
+
+                    metrics.add_tweets(added_count)
+                    if added_count > 0:
+                        print(f"当前已获取 {len(tweets)} 条有效推文（目标: {max_tweets}），新加 {added_count} 条")
+                        no_new_tweets_count = 0
+                    else:
+                        # 时间线底部出现错误/限流提示时，退避并重试后再继续
+                        error = self.handle_page_error(page_errors)
+                        if error:
+                            page_errors += 1
+                            if page_errors >= max_page_errors:
+                                self._stop(error['kind'], f"累计遇到{max_page_errors}次错误/限流页面，停止")
+                                break
+                            continue
+                        no_new_tweets_count += 1
+                        print(f"未发现新推文，继续滚动... (连续{no_new_tweets_count}次)")
+                    
+                    # 滚动页面 - 使用600像素逐步滚动
+                    self.scroll_page(600)  # 每次滚动600像素
+                    self.pause(2, 'after_scroll')  # 调整滚动后等待时间到2秒
                     scroll_attempts += 1
+                    if self.memory_governor:
+                        self.memory_governor.on_scroll(scroll_attempts)
+                    
                     # 终止条件检查
                     if self._should_stop(len(tweets), max_tweets, wait_until_reach, start_time, max_total_wait_seconds, scroll_attempts, max_scroll_attempts, no_new_tweets_count, max_no_new_tweets):
                         break
-                    continue
-                
-                # 提取推文（不去重），统一在此处聚合并做“原创优先”去重
-                extracted = self._extract_tweets_from_elements(tweet_elements)
-                added_count = 0
-                for tweet_data in extracted:
-                    if len(tweets) >= max_tweets:
-                        break
-                    tweet_text = tweet_data.get('text', '')
-                    if not tweet_text:
-                        continue
-                    is_retweet = tweet_data.get('is_retweet', False)
-                    key = (tweet_text, bool(is_retweet))
-                    if key in seen_tweet_keys:
-                        continue
-                    tweets.append(tweet_data)
-                    seen_tweet_keys.add(key)
-                    added_count += 1
-
-                if added_count > 0:
-                    print(f"当前已获取 {len(tweets)} 条有效推文（目标: {max_tweets}），新加 {added_count} 条")
-                    no_new_tweets_count = 0
-                else:
-                    no_new_tweets_count += 1
-                    print(f"未发现新推文，继续滚动... (连续{no_new_tweets_count}次)")
-                
-                # 滚动页面 - 使用600像素逐步滚动
-                self.scroll_page(600)  # 每次滚动600像素
-                time.sleep(2)  # 调整滚动后等待时间到2秒
-                scroll_attempts += 1
-                
-                # 终止条件检查
-                if self._should_stop(len(tweets), max_tweets, wait_until_reach, start_time, max_total_wait_seconds, scroll_attempts, max_scroll_attempts, no_new_tweets_count, max_no_new_tweets):
-                    break
+            
+            # 按时间线顺序一次性推断绝对日期（date_iso），排序与跨次合并时直接比较
+            self.data_processor.normalize_timeline_dates(tweets, self.reference_time or datetime.fromtimestamp(start_time))
             
             # 重新编号index
             for i, t in enumerate(tweets, 1):
                 t['index'] = i
             print(f"推文获取完成，总计: {len(tweets)} 条")
+            near = {k: v for k, v in deduper.skipped.items() if k.endswith('near_duplicate')}
+            if near:
+                print(f"🧹 跳过近重复推文: {near}")
             return tweets
             
         except Exception as e:
             print(f"获取用户推文时出错: {str(e)}")
+            self._stop('error')
             return tweets
 
     def _extract_tweets_from_elements(self, tweet_elements):
@@ -112,46 +222,47 @@ class TweetExtractor(BaseService):
         filtered_count = 0
         duplicate_count = 0  # 不使用，但保留计数字段占位
 
-        for tweet_element in tweet_elements:
-            tweet_data = self._extract_tweet_data(tweet_element)
+        # 本轮全部推文的正文与状态ID在一次脚本调用中取得
+        text_results = self._batch_tweet_texts(tweet_elements)
+        for tweet_element, text_result in zip(tweet_elements, text_results):
+            tweet_data = self._extract_tweet_data(tweet_element, text_result)
             if not tweet_data:
                 filtered_count += 1
                 continue
             new_tweets.append(tweet_data)
 
-        if self.debug_retweet_detection and (filtered_count > 0 or duplicate_count > 0):
-            print(f"    📊 本轮统计: 新增{len(new_tweets)}条, 过滤{filtered_count}条(24h内), 重复{duplicate_count}条")
+        if filtered_count > 0 or duplicate_count > 0:
+            log_detection('round_stats', extracted=len(new_tweets), filtered=filtered_count, duplicates=duplicate_count)
         return new_tweets
 
     def _should_stop(self, current_count, target_count, wait_until_reach, start_time,
                       max_total_wait_seconds, scroll_attempts, max_scroll_attempts,
                       no_new_tweets_count, max_no_new_tweets):
-        """统一的终止条件判定"""
+        """统一的终止条件判定（终止时记录原因到 last_stop_reason 与运行指标）"""
         # 达标直接停止
         if current_count >= target_count:
-            return True
+            return self._stop('target_reached')
+        
+        # 超过看门狗设定的单用户截止时间
+        if self.watchdog and self.watchdog.expired():
+            return self._stop('user_deadline', f"达到单用户截止时间，当前获取 {current_count}/{target_count}，停止")
         
         # 如果不要求强制达到目标，遵循原有上限
         if not wait_until_reach:
             if scroll_attempts >= max_scroll_attempts:
-                print(f"达到最大滚动次数 {max_scroll_attempts}，停止")
-                return True
+                return self._stop('max_scroll_attempts', f"达到最大滚动次数 {max_scroll_attempts}，停止")
             if no_new_tweets_count >= max_no_new_tweets:
-                print(f"连续{max_no_new_tweets}次未获取到新推文，停止滚动")
-                return True
+                return self._stop('no_new_tweets', f"连续{max_no_new_tweets}次未获取到新推文，停止滚动")
             return False
         
         # 需要尽量达到目标：放宽终止条件，但仍设置防护阈值
         elapsed = time.time() - start_time
         if elapsed >= max_total_wait_seconds:
-            print(f"等待时间已达上限 {max_total_wait_seconds}s，当前获取 {current_count}/{target_count}，停止")
-            return True
+            return self._stop('max_wait', f"等待时间已达上限 {max_total_wait_seconds}s，当前获取 {current_count}/{target_count}，停止")
         if scroll_attempts >= max_scroll_attempts:
-            print(f"滚动次数达到上限 {max_scroll_attempts}，当前获取 {current_count}/{target_count}，停止")
-            return True
+            return self._stop('max_scroll_attempts', f"滚动次数达到上限 {max_scroll_attempts}，当前获取 {current_count}/{target_count}，停止")
         if no_new_tweets_count >= max_no_new_tweets:
-            print(f"连续{max_no_new_tweets}次无新增，可能到底或加载失败，当前获取 {current_count}/{target_count}，停止")
-            return True
+            return self._stop('no_new_tweets', f"连续{max_no_new_tweets}次无新增，可能到底或加载失败，当前获取 {current_count}/{target_count}，停止")
         
         # 可选：检测是否到达时间线底部（弱检测）
         try:
@@ -160,13 +271,20 @@ class TweetExtractor(BaseService):
                 'No more Tweets', 'You’re all caught up', '没有更多', '没有更多推文', '没有更多结果', '没有结果'
             ]
             if any(marker in page_text for marker in end_markers):
-                print(f"似乎到达时间线底部，当前获取 {current_count}/{target_count}，停止")
-                return True
+                return self._stop('timeline_end', f"似乎到达时间线底部，当前获取 {current_count}/{target_count}，停止")
         except Exception:
             pass
         
         return False
 
+    def _stop(self, reason, message=None):
+        """记录终止原因并返回True"""
+        if message:
+            print(message)
+        self.last_stop_reason = reason
+        metrics.record_stop(reason)
+        return True
+
     def _find_tweet_elements(self):
         """查找推文元素"""
         try:
@@ -186,11 +304,12 @@ class TweetExtractor(BaseService):
         filtered_count = 0  # 被过滤的推文数量
         duplicate_count = 0  # 重复推文数量
         
-        for tweet_element in tweet_elements:
+        text_results = self._batch_tweet_texts(tweet_elements)
+        for tweet_element, text_result in zip(tweet_elements, text_results):
             if len(new_tweets) >= max_new_tweets:
                 break
             
-            tweet_data = self._extract_tweet_data(tweet_element)
+            tweet_data = self._extract_tweet_data(tweet_element, text_result)
             if not tweet_data:
                 filtered_count += 1  # 因为24小时内或其他原因被过滤
                 continue
@@ -207,30 +326,30 @@ class TweetExtractor(BaseService):
                 print(f"  ✅ 新推文 [{tweet_type}]: {tweet_text[:50]}...")
             else:
                 duplicate_count += 1
-                if self.debug_retweet_detection:
-                    print(f"  🔄 跳过重复: {tweet_text[:50]}...")
+                log_detection('duplicate_skipped', text=tweet_text[:50])
         
-        if self.debug_retweet_detection and (filtered_count > 0 or duplicate_count > 0):
-            print(f"    📊 本轮统计: 新增{len(new_tweets)}条, 过滤{filtered_count}条(24h内), 重复{duplicate_count}条")
+        if filtered_count > 0 or duplicate_count > 0:
+            log_detection('round_stats', extracted=len(new_tweets), filtered=filtered_count, duplicates=duplicate_count)
         
         return new_tweets
     
-    def _extract_tweet_data(self, tweet_element):
+    def _extract_tweet_data(self, tweet_element, text_result=None):
         """
         从推文元素中提取数据
         
         Args:
             tweet_element: 推文元素
+            text_result (dict): extract_tweet_texts 对该元素的结果（整批预先取得），None 时单独提取
         
         Returns:
-            dict: 推文数据
+            TweetRecord: 推文记录（兼容dict式访问）
         """
         try:
             # 获取完整文本
             full_text = tweet_element.text.strip()
             
             # 获取推文文本
-            tweet_text = self._extract_tweet_text(tweet_element)
+            tweet_text, status_id = self._extract_tweet_text(tweet_element, text_result)
             if not tweet_text:
                 return None
             
@@ -239,11 +358,9 @@ class TweetExtractor(BaseService):
             
             # 过滤24小时内的推文
             if self._is_today_tweet(date):
-                if self.debug_retweet_detection:
-                    print(f"🚫 跳过24小时内推文: {tweet_text[:50]}... (日期: {date})")
+                log_detection('tweet_filtered', reason='within_24h', date=date, text=tweet_text[:50])
                 return None
-            elif self.debug_retweet_detection:
-                print(f"✅ 保留推文: {tweet_text[:50]}... (日期: {date})")
+            log_detection('tweet_kept', date=date, text=tweet_text[:50])
             
             # 获取互动数据
             interactions = self._extract_interactions(tweet_element)
@@ -251,71 +368,71 @@ class TweetExtractor(BaseService):
             # 检测是否为转发 - 使用新的方法
             is_retweet = self._detect_retweet(tweet_element, full_text, tweet_text)
             
-            return {
-                'text': tweet_text,
-                'full_text': full_text,
-                'date': date,
-                'interactions': interactions,
-                'length': len(tweet_text),
-                'is_retweet': is_retweet
-            }
+            return TweetRecord.from_extraction(
+                tweet_text, date, interactions, is_retweet,
+                full_text=full_text if self.keep_full_text else None,
+                status_id=status_id,
+                # 置顶标识在提取时记录，不依赖是否保存 full_text
+                is_pinned=self.data_processor.is_pinned_full_text(full_text),
+            )
             
         except Exception as e:
             # 不打印错误，静默处理
             return None
     
-    def _extract_tweet_text(self, tweet_element):
-        """提取推文文本 - 使用多种方法"""
-        tweet_text = ""
+    def extract_tweet_texts(self, tweet_elements):
+        """
+        在页面内一次执行正文提取的四级回退（每条推文的代价与其DOM结构无关）
         
-        try:
-            # 方法1：查找tweetText元素
-            text_elements = tweet_element.find_elements(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-            if text_elements:
-                tweet_text = text_elements[0].text.strip()
-        except:
-            pass
+        Args:
+            tweet_elements (list): 推文元素列表
         
-        # 方法2：查找带有lang属性的div
-        if not tweet_text:
-            try:
-                text_elements = tweet_element.find_elements(By.CSS_SELECTOR, 'div[lang]')
-                if text_elements:
-                    tweet_text = text_elements[0].text.strip()
-            except:
-                pass
+        Returns:
+            list: 每个元素对应 {'text': 正文, 'method': 命中的方法, 'status_id': 状态ID}
+        """
+        if not tweet_elements:
+            return []
+        results = self.driver.execute_script(_TWEET_TEXT_SCRIPT, list(tweet_elements))
+        for result in results:
+            method = result.get('method')
+            self.text_methods[method] = self.text_methods.get(method, 0) + 1
+        return results
+    
+    def _batch_tweet_texts(self, tweet_elements):
+        """
+        一次脚本调用取得一批推文的正文结果
+
+        Returns:
+            list: 与 tweet_elements 对应的结果；整批失败（如某个元素已从DOM移除）时全为None，由各条单独提取
+        """
+        try:
+            return self.extract_tweet_texts(tweet_elements)
+        except Exception:
+            return [None] * len(tweet_elements)
+    
+    def _extract_tweet_text(self, tweet_element, result=None):
+        """
+        提取推文文本 - 使用多种方法（一次脚本调用完成全部回退，同时取得状态ID）
         
-        # 方法3：查找所有span元素
-        if not tweet_text:
-            try:
-                text_elements = tweet_element.find_elements(By.CSS_SELECTOR, 'span')
-                for span in text_elements:
-                    span_text = span.text.strip()
-                    if len(span_text) > 10 and not any(keyword in span_text.lower() for keyword in ['follow', 'like', 'retweet', 'reply', 'view', 'share', 'more']):
-                        tweet_text = span_text
-                        break
-            except:
-                pass
+        Args:
+            tweet_element: 推文元素
+            result (dict): 已整批取得的结果，None 时对该元素单独执行一次脚本
         
-        # 方法4：从完整文本中提取
-        if not tweet_text:
-            try:
-                full_text = tweet_element.text.strip()
-                if full_text:
-                    lines = full_text.split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if len(line) > 10 and not any(keyword in line.lower() for keyword in ['follow', 'like', 'retweet', 'reply', 'view', 'share', 'more', '·', '@']):
-                            tweet_text = line
-                            break
-            except:
-                pass
+        Returns:
+            tuple: (正文, 状态ID)；正文太短或提取失败时正文为None
+        """
+        try:
+            if result is None:
+                result = self.extract_tweet_texts([tweet_element])[0]
+        except Exception:
+            return None, None
         
         # 如果推文文本太短，返回None
+        tweet_text = result.get('text')
         if not tweet_text or len(tweet_text) < 5:
-            return None
+            return None, result.get('status_id')
             
-        return tweet_text
+        return tweet_text, result.get('status_id')
     
     def _extract_date(self, tweet_element):
         """提取推文日期"""
@@ -323,7 +440,7 @@ class TweetExtractor(BaseService):
             # 使用原来的方法：从完整文本中提取日期
             full_text = tweet_element.text.strip()
             return self.data_processor.extract_tweet_date(full_text)
-        except:
+        except Exception:
             return "未知"
     
     def _is_today_tweet(self, date_str):
@@ -381,12 +498,12 @@ class TweetExtractor(BaseService):
                         month = month_map[month_str]
                         if month == today.month and day == today.day:
                             return True
-                except:
+                except Exception:
                     pass
                     
             return False
             
-        except:
+        except Exception:
             return False
     
     def _extract_interactions(self, tweet_element):
@@ -394,7 +511,7 @@ class TweetExtractor(BaseService):
         try:
             # 使用原来的改进方法提取互动数据
             return self.data_processor.extract_interactions_from_element_improved(tweet_element)
-        except:
+        except Exception:
             return {"likes": "0", "retweets": "0", "replies": "0", "views": "0"}
     
     def _detect_retweet(self, tweet_element, full_text, tweet_text):
@@ -410,50 +527,42 @@ class TweetExtractor(BaseService):
         Returns:
             bool: 是否为转发
         """
+        # 仅在检测追踪有输出目标时收集过程信息
+        trace = self.debug_retweet_detection and detection_enabled()
+        debug_info = [] if trace else None
         try:
-            debug_info = []
-            
             # 主要检测方法：查找socialContext元素
             # 基于实际观察：转发推文会有socialContext元素包含"reposted"
             social_context_elements = tweet_element.find_elements(By.CSS_SELECTOR, '[data-testid="socialContext"]')
             
-            if social_context_elements:
-                for element in social_context_elements:
-                    element_text = element.text.strip()
+            for element in social_context_elements:
+                element_text = element.text.strip()
+                if trace:
                     debug_info.append(f"socialContext: {element_text}")
-                    
-                    # 检查是否包含"reposted"关键词
-                    if 'reposted' in element_text.lower():
-                        debug_info.append("✓ 检测到转发 - socialContext包含reposted")
-                        if self.debug_retweet_detection:
-                            print(f"    🔍 转发检测: {' | '.join(debug_info)}")
-                        return True
-                    
-                    # 检查中文转发标识
-                    if '转发了' in element_text or '转发' in element_text:
-                        debug_info.append("✓ 检测到转发 - socialContext包含转发")
-                        if self.debug_retweet_detection:
-                            print(f"    🔍 转发检测: {' | '.join(debug_info)}")
-                        return True
-            else:
-                debug_info.append("无socialContext元素")
+                
+                # 检查转发标识（reposted / 转发了 / がリポスト，规则与离线重分类共用）
+                if self.data_processor.is_retweet_context(element_text):
+                    if trace:
+                        log_detection('retweet_detection', result=True, method='socialContext',
+                                      steps=debug_info, text=tweet_text[:50])
+                    return True
             
             # 备用检测：传统的RT格式
-            if tweet_text.strip().startswith('RT @'):
-                debug_info.append("✓ 检测到转发 - RT格式")
-                if self.debug_retweet_detection:
-                    print(f"    🔍 转发检测: {' | '.join(debug_info)}")
+            if RT_PREFIX_RE.match(tweet_text):
+                if trace:
+                    log_detection('retweet_detection', result=True, method='rt_prefix',
+                                  steps=debug_info, text=tweet_text[:50])
                 return True
             
             # 未检测到转发特征
-            debug_info.append("✗ 未检测到转发特征")
-            if self.debug_retweet_detection:
-                print(f"    🔍 转发检测: {' | '.join(debug_info)}")
+            if trace:
+                log_detection('retweet_detection', result=False, method=None,
+                              steps=debug_info or ["无socialContext元素"], text=tweet_text[:50])
             return False
             
         except Exception as e:
             if self.debug_retweet_detection:
-                print(f"    ❌ 转发检测出错: {str(e)}")
+                log_detection('retweet_detection_error', error=str(e), text=tweet_text[:50])
             return False
     
     def _is_today_tweet(self, date):
@@ -469,8 +578,9 @@ class TweetExtractor(BaseService):
         """
         try:
             # 只保留标准的月份+日期格式，如 "Aug 9", "May 15", "Dec 31" 等
-            # 匹配模式：英文月份缩写 + 空格 + 1-2位数字
-            standard_date_pattern = r'^[A-Za-z]{3}\s+\d{1,2}$'
+            # 以及一年以前推文带年份的格式，如 "Dec 31, 2023"
+            # 匹配模式：英文月份缩写 + 空格 + 1-2位数字 [+ 逗号 + 4位年份]
+            standard_date_pattern = r'^[A-Za-z]{3}\s+\d{1,2}(?:,\s*\d{4})?$'
             
             if re.match(standard_date_pattern, date.strip()):
                 # 如果匹配标准日期格式，不过滤（保留）
@@ -481,6 +591,5 @@ class TweetExtractor(BaseService):
             
         except Exception as e:
             # 如果判断出错，默认过滤（安全起见）
-            if self.debug_retweet_detection:
-                print(f"    ⚠️ 日期判断出错: {str(e)}")
+            log_detection('date_check_error', error=str(e), date=date)
             return True
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文记录模块
+紧凑的内存推文记录（__slots__ + 整数互动数 + 解析后的日期），输出时还原为现有的dict结构
+互动数以整数保存，页面显示的文本（如 "15K"）与整数的字符串形式不同时另存一份，
+to_dict() 仍输出原来的显示文本，结果文件格式不变
+"""
+
+from datetime import datetime
+
+from services.data_processor import DataProcessor
+
+
+INTERACTION_KEYS = ('likes', 'retweets', 'replies', 'views')
+
+# 只在有值时才出现在结果dict中的字段（dict式访问时值为空视为不存在）
+_OPTIONAL_KEYS = ('full_text', 'status_id', 'is_pinned')
+# 不对应槽位、由属性计算的字段
+_DERIVED_KEYS = ('date_iso', 'length', 'interactions')
+# 内部槽位，不提供dict式访问
+_INTERNAL_KEYS = ('display_counts',)
+
+_data_processor = DataProcessor()
+
+
+def parse_interaction(text):
+    """
+    把互动数显示文本（"117"、"1,234"、"15K"、"3万"）转换为整数
+
+    Returns:
+        int: 数值，无法解析时为0
+    """
+    if isinstance(text, (int, float)):
+        return int(text)
+    try:
+        return int(round(_data_processor.convert_to_numeric(str(text or '').strip())))
+    except ValueError:
+        return 0
+
+
+class TweetRecord:
+    """
+    紧凑推文记录
+
+    兼容现有代码的dict式访问（tweet['text'] / tweet.get('is_retweet')），
+    full_text 只在开启诊断时保存；dict式访问的语义与 to_dict() 的结果一致
+    """
+
+    __slots__ = ('text', 'date', 'published', 'likes', 'retweets', 'replies', 'views', 'display_counts',
+                 'is_retweet', 'index', 'full_text', 'status_id', 'is_pinned')
+
+    def __init__(self, text, date, likes=0, retweets=0, replies=0, views=0,
+                 is_retweet=False, full_text=None, published=None, index=0, status_id=None,
+                 is_pinned=False, display_counts=None):
+        self.text = text
+        self.date = date
+        self.published = published
+        self.likes = likes
+        self.retweets = retweets
+        self.replies = replies
+        self.views = views
+        # 页面显示的互动数文本（按 INTERACTION_KEYS 顺序），与整数的字符串形式完全相同时为None
+        self.display_counts = display_counts
+        self.is_retweet = is_retweet
+        self.index = index
+        self.full_text = full_text
+        self.status_id = status_id
+        self.is_pinned = is_pinned
+
+    @classmethod
+    def from_extraction(cls, text, date, interactions, is_retweet, full_text=None, status_id=None,
+                        is_pinned=False):
+        """
+        从提取结果构建记录，互动数（如 "117"、"15K"、"3万"）转换为整数，显示文本另存用于输出
+
+        Args:
+            text (str): 推文正文
+            date (str): 页面显示的日期
+            interactions (dict): {'likes': '117', 'views': '15K', ...}
+            is_retweet (bool): 是否为转发
+            full_text (str): 完整文本，仅诊断模式保存
+            status_id (str): 推文状态ID（/status/<id>），取不到时为None
+            is_pinned (bool): 是否为置顶推文（不参与时间线顺序的年份推断）
+        """
+        display = tuple(str(interactions.get(key, '0')) for key in INTERACTION_KEYS)
+        counts = {key: parse_interaction(value) for key, value in zip(INTERACTION_KEYS, display)}
+        if all(value == str(counts[key]) for key, value in zip(INTERACTION_KEYS, display)):
+            display = None
+        return cls(text, date, is_retweet=is_retweet, full_text=full_text, status_id=status_id,
+                   is_pinned=is_pinned, display_counts=display, **counts)
+
+    @classmethod
+    def from_dict(cls, data):
+        """从结果文件中的dict还原记录"""
+        record = cls.from_extraction(
+            data.get('text', ''), data.get('date', ''), data.get('interactions') or {},
+            bool(data.get('is_retweet', False)), full_text=data.get('full_text'),
+            status_id=data.get('status_id'), is_pinned=bool(data.get('is_pinned', False)),
+        )
+        record['date_iso'] = data.get('date_iso')
+        record.index = data.get('index', 0)
+        return record
+
+    @property
+    def date_iso(self):
+        return self.published.date().isoformat() if self.published else None
+
+    @property
+    def length(self):
+        return len(self.text)
+
+    @property
+    def interactions(self):
+        """输出用的互动数文本（页面显示的原文，如 "15K"）"""
+        if self.display_counts is not None:
+            return dict(zip(INTERACTION_KEYS, self.display_counts))
+        return {key: str(getattr(self, key)) for key in INTERACTION_KEYS}
+
+    def to_dict(self, include_full_text=True):
+        """
+        转换为结果文件的dict结构
+
+        Args:
+            include_full_text (bool): 是否输出 full_text（记录中有值时）
+        """
+        data = {'text': self.text}
+        if include_full_text and self._has('full_text'):
+            data['full_text'] = self.full_text
+        data.update({
+            'date': self.date,
+            'date_iso': self.date_iso,
+            'interactions': self.interactions,
+            'length': self.length,
+            'is_retweet': self.is_retweet,
+            'index': self.index,
+        })
+        if self._has('status_id'):
+            data['status_id'] = self.status_id
+        if self._has('is_pinned'):
+            data['is_pinned'] = True
+        return data
+
+    def _has(self, key):
+        value = getattr(self, key)
+        return value is not None and value is not False
+
+    # ---- dict式访问，兼容现有调用方 ----
+
+    def __getitem__(self, key):
+        if key in _INTERNAL_KEYS:
+            raise KeyError(key)
+        if key in _DERIVED_KEYS or (key in self.__slots__ and (key not in _OPTIONAL_KEYS or self._has(key))):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'date_iso':
+            self.published = datetime.fromisoformat(value) if value else None
+        elif key in INTERACTION_KEYS:
+            # 直接设置互动数时，输出文本随之更新为该整数
+            setattr(self, key, parse_interaction(value))
+            if self.display_counts is not None:
+                display = list(self.display_counts)
+                display[INTERACTION_KEYS.index(key)] = str(getattr(self, key))
+                self.display_counts = tuple(display)
+        elif key in self.__slots__ and key not in _INTERNAL_KEYS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"TweetRecord(index={self.index}, date={self.date!r}, is_retweet={self.is_retweet}, text={self.text[:30]!r})"
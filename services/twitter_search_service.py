@@ -6,12 +6,13 @@ Twitter搜索服务模块 - 重构版本
 整合所有分离的功能模块
 """
 
-import time
 from datetime import datetime
 from services.base_service import BaseService
 from services.navigation_service import NavigationService
 from services.user_info_extractor import UserInfoExtractor
 from services.tweet_extractor import TweetExtractor
+from utils.crawl_logger import set_log_context
+from utils.tracing import span, tracer
 
 
 class TwitterSearchService(BaseService):
@@ -20,28 +21,35 @@ class TwitterSearchService(BaseService):
     整合导航、用户信息提取、推文提取等功能
     """
     
-    def __init__(self, debug_port=9222, debug_retweet_detection=False):
+    def __init__(self, debug_port=9222, debug_retweet_detection=False, keep_full_text=None,
+                 base_url="https://x.com"):
         """
         初始化Twitter搜索服务
         
         Args:
             debug_port (int): Chrome调试端口
             debug_retweet_detection (bool): 是否启用转发检测调试模式
+            keep_full_text (bool): 是否保存推文 full_text，默认跟随调试模式
+            base_url (str): 站点根地址，默认线上X（基准测试时指向本地仿X服务器）
         """
         super().__init__(debug_port)
         
         # 初始化各个功能模块
-        self.navigation = NavigationService(debug_port)
+        self.navigation = NavigationService(debug_port, base_url)
         self.user_extractor = UserInfoExtractor(debug_port)
-        self.tweet_extractor = TweetExtractor(debug_port, debug_retweet_detection)
+        self.tweet_extractor = TweetExtractor(debug_port, debug_retweet_detection, keep_full_text)
+        self.last_command_stats = {}
     
-    def search_user_and_get_tweets(self, username, max_tweets=50):
+    def search_user_and_get_tweets(self, username, max_tweets=50, max_total_wait_seconds=600,
+                                   max_scroll_attempts=1000):
         """
         搜索用户并获取推文
         
         Args:
             username (str): 要搜索的用户名
             max_tweets (int): 最大推文数量
+            max_total_wait_seconds (int): 获取推文的等待上限（批量调度按预算传入）
+            max_scroll_attempts (int): 滚动次数上限
         
         Returns:
             dict: 包含用户信息和推文的字典
@@ -50,6 +58,22 @@ class TwitterSearchService(BaseService):
             if not self.connect_to_browser():
                 return None
         
+        if self.command_accounting:
+            self.command_accounting.begin_user(username)
+        tracer.set_context(user=username)
+        set_log_context(user=username)
+        try:
+            with span('search_user_and_get_tweets', cat='user'):
+                return self._search_user_and_get_tweets(username, max_tweets, max_total_wait_seconds,
+                                                        max_scroll_attempts)
+        finally:
+            tracer.set_context(user=None)
+            set_log_context(user=None)
+            if self.command_accounting:
+                self.last_command_stats = self.command_accounting.end_user()
+    
+    def _search_user_and_get_tweets(self, username, max_tweets, max_total_wait_seconds, max_scroll_attempts):
+        """search_user_and_get_tweets 的实现（外层负责按用户统计WebDriver命令）"""
         try:
             print(f"🔍 开始搜索用户 @{username}")
             
@@ -62,7 +86,7 @@ class TwitterSearchService(BaseService):
                 return None
             
             # 等待用户页面加载
-            time.sleep(3)  # 进一步优化页面加载等待时间到3秒
+            self.pause(3, 'user_page_load')  # 进一步优化页面加载等待时间到3秒
             
             # 验证是否导航到正确的用户页面
             if not self.navigation.verify_user_page(username):
@@ -75,23 +99,38 @@ class TwitterSearchService(BaseService):
             # 如果用户信息获取失败，尝试重新获取
             if user_info['display_name'] == '未知':
                 print("重新尝试获取用户信息...")
-                time.sleep(2)  # 进一步优化重试等待时间到2秒
+                self.pause(2, 'user_info_retry')  # 进一步优化重试等待时间到2秒
                 user_info = self.user_extractor.extract_user_info(username)
             
-            # 检查是否获取到了粉丝信息
+            # 资料页为错误/限流页面时退避重试，避免把限流误判为“无粉丝信息”
             followers_count = user_info.get('followers_count', 0)
+            page_error = None
+            for attempt in range(3):
+                if followers_count != 0:
+                    break
+                page_error = self.handle_page_error(attempt)
+                if not page_error:
+                    break
+                user_info = self.user_extractor.extract_user_info(username)
+                followers_count = user_info.get('followers_count', 0)
+            if followers_count == 0 and page_error:
+                print(f"⚠️ 用户 @{username} 的资料页持续为错误/限流页面，稍后重试")
+                return {'error': page_error['kind'], 'username': username}
+            
+            # 检查是否获取到了粉丝信息
             if followers_count == 0:
                 print(f"⚠️ 用户 @{username} 未获取到粉丝信息，停止处理该用户")
                 return {'error': 'no_followers_info', 'username': username}
             
             # 获取推文：不足50时会继续尝试，直到达标或达到保护阈值
-            tweets = self.tweet_extractor.get_user_tweets(
-                max_tweets=max_tweets,
-                wait_until_reach=True,
-                max_total_wait_seconds=600,
-                max_scroll_attempts=1000,
-                max_no_new_tweets=200,
-            )
+            with span('get_user_tweets', cat='tweets'):
+                tweets = self.tweet_extractor.get_user_tweets(
+                    max_tweets=max_tweets,
+                    wait_until_reach=True,
+                    max_total_wait_seconds=max_total_wait_seconds,
+                    max_scroll_attempts=max_scroll_attempts,
+                    max_no_new_tweets=200,
+                )
             
             # 合并数据
             result = {
@@ -99,7 +138,8 @@ class TwitterSearchService(BaseService):
                 'user_info': user_info,
                 'tweets': tweets,
                 'scraped_at': datetime.now().isoformat(),
-                'tweets_count': len(tweets)
+                'tweets_count': len(tweets),
+                'stop_reason': self.tweet_extractor.last_stop_reason
             }
             
             print(f"✅ 成功获取用户 @{username} 的信息和 {len(tweets)} 条推文")
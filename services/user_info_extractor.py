@@ -6,13 +6,215 @@
 """
 
 import re
-from selenium.webdriver.common.by import By
 from services.base_service import BaseService
+from services.data_processor import DataProcessor
+from utils.selector_registry import selector_registry
+from utils.tracing import traced
+
+# 各字段的选择器链（按顺序尝试，命中第一个有效值即停止；实际顺序由 selector_registry 按命中率调整）
+USER_INFO_SELECTORS = {
+    'display_name': [
+        '[data-testid="UserName"]',
+        '[data-testid="UserName"] span',
+        'h1[data-testid="UserName"]',
+        '[data-testid="UserName"] div'
+    ],
+    'description': [
+        '[data-testid="UserDescription"]',
+        '[data-testid="UserBio"]',
+        '.css-1rynq56'
+    ],
+    'location': [
+        '[data-testid="UserLocation"]',
+        '[data-testid="UserProfileHeader_Items"] span'
+    ],
+    'verified': [
+        '[data-testid="UserName"] [data-testid="icon-verified"]',
+        '[data-testid="UserVerifiedBadge"]'
+    ],
+    'followers_count': [
+        'a[href*="/verified_followers"] span',
+        'a[href*="/followers"] span',
+        '[data-testid="UserFollowersCount"]',
+        '[data-testid="UserProfileStats"] a[href*="/followers"] span',
+        'a[href*="/followers"]',
+        '[data-testid="UserProfileStats"] span'
+    ],
+    'following_count': [
+        'a[href*="/following"] span',
+        '[data-testid="UserFollowingCount"]',
+        '[data-testid="UserProfileStats"] a[href*="/following"] span',
+        'a[href*="/following"]'
+    ],
+    'tweets_count': [
+        '[data-testid="UserTweetsCount"]',
+        '[data-testid="UserProfileStats"] span',
+        '[data-testid="UserProfileStats"] div',
+        '[data-testid="primaryColumn"] h2 + div',
+        '[data-testid="primaryColumn"] span'
+    ]
+}
+
+# 各字段链末尾的宽泛兜底选择器：可能命中无关元素，只在具体选择器都未命中时尝试，不随命中率提前
+USER_INFO_FALLBACK_SELECTORS = {
+    'description': ['.css-1rynq56'],
+    'location': ['[data-testid="UserProfileHeader_Items"] span'],
+    'followers_count': ['[data-testid="UserProfileStats"] span'],
+    'tweets_count': [
+        '[data-testid="UserProfileStats"] span',
+        '[data-testid="UserProfileStats"] div',
+        '[data-testid="primaryColumn"] h2 + div',
+        '[data-testid="primaryColumn"] span'
+    ]
+}
+
+# 资料页全部字段（一次脚本调用）。arguments[0] 为用户名，arguments[1] 为各字段排序后的选择器链；
+# 文本字段按选择器链取第一个非空文本，计数字段按与逐元素提取相同的规则清洗（保留数字与 K/M/B/万），
+# 推文数只接受带 posts/推文 等关键词的文本。status 为 loading 表示仍是上一个页面或尚未渲染完成，
+# matched 为各字段命中的选择器（供 selector_registry 统计）
+_USER_INFO_SCRIPT = r"""
+var username = arguments[0].toLowerCase(), chains = arguments[1];
+var TWEETS_KEYWORD = /tweet|post|推文|条|件のポスト/i;
+var SCAN_LIMIT = 50;
+var matched = {};
+
+function firstText(field) {
+  var chain = chains[field];
+  for (var i = 0; i < chain.length; i++) {
+    var el = document.querySelector(chain[i]);
+    var text = el ? (el.innerText || '').trim() : '';
+    if (text) { matched[field] = chain[i]; return text; }
+  }
+  return null;
+}
+function firstCount(field, keyword) {
+  var chain = chains[field];
+  for (var i = 0; i < chain.length; i++) {
+    var els = document.querySelectorAll(chain[i]);
+    for (var j = 0; j < els.length && j < SCAN_LIMIT; j++) {
+      var text = (els[j].textContent || '').trim();
+      if (!text || (keyword && !keyword.test(text))) continue;
+      var cleaned = text.replace(/[^\d.KMB万]/g, '');
+      if (cleaned && /\d/.test(cleaned) && parseFloat(cleaned) !== 0) { matched[field] = chain[i]; return cleaned; }
+    }
+  }
+  return null;
+}
+
+var header = document.querySelector('[data-testid="UserName"]');
+var path = (location.pathname.split('/')[1] || '').toLowerCase();
+var status = 'ok';
+if (path !== username || !header || (header.innerText || '').toLowerCase().indexOf('@' + username) < 0) {
+  var body = document.body ? (document.body.innerText || '').slice(0, 2000) : '';
+  status = 'loading';
+  if (path === username) {
+    if (/doesn.t exist|不存在|存在しません/i.test(body)) status = 'not_found';
+    else if (/suspended|已被冻结|凍結/i.test(body)) status = 'suspended';
+    else if (document.querySelector('[data-testid="error-detail"]') ||
+             /(^|\n)\s*(retry|try again|重试|再試行|やり直す)\s*(\n|$)/i.test(body)) {
+      status = /rate limit|too many requests|请求过多/i.test(body) ? 'rate_limited' : 'page_error';
+    }
+  }
+}
+
+var verified = false;
+for (var v = 0; v < chains.verified.length && !verified; v++) {
+  verified = !!document.querySelector(chains.verified[v]);
+  if (verified) matched.verified = chains.verified[v];
+}
+var name = firstText('display_name');
+return {
+  status: status,
+  display_name: name ? name.split('\n')[0].trim() : null,
+  description: firstText('description'),
+  location: firstText('location'),
+  verified: verified,
+  followers_count: firstCount('followers_count'),
+  following_count: firstCount('following_count'),
+  tweets_count: firstCount('tweets_count', TWEETS_KEYWORD),
+  matched: matched
+};
+"""
+
+_COUNT_FIELDS = ('followers_count', 'following_count', 'tweets_count')
+
+_data_processor = DataProcessor()
+
+
+def parse_count(value):
+    """
+    把计数文本（"195.9K"、"1,234"、"1.2万"）转换为整数
+
+    Returns:
+        int: 数值，无法解析时为0
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    cleaned = re.sub(r'[^\d.KMB万]', '', value or '')
+    try:
+        return int(round(_data_processor.convert_to_numeric(cleaned)))
+    except ValueError:
+        return 0
+
+
+def build_user_info(username, profile=None):
+    """
+    组装用户信息：read_profile 未取到的字段使用默认值
+    
+    Args:
+        username (str): 用户名
+        profile (dict): read_profile 的结果，None 表示全部使用默认值
+    
+    Returns:
+        dict: 用户信息
+    """
+    user_info = {
+        'username': username,
+        'display_name': '未知',
+        'description': '无法获取',
+        'location': '未知',
+        'verified': False,
+        'followers_count': 0,
+        'following_count': 0,
+        'tweets_count': 0
+    }
+    for field, value in (profile or {}).items():
+        if field in user_info and field != 'username' and value not in (None, ''):
+            user_info[field] = value
+    return user_info
 
 
 class UserInfoExtractor(BaseService):
     """用户信息提取器，提取Twitter用户的详细信息"""
     
+    def read_profile(self, username):
+        """
+        一次脚本调用读取资料页全部字段
+        
+        Args:
+            username (str): 用户名
+        
+        Returns:
+            dict: status（ok / loading / not_found / suspended / page_error / rate_limited）与各字段，
+                  计数已转换为整数，未找到的字段为None
+        """
+        chains = {field: selector_registry.ordered(f'user_info.{field}', selectors,
+                                                   USER_INFO_FALLBACK_SELECTORS.get(field, ()))
+                  for field, selectors in USER_INFO_SELECTORS.items()}
+        profile = self.driver.execute_script(_USER_INFO_SCRIPT, username, chains)
+        matched = profile.pop('matched', None) or {}
+        if profile.get('status') == 'ok':
+            # 页面内的未命中不产生往返，但同样记录，用于发现DOM改版
+            for field, chain in chains.items():
+                hit = matched.get(field)
+                tried = chain[:chain.index(hit) + 1] if hit in chain else chain
+                selector_registry.record(f'user_info.{field}', tried, hit)
+        for field in _COUNT_FIELDS:
+            if profile.get(field) is not None:
+                profile[field] = parse_count(profile[field])
+        return profile
+    
+    @traced(cat='user_info')
     def extract_user_info(self, username):
         """
         提取用户信息
@@ -21,19 +223,25 @@ class UserInfoExtractor(BaseService):
             username (str): 用户名
         
         Returns:
-            dict: 用户信息
+            dict: 用户信息（粉丝数 / 关注数 / 推文数为整数）
         """
         try:
-            user_info = {
-                'username': username,
-                'display_name': '未知',
-                'description': '无法获取',
-                'location': '未知',
-                'verified': False,
-                'followers_count': 0,
-                'following_count': 0,
-                'tweets_count': 0
-            }
+            user_info = build_user_info(username, self.read_profile(username))
+        except Exception as e:
+            # 脚本执行失败时退回逐字段的选择器链
+            print(f"一次性提取用户信息失败（{str(e)}），改为逐项提取")
+            return self._extract_user_info_by_elements(username)
+        
+        print(f"✅ 已提取用户信息: {user_info['display_name']}")
+        print(f"📊 粉丝数: {user_info['followers_count']}")
+        print(f"📍 位置: {user_info['location']}")
+        print(f"✅ 认证状态: {user_info['verified']}")
+        return user_info
+    
+    def _extract_user_info_by_elements(self, username):
+        """逐字段查找元素提取用户信息（一次性脚本不可用时的回退路径）"""
+        try:
+            user_info = build_user_info(username)
             
             # 获取显示名称
             self._extract_display_name(user_info)
@@ -64,195 +272,83 @@ class UserInfoExtractor(BaseService):
             
         except Exception as e:
             print(f"提取用户信息时出错: {str(e)}")
-            return {
-                'username': username, 
-                'display_name': '未知', 
-                'description': '无法获取', 
-                'location': '未知', 
-                'verified': False,
-                'followers_count': 0,
-                'following_count': 0,
-                'tweets_count': 0
-            }
+            return build_user_info(username)
+    
+    def _first_text(self, field):
+        """按字段的选择器链返回第一个非空文本"""
+        return selector_registry.find(
+            self.driver, f'user_info.{field}', USER_INFO_SELECTORS[field],
+            accept=lambda element: element.text.strip(), max_elements=1,
+            fallbacks=USER_INFO_FALLBACK_SELECTORS.get(field, ()))
+    
+    def _first_count(self, field, keywords=None):
+        """按字段的选择器链返回第一个非零计数（整数），keywords 限定文本必须包含的关键词"""
+        def accept(element):
+            text = element.text.strip()
+            if not text or (keywords and not any(k in text.lower() for k in keywords)):
+                return 0
+            return parse_count(text)
+        
+        # 与页面内脚本一致，每个选择器最多检查前50个元素（宽泛的选择器在长时间线上会匹配上千个）
+        return selector_registry.find(
+            self.driver, f'user_info.{field}', USER_INFO_SELECTORS[field],
+            accept=accept, max_elements=50, fallbacks=USER_INFO_FALLBACK_SELECTORS.get(field, ())) or 0
     
     def _extract_display_name(self, user_info):
         """提取显示名称"""
         try:
-            name_selectors = [
-                '[data-testid="UserName"]',
-                '[data-testid="UserName"] span',
-                'h1[data-testid="UserName"]',
-                '[data-testid="UserName"] div'
-            ]
-            
-            for selector in name_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    user_info['display_name'] = elements[0].text.strip()
-                    break
+            name = self._first_text('display_name')
+            if name:
+                user_info['display_name'] = name.split('\n')[0].strip()
         except Exception as e:
             print(f"提取显示名称时出错: {str(e)}")
     
     def _extract_description(self, user_info):
         """提取个人简介"""
         try:
-            bio_selectors = [
-                '[data-testid="UserDescription"]',
-                '[data-testid="UserBio"]',
-                '.css-1rynq56'
-            ]
-            
-            for selector in bio_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    user_info['description'] = elements[0].text.strip()
-                    break
+            description = self._first_text('description')
+            if description is not None:
+                user_info['description'] = description
         except Exception as e:
             print(f"提取个人简介时出错: {str(e)}")
     
     def _extract_location(self, user_info):
         """提取位置信息"""
         try:
-            location_selectors = [
-                '[data-testid="UserLocation"]',
-                '[data-testid="UserProfileHeader_Items"] span'
-            ]
-            
-            for selector in location_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    user_info['location'] = elements[0].text.strip()
-                    break
+            location = self._first_text('location')
+            if location is not None:
+                user_info['location'] = location
         except Exception as e:
             print(f"提取位置信息时出错: {str(e)}")
     
     def _extract_verified_status(self, user_info):
         """检查认证状态"""
         try:
-            verified_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="UserVerifiedBadge"]')
-            if verified_elements:
-                user_info['verified'] = True
+            user_info['verified'] = selector_registry.find(
+                self.driver, 'user_info.verified', USER_INFO_SELECTORS['verified']) is not None
         except Exception as e:
             print(f"检查认证状态时出错: {str(e)}")
     
     def _extract_followers_count(self, user_info):
         """获取粉丝数"""
         try:
-            # 调试：打印页面上所有包含"followers"的元素
-            print("🔍 调试：搜索粉丝数元素...")
-            all_followers_elements = self.driver.find_elements(By.CSS_SELECTOR, '*[href*="/followers"]')
-            print(f"找到 {len(all_followers_elements)} 个包含followers链接的元素")
-            for i, elem in enumerate(all_followers_elements[:5]):  # 只打印前5个
-                print(f"  元素 {i+1}: {elem.text.strip()}")
-            
-            # 调试：打印所有verified_followers链接
-            verified_followers_elements = self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="/verified_followers"]')
-            print(f"找到 {len(verified_followers_elements)} 个verified_followers链接")
-            for i, elem in enumerate(verified_followers_elements):
-                print(f"  verified_followers {i+1}: {elem.text.strip()}")
-            
-            # 调试：打印所有UserProfileStats元素
-            profile_stats_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="UserProfileStats"]')
-            print(f"找到 {len(profile_stats_elements)} 个UserProfileStats元素")
-            for i, elem in enumerate(profile_stats_elements):
-                print(f"  UserProfileStats {i+1}: {elem.text.strip()}")
-            
-            followers_selectors = [
-                'a[href*="/verified_followers"] span',
-                'a[href*="/followers"] span',
-                '[data-testid="UserFollowersCount"]',
-                '[data-testid="UserProfileStats"] a[href*="/followers"] span',
-                'a[href*="/followers"]',
-                '[data-testid="UserProfileStats"] span',
-                '[data-testid="UserProfileStats"] a[href*="/followers"]',
-                'a[href*="/followers"] div',
-                '[data-testid="UserProfileStats"] div a[href*="/followers"]',
-                '[data-testid="UserProfileStats"] a[href*="/followers"] div',
-                'div[data-testid="UserProfileStats"] a[href*="/followers"]',
-                'div[data-testid="UserProfileStats"] a[href*="/followers"] span',
-                'div[data-testid="UserProfileStats"] a[href*="/followers"] div',
-                'a[href*="/followers"] strong',
-                'a[href*="/followers"] b',
-                'a[href*="/followers"] span strong',
-                'a[href*="/followers"] span b',
-                '[data-testid="UserProfileStats"] a[href*="/followers"] strong',
-                '[data-testid="UserProfileStats"] a[href*="/followers"] b',
-                'div[data-testid="UserProfileStats"] a[href*="/followers"] strong',
-                'div[data-testid="UserProfileStats"] a[href*="/followers"] b'
-            ]
-            
-            for selector in followers_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    for element in elements:
-                        followers_text = element.text.strip()
-                        # 提取数字，处理K、M等单位
-                        if followers_text:
-                            # 移除逗号和其他非数字字符，保留K、M等
-                            followers_clean = re.sub(r'[^\d.KMB万]', '', followers_text)
-                            if followers_clean and followers_clean != '0':
-                                user_info['followers_count'] = followers_clean
-                                print(f"找到粉丝数: {followers_clean}")
-                                break
-                    if user_info['followers_count'] != 0:
-                        break
+            user_info['followers_count'] = self._first_count('followers_count')
+            if user_info['followers_count']:
+                print(f"找到粉丝数: {user_info['followers_count']}")
         except Exception as e:
             print(f"获取粉丝数时出错: {str(e)}")
     
     def _extract_following_count(self, user_info):
         """获取关注数"""
         try:
-            following_selectors = [
-                'a[href*="/following"] span',
-                '[data-testid="UserFollowingCount"]',
-                '[data-testid="UserProfileStats"] a[href*="/following"] span',
-                'a[href*="/following"]',
-                'a[href*="/following"] div',
-                'a[href*="/following"] strong',
-                'a[href*="/following"] b'
-            ]
-            
-            for selector in following_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    for element in elements:
-                        following_text = element.text.strip()
-                        if following_text:
-                            # 移除逗号和其他非数字字符，保留K、M等
-                            following_clean = re.sub(r'[^\d.KMB万]', '', following_text)
-                            if following_clean and following_clean != '0':
-                                user_info['following_count'] = following_clean
-                                print(f"找到关注数: {following_clean}")
-                                break
-                    if user_info['following_count'] != 0:
-                        break
+            user_info['following_count'] = self._first_count('following_count')
         except Exception as e:
             print(f"获取关注数时出错: {str(e)}")
     
     def _extract_tweets_count(self, user_info):
         """获取推文数"""
         try:
-            # Twitter的推文数通常显示在用户资料的统计信息中
-            tweets_selectors = [
-                '[data-testid="UserTweetsCount"]',
-                '[data-testid="UserProfileStats"] span',
-                '[data-testid="UserProfileStats"] div'
-            ]
-            
-            for selector in tweets_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    for element in elements:
-                        tweets_text = element.text.strip()
-                        # 查找包含"tweet"或"推文"的文本
-                        if any(keyword in tweets_text.lower() for keyword in ['tweet', 'post', '推文', '条']):
-                            # 提取数字
-                            tweets_clean = re.sub(r'[^\d.KMB万]', '', tweets_text)
-                            if tweets_clean and tweets_clean != '0':
-                                user_info['tweets_count'] = tweets_clean
-                                print(f"找到推文数: {tweets_clean}")
-                                break
-                    if user_info['tweets_count'] != 0:
-                        break
+            # Twitter的推文数通常显示在资料页顶部（"1,234 posts"），只接受带关键词的文本
+            user_info['tweets_count'] = self._first_count('tweets_count', ['tweet', 'post', '推文', '条'])
         except Exception as e:
             print(f"获取推文数时出错: {str(e)}")
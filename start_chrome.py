@@ -9,27 +9,19 @@ import time
 import os
 import sys
 
+from utils.chrome_pool import devtools_version, find_chrome_binary
+
 def start_chrome_debug():
     """Start Chrome Debug Mode"""
     print("🚀 Chrome Debug Mode Launcher")
     print("=" * 40)
     
-    # Chrome paths
-    chrome_paths = [
-        r"C:\Users\David Wu\AppData\Local\Google\Chrome\Application\chrome.exe",
-        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-    ]
-    
-    chrome_path = None
-    for path in chrome_paths:
-        if os.path.exists(path):
-            chrome_path = path
-            break
+    # Chrome path (Windows / macOS / Linux, or the CHROME_BINARY environment variable)
+    chrome_path = find_chrome_binary()
     
     if not chrome_path:
         print("❌ Error: Chrome browser not found")
-        print("Please ensure Chrome is properly installed")
+        print("Please ensure Chrome is properly installed, or set CHROME_BINARY")
         return False
     
     print(f"✅ Found Chrome: {chrome_path}")
@@ -42,7 +34,7 @@ def start_chrome_debug():
     cmd = [
         chrome_path,
         f"--remote-debugging-port={debug_port}",
-        f"--user-data-dir={user_data_dir}",
+        f"--user-data-dir={os.path.abspath(user_data_dir)}",
         "--no-first-run",
         "--no-default-browser-check"
     ]
@@ -57,8 +49,13 @@ def start_chrome_debug():
         # Launch Chrome
         process = subprocess.Popen(cmd)
         
-        # Wait for startup
-        time.sleep(3)
+        # Wait for the DevTools endpoint
+        deadline = time.time() + 15
+        while time.time() < deadline and not devtools_version(debug_port):
+            if process.poll() is not None:
+                print("❌ Chrome exited during startup")
+                return False
+            time.sleep(0.5)
         
         print("✅ Chrome Started!")
         print()
@@ -69,8 +66,9 @@ def start_chrome_debug():
         print("4. Then run twitter_search_with_existing_browser.py")
         print()
         
-        # Wait for user confirmation
-        input("Press Enter to test connection...")
+        # Wait for user confirmation (skipped when not run from a terminal)
+        if sys.stdin.isatty():
+            input("Press Enter to test connection...")
         
         # Test connection
         print("🔍 Testing Chrome connection...")
@@ -99,9 +97,10 @@ def main():
     else:
         print("\n❌ Setup failed!")
         print("Please manually start Chrome with the following command:")
-        print("chrome.exe --remote-debugging-port=9222 --user-data-dir=chrome_debug_profile")
+        print("chrome --remote-debugging-port=9222 --user-data-dir=chrome_debug_profile")
     
-    input("\nPress Enter to exit...")
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
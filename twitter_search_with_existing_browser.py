@@ -5,19 +5,82 @@ Twitter搜索程序 - 使用现有浏览器会话
 在已经打开的Chrome浏览器中搜索用户并获取推文
 """
 
+import argparse
 import time
-import json
 import sys
 import os
 from datetime import datetime
 from services.twitter_search_service import TwitterSearchService
 from services.data_processor import DataProcessor
-import re # Added for date parsing
+from utils.result_reader import compression_suffix, write_users, zstandard
+from utils.crawl_logger import setup_crawl_logging, shutdown_crawl_logging
+from utils.crawl_metrics import metrics, start_metrics_server
+from utils.batch_scheduler import BatchScheduler, load_post_counts
+from utils.profiling import RunProfiler
+from utils.rate_controller import rate_controller
+from utils.selector_registry import selector_registry
+from utils.tracing import span, tracer
+from utils.tab_memory import TabMemoryGovernor
+from utils.tweet_dedup import NearDuplicateIndex
+from utils.watchdog import CrawlWatchdog, WatchdogAbort
+from utils.webdriver_cassette import CassetteRecorder
 
 def main():
     """
     主函数 - 使用现有浏览器会话搜索Twitter用户
     """
+    parser = argparse.ArgumentParser(description='使用现有浏览器会话批量搜索Twitter用户')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='记录各阶段耗时并导出为trace-event JSON（chrome://tracing / Perfetto 可打开）')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='在 http://127.0.0.1:PORT/metrics 暴露Prometheus格式的运行指标')
+    parser.add_argument('--log-level', default='INFO',
+                        help='控制台日志级别，DEBUG 时转发检测等诊断信息也输出到控制台')
+    parser.add_argument('--detection-log', metavar='PATH',
+                        help='转发检测/日期过滤追踪写入的JSONL文件')
+    parser.add_argument('--detection-sample', type=float, default=1.0, metavar='RATE',
+                        help='检测追踪保留比例（0~1，默认全部保留；未采中的记录不入队）')
+    parser.add_argument('--profile', action='store_true',
+                        help='cProfile + 用户间tracemalloc快照，报告写入 results/')
+    parser.add_argument('--record-cassette', metavar='PATH',
+                        help='录制所有WebDriver命令与响应（.json/.json.gz），供 scripts/benchmark_replay.py 离线回放')
+    parser.add_argument('--memory-log', metavar='PATH',
+                        help='标签页内存采样历史（JSONL）：滚动中与用户之间的JS堆/DOM节点数及回收记录')
+    parser.add_argument('--max-heap-mb', type=float, default=400,
+                        help='标签页JS堆阈值（MB），用户之间超过则回收标签页')
+    parser.add_argument('--max-dom-nodes', type=int, default=100000,
+                        help='标签页DOM节点数阈值，用户之间超过则回收标签页')
+    parser.add_argument('--no-tab-recycle', action='store_true',
+                        help='关闭标签页内存采样与回收')
+    parser.add_argument('--command-timeout', type=float, default=60, metavar='SECONDS',
+                        help='单条WebDriver命令超时，超时或渲染卡死时关闭标签页并重新排队该用户（0 关闭看门狗）')
+    parser.add_argument('--user-deadline', type=float, default=900, metavar='SECONDS',
+                        help='单个用户的截止时间（秒）')
+    parser.add_argument('--min-delay', type=float, default=1.0, metavar='SECONDS',
+                        help='用户间自适应等待的下限（初始5秒，连续成功时逐步缩短到该值）')
+    parser.add_argument('--time-budget', type=float, metavar='MINUTES',
+                        help='整批总时间预算（分钟）：按历史耗时排序、动态分配每个用户的预算，并用剩余预算重访未达标的用户')
+    parser.add_argument('--probe-results', nargs='+', default=[], metavar='JSONL',
+                        help='probe_profiles.py 的结果，用其中的资料页推文数估计没有历史的用户的耗时（需配合 --time-budget）')
+    parser.add_argument('--near-dup', choices=['off', 'user', 'batch'], default='off',
+                        help='SimHash近重复去重：user 只在同一用户时间线内，batch 同时跨整批用户（默认关闭）')
+    parser.add_argument('--near-dup-distance', type=int, default=6, metavar='BITS',
+                        help='视为近重复的最大海明距离（64位指纹，默认6）')
+    parser.add_argument('--near-dup-capacity', type=int, default=100000, metavar='N',
+                        help='整批近重复索引最多保留的指纹数，超出后淘汰最早的')
+    parser.add_argument('--compress', choices=['none', 'gzip', 'zstd'], default='none',
+                        help='结果JSON压缩格式（gzip / zstd 输出紧凑JSON到 .json.gz / .json.zst，zstd 需安装 zstandard）')
+    args = parser.parse_args()
+    if args.compress == 'zstd' and zstandard is None:
+        parser.error('--compress zstd 需要安装 zstandard: pip install zstandard')
+    rate_controller.min_delay = args.min_delay
+    setup_crawl_logging(args.log_level, args.detection_log, args.detection_sample)
+    if args.trace:
+        tracer.enable()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+        print(f"📈 运行指标: http://127.0.0.1:{args.metrics_port}/metrics")
+    
     # 记录开始时间
     start_time = datetime.now()
     print("🚀 启动Twitter搜索程序（使用现有浏览器会话）...")
@@ -138,9 +201,13 @@ def main():
     print("请确保Chrome浏览器已打开并访问了 https://x.com/home")
     print("=" * 60)
     
-    # 是否启用转发检测调试模式（设置为True可以看到详细的检测过程）
+    # 是否启用转发检测调试模式（检测过程写入 --detection-log 或在 --log-level DEBUG 时输出到控制台）
     debug_retweet_detection = True  # 启用调试模式验证日期过滤
     
+    # 结果JSON压缩格式（--compress）：None（普通JSON）/ 'gzip' / 'zstd'（需安装zstandard）
+    # 推文 full_text 仅在调试模式下保存，关闭调试可进一步缩小结果文件
+    output_compression = None if args.compress == 'none' else args.compress
+    
     # 创建Twitter搜索服务实例
     search_service = TwitterSearchService(debug_port=9222, debug_retweet_detection=debug_retweet_detection)
     
@@ -153,74 +220,203 @@ def main():
         print("3. 如果需要，请使用以下命令启动Chrome调试模式：")
         print("   chrome.exe --remote-debugging-port=9222 --user-data-dir=chrome_debug_profile")
         return
+    metrics.command_accounting = search_service.command_accounting
+    recorder = CassetteRecorder.install(search_service.driver) if args.record_cassette else None
+    profiler = RunProfiler('crawl_profile') if args.profile else None
+    memory_governor = None
+    if not args.no_tab_recycle:
+        memory_governor = TabMemoryGovernor(search_service.driver, args.max_heap_mb, args.max_dom_nodes,
+                                            history_path=args.memory_log)
+        search_service.tweet_extractor.memory_governor = memory_governor
+        try:
+            # 在专用标签页中爬取，回收时只关闭它，已登录的调试标签页保持原样
+            memory_governor.open_crawl_tab()
+        except Exception as e:
+            print(f"⚠️ 无法打开爬取标签页（{e}），在当前标签页中爬取且不会关闭它")
+    if args.near_dup != 'off':
+        search_service.tweet_extractor.near_duplicates = True
+        search_service.tweet_extractor.near_duplicate_distance = args.near_dup_distance
+    if args.near_dup == 'batch':
+        search_service.tweet_extractor.batch_near_duplicates = NearDuplicateIndex(
+            args.near_dup_distance, args.near_dup_capacity)
+    watchdog = None
+    if args.command_timeout > 0:
+        watchdog = CrawlWatchdog(search_service.debug_port, args.command_timeout, args.user_deadline)
+        watchdog.install(search_service.driver)
+        search_service.tweet_extractor.watchdog = watchdog
+    requeued = {}  # 因看门狗故障或限流重新排队的用户 -> 次数
+    # 总时间预算下按历史耗时排序并动态分配每个用户的预算；不设预算时保持原顺序与每用户600秒/1000次滚动上限
+    scheduler = BatchScheduler(target_usernames, args.time_budget * 60 if args.time_budget else None,
+                               target_tweets=50, post_counts=load_post_counts(args.probe_results))
+    if profiler:
+        profiler.start()
+    
+    def recover_browser():
+        """看门狗故障后恢复标签页或浏览器连接（新连接时同步到各组件），返回是否可以继续"""
+        driver = watchdog.recover(search_service.driver)
+        if not driver:
+            return False
+        if driver is not search_service.driver:
+            # 新连接上沿用原统计器与录制器，运行汇总与卡带不丢失重连前的命令
+            search_service.attach_driver(driver, search_service.command_accounting)
+            metrics.command_accounting = search_service.command_accounting
+            if recorder:
+                CassetteRecorder.install(driver, recorder)
+            if memory_governor:
+                memory_governor.driver = driver
+        return True
     
+    data_processor = DataProcessor()
     successful_users = []
     failed_users = []
     skipped_users = []  # 因为粉丝数为0而跳过的用户
     insufficient_users = []  # 未达到50条的用户
     
     try:
-        for index, username in enumerate(target_usernames, 1):
-            print(f"\n[{index}/{len(target_usernames)}] 正在搜索用户 @{username}...")
+        for index, task in enumerate(scheduler, 1):
+            username = task.username
+            print(f"\n[{index}/{scheduler.planned}] 正在搜索用户 @{username}..."
+                  f"{'（重访）' if task.revisit else ''}")
+            if scheduler.total_budget:
+                print(f"⏳ 本用户预算 {task.budget_seconds:.0f} 秒，剩余总预算 {scheduler.remaining_budget() / 60:.1f} 分钟")
             print("-" * 40)
             
             # 搜索用户并获取推文
-            result = search_service.search_user_and_get_tweets(username, max_tweets=50)
+            metrics.user_started(username)
+            if recorder:
+                recorder.begin_user(username, 50)
+            user_started_at = time.time()
+            try:
+                if watchdog:
+                    watchdog.begin_user(search_service.driver, username)
+                result = search_service.search_user_and_get_tweets(
+                    username, max_tweets=50,
+                    max_total_wait_seconds=task.max_total_wait_seconds,
+                    max_scroll_attempts=task.max_scroll_attempts,
+                )
+            except WatchdogAbort:
+                result = None
+            if recorder:
+                recorder.end_user(result)
+            scheduler.record(task, result, time.time() - user_started_at)
             
-            if result:
+            # 命令超时 / 渲染卡死 / 超过截止时间：恢复标签页或浏览器连接，并把该用户重新排队一次
+            incident = watchdog.end_user() if watchdog else None
+            if incident:
+                metrics.record_stop(incident['reason'])
+                if not recover_browser():
+                    print("❌ 无法恢复浏览器连接，停止批量搜索")
+                    failed_users.append(username)
+                    metrics.user_finished('failed')
+                    break
+                if requeued.get(username, 0) < 1:
+                    requeued[username] = requeued.get(username, 0) + 1
+                    scheduler.requeue(username)
+                    metrics.user_finished('requeued')
+                    print(f"🔁 @{username} 已重新排队（{incident['reason']}）")
+                    continue
+            
+            if isinstance(result, dict) and result.get('error') in ('rate_limited', 'page_error'):
+                # 资料页被限流或出错：重新排队一次，等待时长由速率控制器按限流情况拉长
+                if requeued.get(username, 0) < 1:
+                    requeued[username] = requeued.get(username, 0) + 1
+                    scheduler.requeue(username)
+                    metrics.user_finished('requeued')
+                    print(f"🔁 @{username} 已重新排队（{result['error']}）")
+                else:
+                    failed_users.append(username)
+                    metrics.user_finished('failed')
+            elif result:
                 # 检查是否是因为粉丝数为0而跳过
                 if isinstance(result, dict) and result.get('error') == 'no_followers_info':
                     skipped_users.append(username)
+                    metrics.user_finished('skipped')
                     continue
                 
-                # 正常处理成功的结果
-                successful_users.append(result)
-                if result.get('tweets_count', 0) < 50:
-                    insufficient_users.append((username, result.get('tweets_count', 0)))
+                # 重访结果替换第一轮的结果（保留推文更多的一次）
+                previous = None
+                if task.revisit:
+                    previous = next((r for r in successful_users if r['username'] == username), None)
+                if previous and previous['tweets_count'] > result.get('tweets_count', 0):
+                    # 不跳过本轮循环：仍要执行下面的用户间内存检查与限速等待
+                    print(f"重访 @{username} 获取的推文少于第一轮，保留第一轮结果")
+                    metrics.user_finished('done')
+                else:
+                    if previous:
+                        successful_users.remove(previous)
+                        insufficient_users = [(u, c) for u, c in insufficient_users if u != username]
+                    
+                    # 正常处理成功的结果
+                    successful_users.append(result)
+                    metrics.user_finished('done')
+                    if result.get('stop_reason') not in ('rate_limited', 'page_error'):
+                        rate_controller.record_success()
+                    if result.get('tweets_count', 0) < 50:
+                        insufficient_users.append((username, result.get('tweets_count', 0)))
                 
-                # 输出用户信息
-                user_info = result['user_info']
-                print(f"用户名: @{result['username']}")
-                print(f"显示名称: {user_info['display_name']}")
-                print(f"粉丝数: {user_info.get('followers_count', '0')}")
-                print(f"个人简介: {user_info['description']}")
-                print(f"位置: {user_info['location']}")
-                print(f"认证状态: {'是' if user_info['verified'] else '否'}")
-                print(f"获取到推文数量: {result['tweets_count']}")
+                    # 输出用户信息
+                    user_info = result['user_info']
+                    print(f"用户名: @{result['username']}")
+                    print(f"显示名称: {user_info['display_name']}")
+                    print(f"粉丝数: {user_info.get('followers_count', '0')}")
+                    print(f"个人简介: {user_info['description']}")
+                    print(f"位置: {user_info['location']}")
+                    print(f"认证状态: {'是' if user_info['verified'] else '否'}")
+                    print(f"获取到推文数量: {result['tweets_count']}")
                 
-                # 计算并显示转发统计
-                data_processor = DataProcessor()
-                retweet_stats = data_processor.calculate_retweet_ratio(result['tweets'])
-                print(f"📊 转发统计:")
-                print(f"  总推文数: {retweet_stats['total_tweets']}")
-                print(f"  原创推文: {retweet_stats['original_count']}")
-                print(f"  转发推文: {retweet_stats['retweet_count']}")
-                print(f"  转发比例: {retweet_stats['retweet_ratio']}%")
+                    # 计算并显示转发统计（只计算一次，汇总与保存时复用）
+                    retweet_stats = data_processor.calculate_retweet_ratio(result['tweets'])
+                    result['retweet_stats'] = retweet_stats
+                    print(f"📊 转发统计:")
+                    print(f"  总推文数: {retweet_stats['total_tweets']}")
+                    print(f"  原创推文: {retweet_stats['original_count']}")
+                    print(f"  转发推文: {retweet_stats['retweet_count']}")
+                    print(f"  转发比例: {retweet_stats['retweet_ratio']}%")
                 
-                # 显示推文内容
-                if result['tweets']:
-                    print(f"\n📝 获取到的推文（前5条）:")
-                    for i, tweet in enumerate(result['tweets'][:5], 1):
-                        tweet_type = "🔄转发" if tweet.get('is_retweet', False) else "✏️原创"
-                        print(f"\n推文 {i} (日期: {tweet.get('date', '未知')}) [{tweet_type}]:")
-                        print(f"内容: {tweet['text']}")
-                        if tweet.get('interactions'):
-                            print(f"互动: {tweet['interactions']}")
-                        print(f"长度: {tweet['length']} 字符")
+                    # 显示推文内容
+                    if result['tweets']:
+                        print(f"\n📝 获取到的推文（前5条）:")
+                        for i, tweet in enumerate(result['tweets'][:5], 1):
+                            tweet_type = "🔄转发" if tweet.get('is_retweet', False) else "✏️原创"
+                            print(f"\n推文 {i} (日期: {tweet.get('date', '未知')}) [{tweet_type}]:")
+                            print(f"内容: {tweet['text']}")
+                            if tweet.get('interactions'):
+                                print(f"互动: {tweet['interactions']}")
+                            print(f"长度: {tweet['length']} 字符")
                     
-                    if len(result['tweets']) > 5:
-                        print(f"\n... 还有 {len(result['tweets']) - 5} 条推文")
-                else:
-                    print("\n未获取到推文内容")
+                        if len(result['tweets']) > 5:
+                            print(f"\n... 还有 {len(result['tweets']) - 5} 条推文")
+                    else:
+                        print("\n未获取到推文内容")
+                
+                    # 该用户的WebDriver命令统计（按阶段）
+                    print(search_service.command_accounting.format_summary(
+                        search_service.last_command_stats, title=f"@{username} WebDriver命令", tweets=result['tweets_count']))
                     
             else:
                 failed_users.append(username)
+                metrics.user_finished('failed')
                 print(f"❌ 搜索用户 @{username} 失败")
             
-            # 添加延迟，避免请求过于频繁
-            if index < len(target_usernames):
-                print(f"\n等待5秒后继续下一个用户... ({index}/{len(target_usernames)})")
-                time.sleep(5)  # 优化用户间等待时间到5秒
+            # 用户之间记录内存检查点（定位跨用户增长的引用，如 WebElement）
+            if profiler:
+                profiler.checkpoint(f"after @{username}")
+            
+            # 用户之间检查标签页内存，超过阈值时回收，保持后续用户的滚动/提取延迟稳定
+            # 用户之间的命令同样可能超时/卡死：看门狗中止后恢复连接继续，已收集的结果照常保存
+            if memory_governor:
+                try:
+                    memory_governor.between_users(username)
+                except WatchdogAbort as e:
+                    print(f"⚠️ 用户之间的标签页检查被看门狗中止（{e}），正在恢复...")
+                    if not recover_browser():
+                        print("❌ 无法恢复浏览器连接，停止批量搜索")
+                        break
+            
+            # 添加延迟，避免请求过于频繁（自适应间隔：连续成功时缩短，遇到限流时成倍拉长）
+            if scheduler.has_next():
+                print(f"\n等待{rate_controller.next_delay():.1f}秒后继续下一个用户... ({index}/{scheduler.planned})")
+                rate_controller.wait()
         
         # 总结报告
         print(f"\n{'='*60}")
@@ -228,6 +424,7 @@ def main():
         print(f"成功搜索: {len(successful_users)} 个用户")
         print(f"失败搜索: {len(failed_users)} 个用户")
         print(f"跳过用户: {len(skipped_users)} 个用户 (粉丝数为0)")
+        print(scheduler.summary())
         if insufficient_users:
             print("\n⚠️ 未达到50条推文的用户:")
             for uname, cnt in insufficient_users:
@@ -236,8 +433,7 @@ def main():
         if successful_users:
             print(f"\n✅ 成功的用户:")
             for user in successful_users:
-                data_processor = DataProcessor()
-                retweet_stats = data_processor.calculate_retweet_ratio(user['tweets'])
+                retweet_stats = user['retweet_stats']
                 print(f"- @{user['username']}: {user['user_info']['display_name']} (推文: {user['tweets_count']}条, 转发比例: {retweet_stats['retweet_ratio']}%)")
         
         if failed_users:
@@ -250,6 +446,11 @@ def main():
             for user in skipped_users:
                 print(f"- @{user}")
         
+        # 整批运行的WebDriver命令统计，定位往返最多的阶段
+        print("\n" + search_service.command_accounting.format_summary(
+            search_service.command_accounting.snapshot(), title="本次运行WebDriver命令",
+            tweets=sum(user['tweets_count'] for user in successful_users)))
+        
         # 保存所有成功用户的数据
         if successful_users:
             # 创建结果目录
@@ -265,66 +466,15 @@ def main():
                 # 重新排序推文（按时间顺序，最新的在前，未知日期放在最后）
                 tweets = result['tweets']
                 
-                # 自定义排序函数：已知日期按时间排序，未知日期放在最后
-                def sort_key(tweet):
-                    date = tweet.get('date', '')
-                    if date == '未知日期' or date == '':
-                        return '9999-12-31'  # 未知日期放在最后
-                    else:
-                        # 尝试解析日期，如果解析失败，也放在最后
-                        try:
-                            # 处理中文日期格式
-                            if '月' in date and '日' in date:
-                                if '年' in date:
-                                    # 2024年1月1日格式
-                                    year_match = re.search(r'(\d{4})年', date)
-                                    month_match = re.search(r'(\d{1,2})月', date)
-                                    day_match = re.search(r'(\d{1,2})日', date)
-                                    if year_match and month_match and day_match:
-                                        year = int(year_match.group(1))
-                                        month = int(month_match.group(1))
-                                        day = int(day_match.group(1))
-                                        return f"{year:04d}-{month:02d}-{day:02d}"
-                                else:
-                                    # 1月1日格式，假设是今年
-                                    current_year = datetime.now().year
-                                    month_match = re.search(r'(\d{1,2})月', date)
-                                    day_match = re.search(r'(\d{1,2})日', date)
-                                    if month_match and day_match:
-                                        month = int(month_match.group(1))
-                                        day = int(day_match.group(1))
-                                        return f"{current_year:04d}-{month:02d}-{day:02d}"
-                            elif re.match(r'[A-Za-z]{3}\s+\d+', date):
-                                # Jan 1 格式，假设是今年
-                                current_year = datetime.now().year
-                                month_match = re.search(r'([A-Za-z]{3})', date)
-                                day_match = re.search(r'(\d+)', date)
-                                if month_match and day_match:
-                                    month_str = month_match.group(1)
-                                    day = int(day_match.group(1))
-                                    # 月份映射
-                                    month_map = {
-                                        'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4,
-                                        'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8,
-                                        'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
-                                    }
-                                    if month_str in month_map:
-                                        month = month_map[month_str]
-                                        return f"{current_year:04d}-{month:02d}-{day:02d}"
-                        except:
-                            pass
-                        return '9999-12-31'  # 解析失败也放在最后
-                
-                # 按自定义排序函数排序
-                tweets.sort(key=sort_key, reverse=False)  # 改为reverse=False，这样未知日期会放在最后
+                # 已知日期按时间排序，未知日期放在最后（date_iso 在提取时已按爬取时间与时间线顺序推断好年份）
+                tweets.sort(key=DataProcessor.tweet_sort_key)
                 
                 # 重新设置index
                 for i, tweet in enumerate(tweets, 1):
                     tweet['index'] = i
                 
-                # 计算转发比例
-                data_processor = DataProcessor()
-                retweet_stats = data_processor.calculate_retweet_ratio(tweets)
+                # 转发比例与排序无关，直接复用搜索阶段的统计
+                retweet_stats = result['retweet_stats']
                 
                 formatted_user = {
                     "username": result['username'],
@@ -336,57 +486,58 @@ def main():
                     "scraped_at": result['scraped_at'],
                     "url": f"https://twitter.com/{result['username']}",
                     "page_title": f"{user_info['display_name']} (@{result['username']}) / X",
-                    "recent_tweets": tweets,
+                    "recent_tweets": [tweet.to_dict() for tweet in tweets],
                     "retweet_stats": retweet_stats
                 }
                 formatted_results.append(formatted_user)
             
             # 保存为JSON格式
-            json_filename = os.path.join(results_dir, "twitter_users_data.json")
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(formatted_results, f, ensure_ascii=False, indent=2)
+            json_filename = os.path.join(results_dir, "twitter_users_data.json" + compression_suffix(output_compression))
+            with span('write_json', cat='output', users=len(formatted_results)):
+                write_users(json_filename, formatted_results, indent=None if output_compression else 2)
             
             # 保存为TXT格式
             txt_filename = os.path.join(results_dir, "twitter_users_data.txt")
-            with open(txt_filename, 'w', encoding='utf-8') as f:
-                f.write(f"Twitter搜索结果 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 60 + "\n\n")
-                if insufficient_users:
-                    f.write("未达到50条推文的用户:\n")
-                    for uname, cnt in insufficient_users:
-                        f.write(f"- @{uname}: {cnt} 条\n")
-                    f.write("\n")
-                
-                for result in formatted_results:
-                    f.write(f"用户名: @{result['username']}\n")
-                    f.write(f"显示名称: {result['display_name']}\n")
-                    f.write(f"粉丝数: {result.get('followers', '0')}\n")
-                    f.write(f"个人简介: {result['description']}\n")
-                    f.write(f"位置: {result['location']}\n")
-                    f.write(f"认证状态: {'是' if result['verified'] else '否'}\n")
-                    f.write(f"获取到推文数量: {len(result['recent_tweets'])}\n")
-                    
-                    # 写入转发统计信息
-                    if 'retweet_stats' in result:
-                        stats = result['retweet_stats']
-                        f.write(f"转发统计:\n")
-                        f.write(f"  总推文数: {stats['total_tweets']}\n")
-                        f.write(f"  原创推文: {stats['original_count']}\n")
-                        f.write(f"  转发推文: {stats['retweet_count']}\n")
-                        f.write(f"  转发比例: {stats['retweet_ratio']}%\n")
-                    
-                    if result['recent_tweets']:
-                        f.write(f"\n推文内容:\n")
-                        for tweet in result['recent_tweets']:
-                            tweet_type = "转发" if tweet.get('is_retweet', False) else "原创"
-                            f.write(f"\n推文 {tweet['index']} (日期: {tweet.get('date', '未知')}) [类型: {tweet_type}]:\n")
-                            f.write(f"内容: {tweet['text']}\n")
-                            if tweet.get('interactions'):
-                                f.write(f"互动: {tweet['interactions']}\n")
-                            f.write(f"长度: {tweet['length']} 字符\n")
+            with span('write_txt', cat='output', users=len(formatted_results)):
+                with open(txt_filename, 'w', encoding='utf-8') as f:
+                    f.write(f"Twitter搜索结果 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                    f.write("=" * 60 + "\n\n")
+                    if insufficient_users:
+                        f.write("未达到50条推文的用户:\n")
+                        for uname, cnt in insufficient_users:
+                            f.write(f"- @{uname}: {cnt} 条\n")
+                        f.write("\n")
                     
-                    f.write("\n" + "-" * 40 + "\n\n")
-            
+                    for result in formatted_results:
+                        f.write(f"用户名: @{result['username']}\n")
+                        f.write(f"显示名称: {result['display_name']}\n")
+                        f.write(f"粉丝数: {result.get('followers', '0')}\n")
+                        f.write(f"个人简介: {result['description']}\n")
+                        f.write(f"位置: {result['location']}\n")
+                        f.write(f"认证状态: {'是' if result['verified'] else '否'}\n")
+                        f.write(f"获取到推文数量: {len(result['recent_tweets'])}\n")
+                        
+                        # 写入转发统计信息
+                        if 'retweet_stats' in result:
+                            stats = result['retweet_stats']
+                            f.write(f"转发统计:\n")
+                            f.write(f"  总推文数: {stats['total_tweets']}\n")
+                            f.write(f"  原创推文: {stats['original_count']}\n")
+                            f.write(f"  转发推文: {stats['retweet_count']}\n")
+                            f.write(f"  转发比例: {stats['retweet_ratio']}%\n")
+                        
+                        if result['recent_tweets']:
+                            f.write(f"\n推文内容:\n")
+                            for tweet in result['recent_tweets']:
+                                tweet_type = "转发" if tweet.get('is_retweet', False) else "原创"
+                                f.write(f"\n推文 {tweet['index']} (日期: {tweet.get('date', '未知')}) [类型: {tweet_type}]:\n")
+                                f.write(f"内容: {tweet['text']}\n")
+                                if tweet.get('interactions'):
+                                    f.write(f"互动: {tweet['interactions']}\n")
+                                f.write(f"长度: {tweet['length']} 字符\n")
+                        
+                        f.write("\n" + "-" * 40 + "\n\n")
+                
             print(f"\n📁 结果已保存:")
             print(f"JSON文件: {json_filename}")
             print(f"TXT文件: {txt_filename}")
@@ -424,6 +575,29 @@ def main():
         print(f"⏱️ 运行时长: {int(hours)}小时 {int(minutes)}分钟 {int(seconds)}秒")
         sys.exit(1)
     finally:
+        # 导出阶段耗时追踪
+        if args.trace:
+            count = tracer.export(args.trace)
+            print(f"🧭 阶段追踪已导出: {args.trace} ({count} 个区间)")
+        # 保存WebDriver录制
+        if recorder:
+            count = recorder.save(args.record_cassette)
+            print(f"📼 WebDriver录制已保存: {args.record_cassette} ({count} 条命令)")
+        # 写出剖析报告
+        if profiler:
+            for path in profiler.stop():
+                print(f"🔬 剖析报告: {path}")
+        scheduler.save_history()
+        selector_registry.save()
+        if selector_registry.fallthroughs:
+            print("🧭 选择器链回落（页面结构可能已变化）:")
+            print(selector_registry.report())
+        if watchdog:
+            watchdog.close()
+            if watchdog.incidents:
+                print(f"⏰ 看门狗共处理 {len(watchdog.incidents)} 次故障")
+        # 刷新队列中尚未输出的日志
+        shutdown_crawl_logging()
         # 断开浏览器连接（不关闭浏览器）
         search_service.close_browser()
         print("🔚 程序即将退出...")
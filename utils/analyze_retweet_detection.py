@@ -5,19 +5,23 @@
 帮助识别哪些推文可能被误判
 """
 
-import json
+import os
 import re
+import sys
+
+if __package__ in (None, ''):
+    # 以脚本方式运行时，将项目根目录加入路径
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.result_reader import iter_users
 
 def analyze_tweet_classification(json_file):
-    """分析推文分类结果"""
-    
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    """分析推文分类结果（逐个用户流式读取，不一次性加载整个文件）"""
     
     print("🔍 转发检测结果分析")
     print("=" * 60)
     
-    for user_data in data:
+    for user_data in iter_users(json_file):
         username = user_data['username']
         tweets = user_data['recent_tweets']
         
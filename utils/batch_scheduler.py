@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量调度模块
+给整批任务一个总时间预算，而不是每个用户都固定 600 秒 / 1000 次滚动：
+  - 按历史耗时（results/.user_cost_history.json）由快到慢排序；没有历史的用户按资料页推文数估计
+    （来自 probe_profiles.py 的结果，推文数不足目标的时间线会一直滚到上限，排在最后），都没有时按默认耗时排在中间
+  - 每个用户的预算 = 剩余预算在剩余用户间按预估耗时的份额（限制在上下限之间），
+    并据此换算 get_user_tweets 的 max_total_wait_seconds 与 max_scroll_attempts
+  - 因预算不足而未达标的用户在第一轮结束后用剩余预算重访（最接近达标的优先）
+  - 每个用户结束后更新历史耗时（指数滑动平均），供下次运行排序
+目标是在给定时间内完成尽可能多的用户。不设总预算时保持原有顺序与每用户 600 秒 / 1000 次滚动上限。
+"""
+
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+DEFAULT_HISTORY_PATH = os.path.join('results', '.user_cost_history.json')
+
+# 因预算耗尽而终止（值得重访）的终止原因
+BUDGET_STOP_REASONS = ('max_wait', 'max_scroll_attempts', 'user_deadline')
+
+# 不设总预算时 get_user_tweets 的原有上限
+DEFAULT_MAX_WAIT_SECONDS = 600
+DEFAULT_MAX_SCROLL_ATTEMPTS = 1000
+
+# 导航、资料页提取等 get_user_tweets 之外的固定开销（秒）
+USER_OVERHEAD_SECONDS = 15
+# 每次滚动迭代的大致耗时（滚动后等待2秒 + 查找/提取）
+SECONDS_PER_SCROLL = 2.5
+
+
+class UserTask:
+    """调度给批量循环的一个用户任务"""
+
+    def __init__(self, username, budget_seconds=None, revisit=False):
+        """
+        Args:
+            username (str): 用户名
+            budget_seconds (float): 该用户的预算（秒），None 表示不设预算、使用原有固定上限
+            revisit (bool): 是否为第二轮重访
+        """
+        self.username = username
+        self.budget_seconds = budget_seconds
+        self.revisit = revisit
+
+    @property
+    def max_total_wait_seconds(self):
+        """get_user_tweets 的等待上限"""
+        if self.budget_seconds is None:
+            return DEFAULT_MAX_WAIT_SECONDS
+        return max(10, int(self.budget_seconds - USER_OVERHEAD_SECONDS))
+
+    @property
+    def max_scroll_attempts(self):
+        """与预算相称的滚动次数上限"""
+        if self.budget_seconds is None:
+            return DEFAULT_MAX_SCROLL_ATTEMPTS
+        return max(10, int(self.max_total_wait_seconds / SECONDS_PER_SCROLL) * 2)
+
+    def __repr__(self):
+        budget = 'no budget' if self.budget_seconds is None else f"{self.budget_seconds:.0f}s"
+        return f"UserTask(@{self.username}, {budget}{', revisit' if self.revisit else ''})"
+
+
+def load_cost_history(path=DEFAULT_HISTORY_PATH):
+    """读取历史耗时 {username: {'seconds', 'tweets', 'complete', 'runs', 'updated_at'}}"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_post_counts(paths):
+    """
+    从 probe_profiles.py 的JSONL结果读取资料页推文数
+
+    Args:
+        paths (list): JSONL文件路径
+
+    Returns:
+        dict: {username: 推文数}（只取探测成功的账户）
+    """
+    counts = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(row, dict) and row.get('status') == 'ok' and row.get('username'):
+                    counts[row['username']] = row.get('tweets_count') or 0
+    return counts
+
+
+class BatchScheduler:
+    """带总时间预算的用户调度器（可迭代，产出 UserTask）"""
+
+    def __init__(self, usernames, total_budget_seconds=None, target_tweets=50,
+                 history_path=DEFAULT_HISTORY_PATH, default_cost=120.0,
+                 min_user_budget=60.0, max_user_budget=600.0, post_counts=None):
+        """
+        Args:
+            usernames (list): 用户名列表
+            total_budget_seconds (float): 整批总预算（秒），None 表示不限（保持原顺序与固定上限）
+            target_tweets (int): 每个用户的目标推文数
+            history_path (str): 历史耗时文件，None 表示不读写
+            default_cost (float): 没有历史的用户的预估耗时（秒）
+            min_user_budget (float): 单个用户预算下限（秒）
+            max_user_budget (float): 单个用户预算上限（秒）
+            post_counts (dict): {username: 资料页推文数}，用于估计没有历史的用户的耗时
+        """
+        self.total_budget = total_budget_seconds
+        self.target_tweets = target_tweets
+        self.history_path = history_path
+        self.default_cost = default_cost
+        self.min_user_budget = min_user_budget
+        self.max_user_budget = max_user_budget
+        self.history = load_cost_history(history_path) if history_path else {}
+        self.post_counts = post_counts or {}
+        self.started_at = time.time()
+
+        usernames = list(dict.fromkeys(usernames))
+        if self.total_budget:
+            usernames.sort(key=self.expected_cost)
+        self._pending = deque(usernames)
+        self._revisits = []
+        self._revisiting = False
+        self.deferred = []
+        self.completed = 0
+        self.planned = len(usernames)
+
+    def expected_cost(self, username):
+        """
+        预估耗时（秒）：历史平均；没有历史时按资料页推文数估计，否则为默认值
+
+        推文数不足目标的账户无法达标，会一直滚动到无新推文或等待上限，按单用户预算上限估计
+        """
+        entry = self.history.get(username)
+        if entry:
+            return entry['seconds']
+        posts = self.post_counts.get(username)
+        if posts is not None and posts < self.target_tweets:
+            return self.max_user_budget
+        return self.default_cost
+
+    def remaining_budget(self):
+        """剩余总预算（秒），不限时为None"""
+        if not self.total_budget:
+            return None
+        return self.total_budget - (time.time() - self.started_at)
+
+    def has_next(self):
+        """是否还有待处理的用户（包括待重访）"""
+        if not self.total_budget:
+            return bool(self._pending)
+        return bool(self._pending or self._revisits) and self._budget_left_for_revisit()
+
+    def requeue(self, username):
+        """故障或限流后把用户放回队尾"""
+        self._pending.append(username)
+        self.planned += 1
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.total_budget:
+            if not self._pending:
+                raise StopIteration
+            return UserTask(self._pending.popleft())
+
+        remaining = self.remaining_budget()
+        if self._pending and remaining >= self.min_user_budget:
+            username = self._pending.popleft()
+            costs = [self.expected_cost(username)] + [self.expected_cost(u) for u in self._pending]
+            share = remaining * costs[0] / sum(costs)
+            # 快用户留出余量（预估的2倍），慢用户最多拿到自己的份额，未达标的留到第二轮重访
+            budget = min(self.max_user_budget, max(self.min_user_budget, min(costs[0] * 2, share)))
+            return UserTask(username, min(budget, remaining), revisit=self._revisiting)
+
+        if self._pending:
+            # 预算耗尽：剩余用户推迟到下一次运行
+            self.deferred.extend(self._pending)
+            self._pending.clear()
+
+        if self._revisits and self._budget_left_for_revisit():
+            # 第二轮：用剩余预算重访因预算不足未达标的用户，最接近达标的优先
+            self._revisits.sort(key=lambda item: -item[1])
+            self._pending.extend(username for username, _ in self._revisits)
+            self.planned += len(self._revisits)
+            self._revisits = []
+            self._revisiting = True
+            return self.__next__()
+        raise StopIteration
+
+    def _budget_left_for_revisit(self):
+        remaining = self.remaining_budget()
+        return remaining is not None and remaining >= self.min_user_budget
+
+    def record(self, task, result, elapsed_seconds):
+        """
+        记录一个用户的结果：更新历史耗时，预算不足未达标时加入重访
+
+        Args:
+            task (UserTask): 调度产出的任务
+            result (dict): search_user_and_get_tweets 的返回值
+            elapsed_seconds (float): 实际耗时
+        """
+        tweets = result.get('tweets_count', 0) if isinstance(result, dict) else 0
+        stop_reason = result.get('stop_reason') if isinstance(result, dict) else None
+        complete = tweets >= self.target_tweets or stop_reason == 'timeline_end'
+        if complete:
+            self.completed += 1
+        elif self.total_budget and not task.revisit and stop_reason in BUDGET_STOP_REASONS:
+            self._revisits.append((task.username, tweets))
+
+        if not isinstance(result, dict) or result.get('error'):
+            return
+        previous = self.history.get(task.username)
+        # 未达标时实际耗时低估了完成所需时间，按达标比例折算
+        cost = elapsed_seconds if complete or not tweets else elapsed_seconds * self.target_tweets / tweets
+        if previous and not task.revisit:
+            cost = 0.5 * previous['seconds'] + 0.5 * cost
+        posts = (result.get('user_info') or {}).get('tweets_count')
+        self.history[task.username] = {
+            'seconds': round(cost, 1),
+            'tweets': tweets,
+            'posts': posts,
+            'complete': complete,
+            'runs': (previous or {}).get('runs', 0) + 1,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def save_history(self):
+        """写回历史耗时文件"""
+        if not self.history_path:
+            return
+        os.makedirs(os.path.dirname(self.history_path) or '.', exist_ok=True)
+        with open(self.history_path, 'w', encoding='utf-8') as f:
+            json.dump(self.history, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def summary(self):
+        """调度摘要文本"""
+        elapsed = time.time() - self.started_at
+        per_hour = self.completed / elapsed * 3600 if elapsed else 0
+        text = f"📅 调度: 完成 {self.completed} 个用户（{per_hour:.1f} 个/小时）"
+        if self.deferred:
+            text += f"，预算耗尽推迟 {len(self.deferred)} 个: {', '.join('@' + u for u in self.deferred[:10])}"
+        return text
@@ -7,9 +7,12 @@
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+import os
 import subprocess
 import time
 
+from utils.chrome_pool import devtools_version, find_chrome_binary
+
 def setup_driver():
     """
     设置Chrome浏览器驱动
@@ -34,12 +37,13 @@ def setup_driver():
         return None 
 
         
-def connect_to_existing_chrome(debug_port=9222):
+def connect_to_existing_chrome(debug_port=9222, page_load_strategy=None):
     """
     连接到现有的Chrome浏览器会话
     
     Args:
         debug_port (int): Chrome调试端口，默认为9222
+        page_load_strategy (str): 页面加载策略（'none' 表示导航命令不等待页面加载完成），默认 normal
     
     Returns:
         webdriver.Chrome: 连接到现有会话的浏览器驱动
@@ -48,6 +52,8 @@ def connect_to_existing_chrome(debug_port=9222):
         # 设置Chrome选项以连接到现有会话
         chrome_options = Options()
         chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
+        if page_load_strategy:
+            chrome_options.page_load_strategy = page_load_strategy
         
         # 尝试连接到现有Chrome会话
         driver = webdriver.Chrome(options=chrome_options)
@@ -64,65 +70,44 @@ def connect_to_existing_chrome(debug_port=9222):
         print("请确保Chrome浏览器已启动并开启了调试模式")
         return None
 
-def start_chrome_with_debug(debug_port=9222):
+def start_chrome_with_debug(debug_port=9222, user_data_dir="chrome_debug_profile"):
     """
-    启动Chrome浏览器并开启调试模式
+    启动Chrome浏览器并开启调试模式（Windows / macOS / Linux）
     
     Args:
         debug_port (int): 调试端口号
+        user_data_dir (str): 用户数据目录
     
     Returns:
         bool: 是否成功启动
     """
     try:
-        # 尝试不同的Chrome路径
-        chrome_paths = [
-            "chrome.exe",
-            "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
-            "C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
-            "C:\\Users\\%USERNAME%\\AppData\\Local\\Google\\Chrome\\Application\\chrome.exe"
-        ]
-        
-        chrome_cmd = None
-        for path in chrome_paths:
-            try:
-                # 测试路径是否存在
-                if path == "chrome.exe":
-                    # 尝试在PATH中查找
-                    result = subprocess.run(["where", "chrome.exe"], capture_output=True, text=True)
-                    if result.returncode == 0:
-                        chrome_cmd = path
-                        break
-                else:
-                    # 测试完整路径
-                    expanded_path = os.path.expandvars(path)
-                    if os.path.exists(expanded_path):
-                        chrome_cmd = expanded_path
-                        break
-            except:
-                continue
-        
+        chrome_cmd = find_chrome_binary()
         if not chrome_cmd:
-            print("❌ 无法找到Chrome浏览器")
+            print("❌ 无法找到Chrome浏览器（可设置环境变量 CHROME_BINARY）")
             print("请手动启动Chrome浏览器，使用以下命令：")
-            print(f"chrome.exe --remote-debugging-port={debug_port} --user-data-dir=chrome_debug_profile")
+            print(f"chrome --remote-debugging-port={debug_port} --user-data-dir={user_data_dir}")
             return False
         
-        # Windows系统启动Chrome的命令
         chrome_args = [
             chrome_cmd,
             f"--remote-debugging-port={debug_port}",
-            "--user-data-dir=chrome_debug_profile",
+            f"--user-data-dir={os.path.abspath(user_data_dir)}",
             "--no-first-run",
             "--no-default-browser-check"
         ]
         
-        # 启动Chrome
-        subprocess.Popen(chrome_args, shell=True)
+        # 启动Chrome（参数列表直接传给进程，不经过shell）
+        subprocess.Popen(chrome_args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         print(f"🚀 正在启动Chrome浏览器（调试端口: {debug_port}）...")
         
-        # 等待浏览器启动
-        time.sleep(3)
+        # 等待DevTools接口可访问
+        deadline = time.time() + 15
+        while time.time() < deadline:
+            if devtools_version(debug_port):
+                return True
+            time.sleep(0.5)
+        print("⚠️ Chrome已启动，但调试端口暂未响应")
         return True
         
     except Exception as e:
@@ -148,7 +133,6 @@ def setup_existing_browser_session(debug_port=9222):
     # 如果连接失败，尝试启动新的Chrome会话
     print("尝试启动新的Chrome调试会话...")
     if start_chrome_with_debug(debug_port):
-        time.sleep(5)  # 等待浏览器完全启动
         return connect_to_existing_chrome(debug_port)
     
     return None 
\ No newline at end of file
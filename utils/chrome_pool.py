@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome实例池
+跨平台（Windows / macOS / Linux）查找Chrome，按独立的调试端口与用户数据目录启动N个
+无头或有界面的Chrome实例（使用适合爬取的启动参数），后台监控线程定期通过 DevTools 的 /json/version
+接口做健康检查并自动重启失效实例，把就绪的调试端口分发给爬虫（connect_to_existing_chrome(port) 即可接入）。
+"""
+
+import argparse
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+# 适合爬取的启动参数：后台标签页不降频、关闭扩展与后台组件、限制磁盘缓存
+CRAWL_CHROME_FLAGS = [
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-background-networking',
+    '--disable-extensions',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--disk-cache-size=104857600',
+    '--window-size=1920,1080',
+]
+
+# Linux 服务器（容器、无显示）上额外需要的参数
+_LINUX_SERVER_FLAGS = ['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
+
+
+def find_chrome_binary():
+    """
+    查找Chrome可执行文件（优先环境变量 CHROME_BINARY）
+
+    Returns:
+        str or None: 可执行文件路径
+    """
+    candidates = [os.environ.get('CHROME_BINARY')]
+    system = platform.system()
+    if system == 'Windows':
+        for base in (os.environ.get('LOCALAPPDATA'), os.environ.get('PROGRAMFILES'),
+                     os.environ.get('PROGRAMFILES(X86)')):
+            if base:
+                candidates.append(os.path.join(base, 'Google', 'Chrome', 'Application', 'chrome.exe'))
+        candidates.append(shutil.which('chrome.exe') or shutil.which('chrome'))
+    elif system == 'Darwin':
+        candidates += [
+            '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+            os.path.expanduser('~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'),
+            '/Applications/Chromium.app/Contents/MacOS/Chromium',
+        ]
+    else:
+        for name in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome'):
+            candidates.append(shutil.which(name))
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def build_chrome_command(binary, port, user_data_dir, headless=True, block_images=False, extra_args=()):
+    """
+    构建Chrome启动命令
+
+    Args:
+        binary (str): Chrome可执行文件
+        port (int): 远程调试端口
+        user_data_dir (str): 用户数据目录（每个实例独立）
+        headless (bool): 是否无头
+        block_images (bool): 是否禁止加载图片（节省带宽与内存）
+        extra_args (iterable): 其他参数
+
+    Returns:
+        list: 命令参数列表
+    """
+    cmd = [binary, f'--remote-debugging-port={port}', f'--user-data-dir={os.path.abspath(user_data_dir)}']
+    cmd += CRAWL_CHROME_FLAGS
+    if headless:
+        cmd.append('--headless=new')
+    if platform.system() == 'Linux':
+        cmd += _LINUX_SERVER_FLAGS
+    if block_images:
+        cmd.append('--blink-settings=imagesEnabled=false')
+    cmd += list(extra_args)
+    cmd.append('about:blank')
+    return cmd
+
+
+def devtools_version(port, host='127.0.0.1', timeout=2.0):
+    """
+    读取 DevTools /json/version（健康检查）
+
+    Returns:
+        dict or None: 浏览器版本信息；无法访问时返回None
+    """
+    try:
+        with urllib.request.urlopen(f'http://{host}:{port}/json/version', timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return None
+
+
+class ChromeInstance:
+    """池中的单个Chrome实例"""
+
+    def __init__(self, binary, port, user_data_dir, headless=True, block_images=False, extra_args=()):
+        self.binary = binary
+        self.port = port
+        self.user_data_dir = user_data_dir
+        self.headless = headless
+        self.block_images = block_images
+        self.extra_args = list(extra_args)
+        self.process = None
+        self.restarts = 0
+        self.browser_version = None
+
+    @property
+    def endpoint(self):
+        """调试地址（Options.debuggerAddress 使用的格式）"""
+        return f'127.0.0.1:{self.port}'
+
+    def start(self, timeout=20):
+        """
+        启动并等待 /json/version 可访问
+
+        Returns:
+            bool: 是否就绪
+        """
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        cmd = build_chrome_command(self.binary, self.port, self.user_data_dir,
+                                   self.headless, self.block_images, self.extra_args)
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            info = devtools_version(self.port)
+            if info:
+                self.browser_version = info.get('Browser')
+                return True
+            if self.process.poll() is not None:
+                return False
+            time.sleep(0.25)
+        return False
+
+    def is_healthy(self):
+        """进程存活且DevTools可响应"""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        return devtools_version(self.port) is not None
+
+    def stop(self, timeout=10):
+        """结束进程"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def restart(self):
+        """重启实例"""
+        self.stop()
+        self.restarts += 1
+        return self.start()
+
+
+class ChromePool:
+    """Chrome实例池：分发就绪的调试端口，失效实例在分发前自动重启"""
+
+    def __init__(self, size, base_port=9300, profile_root='chrome_pool_profiles', headless=True,
+                 block_images=False, extra_args=(), binary=None):
+        """
+        Args:
+            size (int): 实例数
+            base_port (int): 第一个实例的调试端口，其余依次递增
+            profile_root (str): 各实例用户数据目录的根目录（profile_<端口>）
+            headless (bool): 是否无头
+            block_images (bool): 是否禁止加载图片
+            extra_args (iterable): 其他Chrome参数
+            binary (str): Chrome可执行文件，默认自动查找
+        """
+        self.binary = binary or find_chrome_binary()
+        if not self.binary:
+            raise RuntimeError("未找到Chrome，请安装Chrome/Chromium或设置环境变量 CHROME_BINARY")
+        self.instances = [
+            ChromeInstance(self.binary, base_port + i, os.path.join(profile_root, f'profile_{base_port + i}'),
+                           headless, block_images, extra_args)
+            for i in range(size)
+        ]
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        # 启动/重启失败、暂时移出池的实例；health_check 重启成功后放回空闲队列
+        self._failed = set()
+        self._monitor = None
+        self._stop = threading.Event()
+
+    def start(self, check_interval=10.0):
+        """
+        启动全部实例，并启动后台健康检查线程
+
+        Args:
+            check_interval (float): 健康检查间隔（秒），None 或 0 表示不启动监控线程
+
+        Returns:
+            int: 就绪的实例数
+        """
+        ready = 0
+        for instance in self.instances:
+            if instance.start() or instance.restart():
+                self._idle.put(instance)
+                ready += 1
+                print(f"✅ Chrome实例就绪: {instance.endpoint} ({instance.browser_version})")
+            else:
+                with self._lock:
+                    self._failed.add(instance)
+                print(f"❌ Chrome实例启动失败: {instance.endpoint}（等待健康检查重试）")
+        if check_interval and self._monitor is None:
+            self._stop.clear()
+            self._monitor = threading.Thread(target=self._monitor_loop, args=(check_interval,),
+                                             name='chrome-pool-monitor', daemon=True)
+            self._monitor.start()
+        return ready
+
+    def _monitor_loop(self, interval):
+        """监控线程：定期健康检查，把重启成功的移出实例放回池中（否则 acquire 会一直等待）"""
+        while not self._stop.wait(interval):
+            try:
+                for endpoint in self.health_check():
+                    print(f"🔄 已重启失效实例: {endpoint}")
+            except Exception as e:
+                print(f"⚠️ Chrome实例池健康检查出错: {e}")
+
+    def acquire(self, timeout=None):
+        """
+        取出一个健康的实例（失效则先重启）
+
+        Args:
+            timeout (float): 等待空闲实例的秒数，None 表示一直等待
+
+        Returns:
+            ChromeInstance: 实例（用完调用 release）
+
+        Raises:
+            queue.Empty: 超时仍无可用实例
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = 5.0 if deadline is None else max(0.0, min(5.0, deadline - time.time()))
+            try:
+                instance = self._idle.get(timeout=wait)
+            except queue.Empty:
+                if deadline is not None and time.time() >= deadline:
+                    raise
+                # 没有监控线程时由等待方自己重试移出的实例，避免全部失效后永远等待
+                if self._monitor is None and self._failed:
+                    self.health_check()
+                continue
+            if instance.is_healthy():
+                return instance
+            print(f"⚠️ Chrome实例 {instance.endpoint} 已失效，正在重启...")
+            with self._lock:
+                healthy = instance.restart()
+                if not healthy:
+                    self._failed.add(instance)
+            if healthy:
+                return instance
+            print(f"❌ Chrome实例 {instance.endpoint} 重启失败，暂时移出池（由 health_check 重试后放回）")
+
+    def release(self, instance):
+        """归还实例"""
+        self._idle.put(instance)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """with pool.lease() as instance: ... 自动归还"""
+        instance = self.acquire(timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def health_check(self):
+        """
+        检查并重启失效实例（可由监控线程定期调用）；此前移出池的实例重启成功后放回空闲队列
+
+        Returns:
+            list: 被重启的实例调试地址
+        """
+        restarted = []
+        for instance in self.instances:
+            failed = instance in self._failed
+            if not failed and (instance.process is None or instance.is_healthy()):
+                continue
+            with self._lock:
+                if not instance.restart():
+                    continue
+                restarted.append(instance.endpoint)
+                if failed:
+                    self._failed.discard(instance)
+                    self._idle.put(instance)
+        return restarted
+
+    def close(self):
+        """停止监控线程并关闭全部实例"""
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=30)
+            self._monitor = None
+        for instance in self.instances:
+            instance.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='启动Chrome实例池并持续健康检查')
+    parser.add_argument('--size', type=int, default=2, help='实例数')
+    parser.add_argument('--base-port', type=int, default=9300)
+    parser.add_argument('--profile-root', default='chrome_pool_profiles')
+    parser.add_argument('--headful', action='store_true', help='显示浏览器窗口（默认无头）')
+    parser.add_argument('--block-images', action='store_true')
+    parser.add_argument('--check-interval', type=float, default=10.0, help='健康检查间隔（秒）')
+    args = parser.parse_args()
+
+    try:
+        pool = ChromePool(args.size, args.base_port, args.profile_root, headless=not args.headful,
+                          block_images=args.block_images)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"🚀 使用Chrome: {pool.binary}")
+    if not pool.start(args.check_interval):
+        pool.close()
+        sys.exit(1)
+    print("爬虫可通过以下调试端口接入（TwitterSearchService(debug_port=...)）:")
+    for instance in pool.instances:
+        print(f"  {instance.endpoint}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n🔚 正在关闭Chrome实例池...")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver命令统计模块
+包装 driver.execute（WebElement 的 find_elements / .text / get_attribute 也经由此处），
+统计每条命令的次数与耗时，并按调用栈归属到爬取阶段，用于定位往返次数最多的代码路径
+"""
+
+import sys
+import threading
+import time
+
+
+# 调用栈中的函数名 -> 爬取阶段（从内向外查找，命中第一个即为归属阶段）
+STAGE_BY_FUNCTION = {
+    # 导航
+    'direct_access_user_page': 'navigation',
+    'verify_user_page': 'navigation',
+    'search_user': 'navigation',
+    'click_user_profile': 'navigation',
+    'ensure_on_twitter_home': 'navigation',
+    # 用户信息
+    'extract_user_info': 'user_info',
+    # 推文提取
+    '_find_tweet_elements': 'find_tweets',
+    '_extract_tweet_text': 'tweet_text',
+    'extract_tweet_texts': 'tweet_text',
+    '_extract_date': 'date',
+    '_extract_interactions': 'interactions',
+    'extract_interactions_from_element_improved': 'interactions',
+    '_detect_retweet': 'retweet_detection',
+    '_extract_tweet_data': 'full_text',
+    '_should_stop': 'stop_check',
+    'scroll_page': 'scroll',
+    'get_page_height': 'scroll',
+    'get_scroll_position': 'scroll',
+}
+
+# selenium API 方法名 -> 命令标签（get_attribute 等在底层都是 executeScript，按API区分更直观）
+_API_LABELS = {
+    'get_attribute': 'get_attribute',
+    'get_dom_attribute': 'get_attribute',
+    'text': '.text',
+    'find_elements': 'find_elements',
+    'find_element': 'find_element',
+    'execute_script': 'execute_script',
+    'execute_cdp_cmd': 'execute_cdp_cmd',
+    'get': 'get',
+    'is_displayed': 'is_displayed',
+    'click': 'click',
+}
+
+
+def _classify_call(max_depth=40):
+    """根据调用栈确定 (阶段, 命令标签)"""
+    frame = sys._getframe(2)
+    label = None
+    in_selenium = True
+    depth = 0
+    while frame is not None and depth < max_depth:
+        name = frame.f_code.co_name
+        if in_selenium:
+            if 'selenium' in frame.f_code.co_filename:
+                # 取selenium内最外层的API名（get_attribute 内部会调用 execute_script）
+                label = _API_LABELS.get(name, label)
+            else:
+                in_selenium = False
+        stage = STAGE_BY_FUNCTION.get(name)
+        if stage:
+            return stage, label
+        frame = frame.f_back
+        depth += 1
+    return 'other', label
+
+
+class CommandAccounting:
+    """WebDriver命令统计器"""
+
+    def __init__(self):
+        # stats[stage][command] = [次数, 总耗时(秒), 出错次数]
+        self.stats = {}
+        self.per_user = {}
+        self.current_user = None
+        self._user_start = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def install(cls, driver, accounting=None):
+        """
+        在driver上安装统计包装（重复安装时返回已有的统计器）
+
+        Args:
+            driver: selenium WebDriver
+            accounting (CommandAccounting): 沿用的统计器（重新连接浏览器后继续累计），默认新建
+
+        Returns:
+            CommandAccounting: 统计器
+        """
+        existing = getattr(driver, '_command_accounting', None)
+        if existing is not None:
+            return existing
+
+        accounting = accounting or cls()
+        original_execute = driver.execute
+
+        def accounted_execute(driver_command, params=None):
+            stage, label = _classify_call()
+            started = time.perf_counter()
+            failed = False
+            try:
+                return original_execute(driver_command, params)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                accounting.record(stage, label or driver_command, time.perf_counter() - started, failed)
+
+        driver.execute = accounted_execute
+        driver._command_accounting = accounting
+        return accounting
+
+    def record(self, stage, command, seconds, failed=False):
+        """记录一条命令"""
+        with self._lock:
+            entry = self.stats.setdefault(stage, {}).setdefault(command, [0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            if failed:
+                entry[2] += 1
+
+    def snapshot(self):
+        """当前统计的副本"""
+        with self._lock:
+            return {stage: {cmd: list(v) for cmd, v in cmds.items()} for stage, cmds in self.stats.items()}
+
+    @staticmethod
+    def diff(after, before):
+        """两个快照之差"""
+        result = {}
+        for stage, cmds in after.items():
+            for cmd, (count, seconds, errors) in cmds.items():
+                prev = before.get(stage, {}).get(cmd, [0, 0.0, 0])
+                if count - prev[0]:
+                    result.setdefault(stage, {})[cmd] = [count - prev[0], seconds - prev[1], errors - prev[2]]
+        return result
+
+    def begin_user(self, username):
+        """开始统计某个用户"""
+        self.current_user = username
+        self._user_start = self.snapshot()
+
+    def end_user(self):
+        """
+        结束当前用户的统计
+
+        Returns:
+            dict: 该用户期间的统计
+        """
+        if self.current_user is None:
+            return {}
+        user_stats = self.diff(self.snapshot(), self._user_start)
+        self.per_user[self.current_user] = user_stats
+        self.current_user = None
+        self._user_start = None
+        return user_stats
+
+    @staticmethod
+    def totals(stats):
+        """(命令总数, 总耗时, 出错数)"""
+        count = sum(v[0] for cmds in stats.values() for v in cmds.values())
+        seconds = sum(v[1] for cmds in stats.values() for v in cmds.values())
+        errors = sum(v[2] for cmds in stats.values() for v in cmds.values())
+        return count, seconds, errors
+
+    @staticmethod
+    def format_summary(stats, title="WebDriver命令统计", tweets=None):
+        """
+        格式化统计表：按阶段汇总，阶段内按耗时排序
+
+        Args:
+            stats (dict): 统计数据（snapshot / diff / end_user 的结果）
+            title (str): 标题
+            tweets (int): 推文数，提供时输出每条推文的命令数
+
+        Returns:
+            str: 多行文本
+        """
+        count, seconds, errors = CommandAccounting.totals(stats)
+        lines = [f"📡 {title}: {count} 次命令, {seconds:.2f}s, 出错 {errors} 次"
+                 + (f", {count / tweets:.1f} 次/推文" if tweets else "")]
+        stage_rows = sorted(
+            ((stage, sum(v[0] for v in cmds.values()), sum(v[1] for v in cmds.values()), cmds)
+             for stage, cmds in stats.items()),
+            key=lambda row: row[2], reverse=True,
+        )
+        for stage, stage_count, stage_seconds, cmds in stage_rows:
+            share = stage_seconds / seconds * 100 if seconds else 0
+            lines.append(f"  {stage:<18} {stage_count:>7} 次 {stage_seconds:>8.2f}s ({share:4.1f}%)")
+            for cmd, (cmd_count, cmd_seconds, cmd_errors) in sorted(cmds.items(), key=lambda kv: kv[1][1], reverse=True):
+                avg_ms = cmd_seconds / cmd_count * 1000 if cmd_count else 0
+                lines.append(f"    {cmd:<16} {cmd_count:>7} 次 {cmd_seconds:>8.2f}s  平均 {avg_ms:6.1f}ms"
+                             + (f"  出错 {cmd_errors}" if cmd_errors else ""))
+        return "\n".join(lines)
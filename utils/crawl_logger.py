@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化日志模块
+爬取热循环中的诊断信息（转发检测过程、24小时过滤、每轮统计）不再逐条同步 print，
+而是写入 logging：日志记录先进入内存队列（QueueHandler），由后台线程（QueueListener）
+输出到控制台或 JSONL 文件，热循环只付出入队的开销。检测追踪可按比例采样（在入队前丢弃，未被采中的记录不进入队列）。
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+
+# 所有爬取日志的根logger；检测追踪使用其子logger，默认级别DEBUG
+ROOT_LOGGER_NAME = 'crawl'
+DETECTION_LOGGER_NAME = 'crawl.detection'
+
+_listener = None
+_context = {}
+
+
+def get_logger(name=None):
+    """
+    获取爬取日志logger
+
+    Args:
+        name (str): 子模块名，如 'tweets'
+
+    Returns:
+        logging.Logger
+    """
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}" if name else ROOT_LOGGER_NAME)
+
+
+_detection_logger = get_logger('detection')
+
+
+def set_log_context(**kwargs):
+    """设置附加到之后每条检测追踪的字段（如当前用户），值为None时移除"""
+    for key, value in kwargs.items():
+        if value is None:
+            _context.pop(key, None)
+        else:
+            _context[key] = value
+
+
+def detection_enabled():
+    """检测追踪是否有输出目标（热循环中先判断，避免无谓地拼装调试信息）"""
+    return _detection_logger.isEnabledFor(logging.DEBUG)
+
+
+def log_detection(event, **fields):
+    """
+    记录一条检测追踪
+
+    Args:
+        event (str): 事件名，如 'retweet_detection'、'tweet_filtered'
+        **fields: 结构化字段
+    """
+    if _detection_logger.isEnabledFor(logging.DEBUG):
+        _detection_logger.debug(event, extra={'fields': {**_context, **fields}})
+
+
+class SamplingFilter(logging.Filter):
+    """按比例随机保留指定logger（含子logger）的记录，其他记录全部放行"""
+
+    def __init__(self, rate, logger_name=DETECTION_LOGGER_NAME):
+        super().__init__()
+        self.rate = rate
+        self.logger_name = logger_name
+
+    def filter(self, record):
+        if self.rate >= 1 or not record.name.startswith(self.logger_name):
+            return True
+        return random.random() < self.rate
+
+
+class JsonLineFormatter(logging.Formatter):
+    """每条记录一行JSON"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """控制台格式：消息本身，附带结构化字段"""
+
+    def format(self, record):
+        message = record.getMessage()
+        fields = getattr(record, 'fields', None)
+        if fields:
+            message += ' ' + ' '.join(f"{k}={v}" for k, v in fields.items())
+        return message
+
+
+def setup_crawl_logging(level='INFO', detection_log=None, detection_sample_rate=1.0):
+    """
+    配置爬取日志：队列化的非阻塞输出
+
+    Args:
+        level (str): 控制台日志级别，DEBUG 时检测追踪也会打印到控制台
+        detection_log (str): 检测追踪JSONL文件路径（不提供则不写文件）
+        detection_sample_rate (float): 检测追踪保留比例（0~1），在入队前采样，文件与控制台输出都按此比例
+
+    Returns:
+        logging.handlers.QueueListener: 后台输出线程（由 shutdown_crawl_logging 停止）
+    """
+    global _listener
+    shutdown_crawl_logging()
+
+    console = logging.StreamHandler()
+    console.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    console.setFormatter(ConsoleFormatter())
+    handlers = [console]
+    if detection_log:
+        detection_file = logging.FileHandler(detection_log, mode='a', encoding='utf-8')
+        detection_file.setLevel(logging.DEBUG)
+        detection_file.addFilter(lambda record: record.name.startswith(DETECTION_LOGGER_NAME))
+        detection_file.setFormatter(JsonLineFormatter())
+        handlers.append(detection_file)
+
+    log_queue = queue.SimpleQueue()
+    root = get_logger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # 采样放在生产者一侧：被丢弃的检测追踪不入队，热循环省下入队与后台线程的处理
+    queue_handler.addFilter(SamplingFilter(detection_sample_rate))
+    root.addHandler(queue_handler)
+    root.propagate = False
+    # 只有需要输出时才放行DEBUG，否则热循环中 detection_enabled() 直接返回False
+    needs_debug = detection_log or console.level <= logging.DEBUG
+    root.setLevel(logging.DEBUG if needs_debug else console.level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_crawl_logging():
+    """停止后台输出线程并刷新队列中剩余的记录"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取运行指标模块
+在本地HTTP端口以Prometheus文本格式暴露批量爬取的进度：用户完成/失败/跳过数、推文吞吐、
+滚动迭代次数、当前用户、运行时长、各终止原因次数、WebDriver命令出错数、标签页内存与回收次数以及最近一次进展时间，
+便于判断长批次是在推进还是卡在无新推文的滚动循环里（可按 last_progress 告警）。
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.command_accounting import CommandAccounting
+
+
+def _escape_label(value):
+    """转义Prometheus标签值"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class CrawlMetrics:
+    """批量爬取进度指标（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.users = {'done': 0, 'failed': 0, 'skipped': 0}
+        self.tweets_total = 0
+        self.scroll_iterations = 0
+        self.stop_reasons = {}
+        self.current_user = ''
+        self.user_started_at = None
+        self.last_progress_at = self.started_at
+        self.command_accounting = None
+        self.page_memory = None
+        self.tab_recycles = {}
+        self.selector_fallthroughs = {}
+
+    def user_started(self, username):
+        """开始处理某个用户"""
+        with self._lock:
+            self.current_user = username
+            self.user_started_at = time.time()
+            self.last_progress_at = self.user_started_at
+
+    def user_finished(self, status):
+        """
+        结束当前用户
+
+        Args:
+            status (str): done / failed / skipped
+        """
+        with self._lock:
+            self.users[status] = self.users.get(status, 0) + 1
+            self.current_user = ''
+            self.user_started_at = None
+            self.last_progress_at = time.time()
+
+    def add_tweets(self, count):
+        """记录新增推文（有新增才算进展）"""
+        if count <= 0:
+            return
+        with self._lock:
+            self.tweets_total += count
+            self.last_progress_at = time.time()
+
+    def scroll_iteration(self):
+        """记录一次滚动迭代"""
+        with self._lock:
+            self.scroll_iterations += 1
+
+    def record_stop(self, reason):
+        """记录一次推文获取的终止原因"""
+        with self._lock:
+            self.stop_reasons[reason] = self.stop_reasons.get(reason, 0) + 1
+
+    def set_page_memory(self, js_heap_used, nodes):
+        """记录最近一次标签页内存采样"""
+        with self._lock:
+            self.page_memory = (js_heap_used, nodes)
+
+    def tab_recycled(self, method):
+        """记录一次标签页回收（blank / new_tab）"""
+        with self._lock:
+            self.tab_recycles[method] = self.tab_recycles.get(method, 0) + 1
+
+    def selector_fallthrough(self, chain):
+        """记录一次选择器链回落（排名第一的选择器未命中）"""
+        with self._lock:
+            self.selector_fallthroughs[chain] = self.selector_fallthroughs.get(chain, 0) + 1
+
+    def render(self):
+        """
+        生成Prometheus文本格式
+
+        Returns:
+            str: 指标文本
+        """
+        now = time.time()
+        with self._lock:
+            elapsed = now - self.started_at
+            lines = [
+                '# HELP crawl_users_total Users processed, by outcome.',
+                '# TYPE crawl_users_total counter',
+            ]
+            for status, count in self.users.items():
+                lines.append(f'crawl_users_total{{status="{status}"}} {count}')
+            lines += [
+                '# HELP crawl_tweets_total Tweets collected.',
+                '# TYPE crawl_tweets_total counter',
+                f'crawl_tweets_total {self.tweets_total}',
+                '# HELP crawl_tweets_per_second Average tweets collected per second since start.',
+                '# TYPE crawl_tweets_per_second gauge',
+                f'crawl_tweets_per_second {self.tweets_total / elapsed if elapsed else 0:.4f}',
+                '# HELP crawl_scroll_iterations_total Scroll iterations in get_user_tweets.',
+                '# TYPE crawl_scroll_iterations_total counter',
+                f'crawl_scroll_iterations_total {self.scroll_iterations}',
+                '# HELP crawl_stop_reasons_total Why get_user_tweets stopped scrolling.',
+                '# TYPE crawl_stop_reasons_total counter',
+            ]
+            for reason, count in sorted(self.stop_reasons.items()):
+                lines.append(f'crawl_stop_reasons_total{{reason="{reason}"}} {count}')
+            lines += [
+                '# HELP crawl_current_user User currently being crawled (value is seconds spent on it).',
+                '# TYPE crawl_current_user gauge',
+            ]
+            if self.current_user:
+                lines.append(f'crawl_current_user{{username="{_escape_label(self.current_user)}"}} '
+                             f'{now - self.user_started_at:.1f}')
+            lines += [
+                '# HELP crawl_elapsed_seconds Seconds since the run started.',
+                '# TYPE crawl_elapsed_seconds gauge',
+                f'crawl_elapsed_seconds {elapsed:.1f}',
+                '# HELP crawl_last_progress_timestamp_seconds Unix time of the last new tweet or finished user.',
+                '# TYPE crawl_last_progress_timestamp_seconds gauge',
+                f'crawl_last_progress_timestamp_seconds {self.last_progress_at:.3f}',
+            ]
+            if self.page_memory:
+                lines += [
+                    '# HELP crawl_page_js_heap_bytes JS heap used by the crawl tab at the last sample.',
+                    '# TYPE crawl_page_js_heap_bytes gauge',
+                    f'crawl_page_js_heap_bytes {self.page_memory[0]}',
+                    '# HELP crawl_page_dom_nodes DOM nodes in the crawl tab at the last sample.',
+                    '# TYPE crawl_page_dom_nodes gauge',
+                    f'crawl_page_dom_nodes {self.page_memory[1]}',
+                ]
+            if self.tab_recycles:
+                lines += [
+                    '# HELP crawl_tab_recycles_total Tab recycles triggered by memory thresholds.',
+                    '# TYPE crawl_tab_recycles_total counter',
+                ]
+                for method, count in sorted(self.tab_recycles.items()):
+                    lines.append(f'crawl_tab_recycles_total{{method="{method}"}} {count}')
+            if self.selector_fallthroughs:
+                lines += [
+                    '# HELP crawl_selector_fallthroughs_total Lookups where the top-ranked selector missed.',
+                    '# TYPE crawl_selector_fallthroughs_total counter',
+                ]
+                for chain, count in sorted(self.selector_fallthroughs.items()):
+                    lines.append(f'crawl_selector_fallthroughs_total{{chain="{_escape_label(chain)}"}} {count}')
+            accounting = self.command_accounting
+
+        if accounting is not None:
+            count, _, errors = CommandAccounting.totals(accounting.snapshot())
+            lines += [
+                '# HELP crawl_webdriver_commands_total WebDriver commands sent.',
+                '# TYPE crawl_webdriver_commands_total counter',
+                f'crawl_webdriver_commands_total {count}',
+                '# HELP crawl_webdriver_errors_total WebDriver commands that raised.',
+                '# TYPE crawl_webdriver_errors_total counter',
+                f'crawl_webdriver_errors_total {errors}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+# 进程级默认指标
+metrics = CrawlMetrics()
+
+
+def start_metrics_server(port, host='127.0.0.1', crawl_metrics=None):
+    """
+    在后台线程启动指标HTTP服务（GET /metrics）
+
+    Args:
+        port (int): 监听端口
+        host (str): 监听地址
+        crawl_metrics (CrawlMetrics): 指标对象，默认使用模块级 metrics
+
+    Returns:
+        ThreadingHTTPServer: 服务对象（调用 shutdown() 停止）
+    """
+    source = crawl_metrics or metrics
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = source.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='crawl-metrics', daemon=True).start()
+    return server
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地仿X测试服务器
+生成与线上相同 data-testid 结构的资料页和时间线（UserName / UserProfileStats / tweet /
+tweetText / socialContext / 互动按钮），支持虚拟化列表、滚动懒加载、响应延迟和时间线长度配置，
+用于在不访问线上站点的情况下测量爬虫性能。
+/static/<username>?articles=N 返回一次性包含N条推文的静态页面，用于大DOM压力测试
+"""
+
+import argparse
+import copy
+import html
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeXConfig:
+    """仿X服务器配置"""
+
+    def __init__(self, timeline_length=200, page_size=10, virtual_window=0, latency_ms=0,
+                 retweet_ratio=0.4, media_ratio=0.1, quote_ratio=0.1, pinned=True,
+                 end_marker=True, followers=12345, seed=0, rate_limit_every=0):
+        """
+        Args:
+            timeline_length (int): 每个用户的推文总数
+            page_size (int): 每次懒加载返回的推文数
+            virtual_window (int): DOM中最多保留的推文数，0 表示不虚拟化
+            latency_ms (int): 页面与时间线接口的响应延迟（毫秒）
+            retweet_ratio (float): 转发推文比例
+            media_ratio (float): 纯媒体（无正文）推文比例
+            quote_ratio (float): 引用推文比例
+            pinned (bool): 第一条是否为置顶推文
+            end_marker (bool): 时间线加载完毕后是否显示结束标识
+            followers (int): 资料页显示的粉丝数
+            seed (int): 随机种子，同一用户名生成的时间线固定
+            rate_limit_every (int): 每第N次时间线接口请求返回429（页面显示“出错了”与重试按钮），0 表示不限流
+        """
+        self.timeline_length = timeline_length
+        self.page_size = page_size
+        self.virtual_window = virtual_window
+        self.latency_ms = latency_ms
+        self.retweet_ratio = retweet_ratio
+        self.media_ratio = media_ratio
+        self.quote_ratio = quote_ratio
+        self.pinned = pinned
+        self.end_marker = end_marker
+        self.followers = followers
+        self.seed = seed
+        self.rate_limit_every = rate_limit_every
+
+
+_WORDS = [
+    'crypto', 'market', 'today', 'launch', 'community', 'token', 'update', 'thread',
+    'building', 'airdrop', 'NFT', 'web3', '仮想通貨', '今日', '社区', '项目', 'チェック', 'alpha'
+]
+
+
+def format_count(value):
+    """按X的显示方式格式化数字（1234 -> 1,234 / 15929 -> 15K / 1234567 -> 1.2M）"""
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.1f}M".replace('.0M', 'M')
+    if value >= 10_000:
+        return f"{value // 1000}K"
+    return f"{value:,}"
+
+
+def generate_timeline(username, config):
+    """
+    生成确定性的合成时间线（从新到旧）
+
+    Returns:
+        list: 推文dict列表，kind 为 text / media / quote，另有 is_retweet / is_pinned 标记
+    """
+    rng = random.Random(config.seed * 1_000_003 + zlib.crc32(username.encode('utf-8')))
+    day = datetime.now() - timedelta(days=2)
+    tweets = []
+    for i in range(config.timeline_length):
+        day -= timedelta(hours=rng.randint(2, 40))
+        roll = rng.random()
+        kind = 'media' if roll < config.media_ratio else 'quote' if roll < config.media_ratio + config.quote_ratio else 'text'
+        is_pinned = config.pinned and i == 0
+        is_retweet = not is_pinned and rng.random() < config.retweet_ratio
+        author = f"friend{rng.randint(1, 50)}" if is_retweet else username
+        likes = int(rng.lognormvariate(3, 1.5))
+        tweets.append({
+            'id': 1_800_000_000_000_000_000 + zlib.crc32(f"{username}/{i}".encode()) * 1000 + i,
+            'kind': kind,
+            'author': author,
+            'display_name': author.capitalize(),
+            'date': f"{day:%b} {day.day}",
+            'text': f"#{i} " + ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(6, 30))),
+            'is_retweet': is_retweet,
+            'is_pinned': is_pinned,
+            'replies': int(likes * rng.random() * 0.3),
+            'retweets': int(likes * rng.random() * 0.4),
+            'likes': likes,
+            'views': likes * rng.randint(20, 200) + 1,
+        })
+    return tweets
+
+
+def render_tweet_article(tweet, owner_display_name):
+    """渲染单条推文的 article 标记（结构与线上一致，innerText 即 full_text 的格式）"""
+    esc = html.escape
+    parts = ['<article data-testid="tweet" role="article" tabindex="0">']
+    if tweet['is_pinned']:
+        parts.append('<div data-testid="socialContext">Pinned</div>')
+    elif tweet['is_retweet']:
+        parts.append(f'<div data-testid="socialContext">{esc(owner_display_name)} reposted</div>')
+    parts.append(
+        '<div data-testid="User-Name">'
+        f'<div><a href="/{esc(tweet["author"])}"><span>{esc(tweet["display_name"])}</span></a></div>'
+        f'<div><a href="/{esc(tweet["author"])}"><span>@{esc(tweet["author"])}</span></a></div>'
+        '<div><span>·</span></div>'
+        f'<div><a href="/{esc(tweet["author"])}/status/{tweet["id"]}"><time>{esc(tweet["date"])}</time></a></div>'
+        '</div>'
+    )
+    if tweet['kind'] != 'media':
+        parts.append(f'<div data-testid="tweetText" lang="en"><span>{esc(tweet["text"])}</span></div>')
+    if tweet['kind'] == 'media':
+        parts.append('<div data-testid="tweetPhoto"><img alt="Image" src="data:image/gif;base64,R0lGODlhAQABAAAAACw="></div>')
+    elif tweet['kind'] == 'quote':
+        parts.append(
+            '<div role="link" tabindex="0"><div data-testid="User-Name"><div><span>Quoted</span></div>'
+            '<div><span>@quoted</span></div></div>'
+            f'<div lang="en"><span>quoted: {esc(tweet["text"][:60])}</span></div></div>'
+        )
+    parts.append('<div role="group">')
+    for testid, label, key in (('reply', 'Replies. Reply', 'replies'),
+                               ('retweet', 'reposts. Repost', 'retweets'),
+                               ('like', 'Likes. Like', 'likes')):
+        value = tweet[key]
+        parts.append(
+            f'<button data-testid="{testid}" aria-label="{value} {label}" role="button">'
+            f'<div><span>{format_count(value) if value else ""}</span></div></button>'
+        )
+    parts.append(
+        f'<a data-testid="analytics" href="/{esc(tweet["author"])}/status/{tweet["id"]}/analytics" '
+        f'aria-label="{tweet["views"]} views. View post analytics"><div><span>{format_count(tweet["views"])}</span></div></a>'
+    )
+    parts.append('</div></article>')
+    return ''.join(parts)
+
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{display_name} (@{username}) / X</title>
+<style>
+body {{ margin: 0; font: 15px sans-serif; }}
+main {{ width: 600px; margin: 0 auto; }}
+article {{ display: block; padding: 12px; border-bottom: 1px solid #eee; min-height: 120px; }}
+[role=group] {{ display: flex; gap: 40px; }}
+button {{ background: none; border: 0; }}
+</style></head>
+<body><main>
+<div data-testid="primaryColumn">
+  <div data-testid="UserName"><div><span>{display_name}</span></div><div><span>@{username}</span></div></div>
+  <div data-testid="UserDescription">Synthetic profile for crawler benchmarks</div>
+  <div data-testid="UserProfileHeader_Items"><span data-testid="UserLocation">Tokyo</span></div>
+  <div data-testid="UserProfileStats">
+    <a href="/{username}/following"><span>321</span> <span>Following</span></a>
+    <a href="/{username}/verified_followers"><span>{followers}</span> <span>Followers</span></a>
+  </div>
+  <div><span>{posts} posts</span></div>
+  <section aria-label="Timeline">
+    <div id="spacer"></div>
+    <div id="timeline">{timeline_html}</div>
+    <div id="end"></div>
+  </section>
+</div>
+</main>
+<script>
+const CONFIG = {config_json};
+let cursor = 0, loading = false, done = false;
+const timeline = document.getElementById('timeline');
+const spacer = document.getElementById('spacer');
+let removedHeight = 0;
+
+function virtualize() {{
+  if (!CONFIG.virtual_window) return;
+  let articles = timeline.querySelectorAll('article');
+  let i = 0;
+  while (articles.length - i > CONFIG.virtual_window) {{
+    const rect = articles[i].getBoundingClientRect();
+    if (rect.bottom > -500) break;  // 只回收视口上方的推文
+    removedHeight += rect.height;
+    articles[i].remove();
+    i++;
+  }}
+  spacer.style.height = removedHeight + 'px';
+}}
+
+async function loadMore() {{
+  if (loading || done) return;
+  loading = true;
+  const response = await fetch('/api/timeline/' + CONFIG.username + '?cursor=' + cursor);
+  if (!response.ok) {{
+    showError();
+    loading = false;
+    return;
+  }}
+  const data = await response.json();
+  timeline.insertAdjacentHTML('beforeend', data.items.join(''));
+  cursor = data.next;
+  done = data.next === null;
+  if (done && CONFIG.end_marker) {{
+    document.getElementById('end').textContent = 'You\\u2019re all caught up';
+  }}
+  loading = false;
+  virtualize();
+}}
+
+function showError() {{
+  const end = document.getElementById('end');
+  end.innerHTML = '<div data-testid="error-detail"><span>Something went wrong. Try reloading.</span>' +
+    '<div><button role="button"><span>Retry</span></button></div></div>';
+  end.querySelector('button').addEventListener('click', () => {{
+    end.innerHTML = '';
+    loadMore();
+  }});
+}}
+
+if (!CONFIG.static) {{
+  window.addEventListener('scroll', () => {{
+    virtualize();
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 1500) loadMore();
+  }});
+  loadMore();
+}}
+</script>
+</body></html>
+"""
+
+
+def render_static_timeline_page(username, article_count, config=None):
+    """
+    渲染一次性包含全部推文的静态时间线页面（无懒加载、无虚拟化），用于大DOM压力测试
+
+    Args:
+        username (str): 用户名（决定生成的时间线内容）
+        article_count (int): 页面中的推文 article 数
+        config (FakeXConfig): 推文形态比例（转发/媒体/引用/置顶）等配置
+
+    Returns:
+        str: HTML页面
+    """
+    config = copy.copy(config or FakeXConfig())
+    config.timeline_length = article_count
+    display_name = username.capitalize()
+    return _PAGE_TEMPLATE.format(
+        username=html.escape(username),
+        display_name=html.escape(display_name),
+        followers=format_count(config.followers),
+        posts=format_count(article_count),
+        timeline_html=''.join(render_tweet_article(t, display_name) for t in generate_timeline(username, config)),
+        config_json=json.dumps({'username': username, 'static': True}),
+    )
+
+
+class FakeXServer(ThreadingHTTPServer):
+    """仿X HTTP服务器，按用户名缓存生成的时间线"""
+
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, _FakeXHandler)
+        self.config = config
+        self.request_count = 0
+        self.timeline_requests = 0
+        self._timelines = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def timeline_for(self, username):
+        with self._lock:
+            if username not in self._timelines:
+                self._timelines[username] = generate_timeline(username, self.config)
+            return self._timelines[username]
+
+
+class _FakeXHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        # 基准测试时不输出访问日志
+        pass
+
+    def _send(self, status, body, content_type):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        server.request_count += 1
+        if server.config.latency_ms:
+            time.sleep(server.config.latency_ms / 1000.0)
+
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        if len(parts) == 3 and parts[:2] == ['api', 'timeline']:
+            self._serve_timeline(parts[2], parse_qs(url.query))
+        elif len(parts) == 2 and parts[0] == 'static':
+            articles = int((parse_qs(url.query).get('articles') or ['100'])[0])
+            self._send(200, render_static_timeline_page(parts[1], articles, server.config),
+                       'text/html; charset=utf-8')
+        elif len(parts) == 1 and parts[0] != 'favicon.ico':
+            self._serve_profile(parts[0])
+        else:
+            self._send(404, 'Not Found', 'text/plain')
+
+    def _serve_profile(self, username):
+        config = self.server.config
+        display_name = username.capitalize()
+        page = _PAGE_TEMPLATE.format(
+            username=html.escape(username),
+            display_name=html.escape(display_name),
+            followers=format_count(config.followers),
+            posts=format_count(config.timeline_length),
+            timeline_html='',
+            config_json=json.dumps({
+                'username': username,
+                'virtual_window': config.virtual_window,
+                'end_marker': config.end_marker,
+            }),
+        )
+        self._send(200, page, 'text/html; charset=utf-8')
+
+    def _serve_timeline(self, username, query):
+        config = self.server.config
+        with self.server._lock:
+            self.server.timeline_requests += 1
+            limited = config.rate_limit_every and self.server.timeline_requests % config.rate_limit_every == 0
+        if limited:
+            self._send(429, json.dumps({'errors': [{'message': 'Rate limit exceeded', 'code': 88}]}),
+                       'application/json; charset=utf-8')
+            return
+        timeline = self.server.timeline_for(username)
+        cursor = int((query.get('cursor') or ['0'])[0])
+        end = min(cursor + config.page_size, len(timeline))
+        display_name = username.capitalize()
+        body = json.dumps({
+            'items': [render_tweet_article(t, display_name) for t in timeline[cursor:end]],
+            'next': end if end < len(timeline) else None,
+        }, ensure_ascii=False)
+        self._send(200, body, 'application/json; charset=utf-8')
+
+
+def start_fake_x_server(config=None, host='127.0.0.1', port=0):
+    """
+    在后台线程启动仿X服务器
+
+    Args:
+        config (FakeXConfig): 服务器配置
+        host (str): 监听地址
+        port (int): 端口，0 表示随机空闲端口
+
+    Returns:
+        FakeXServer: 已启动的服务器（base_url 为访问地址，结束时调用 shutdown()）
+    """
+    server = FakeXServer((host, port), config or FakeXConfig())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地仿X测试服务器')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeline-length', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--virtual-window', type=int, default=0, help='DOM中最多保留的推文数，0为不虚拟化')
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='每第N次时间线请求返回429')
+    args = parser.parse_args()
+
+    config = FakeXConfig(
+        timeline_length=args.timeline_length, page_size=args.page_size,
+        virtual_window=args.virtual_window, latency_ms=args.latency_ms, seed=args.seed,
+        rate_limit_every=args.rate_limit_every,
+    )
+    server = FakeXServer(('127.0.0.1', args.port), config)
+    print(f"🚀 仿X服务器已启动: {server.base_url}/<username>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🔚 服务器已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KOL数据分析模块
+将多个结果文件加载为NumPy数组，按用户做向量化统计并输出排名汇总表
+"""
+
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services.data_processor import DataProcessor
+from utils.profiling import profile_run
+from utils.result_reader import iter_users, result_file_paths
+
+
+# 汇总表可用的排序列
+SORT_COLUMNS = [
+    'engagement_per_tweet', 'retweet_ratio', 'posts_per_day',
+    'views_per_like', 'engagement_rate', 'followers', 'tweets'
+]
+
+
+class TweetArrays:
+    """按列存放的推文数据：用户级数组 + 推文级数组（通过 user_idx 关联）"""
+
+    def __init__(self, usernames, display_names, followers, user_idx,
+                 is_retweet, likes, retweets, replies, views, days):
+        # 用户级
+        self.usernames = usernames
+        self.display_names = display_names
+        self.followers = followers
+        # 推文级
+        self.user_idx = user_idx
+        self.is_retweet = is_retweet
+        self.likes = likes
+        self.retweets = retweets
+        self.replies = replies
+        self.views = views
+        self.days = days
+
+    @property
+    def user_count(self):
+        return len(self.usernames)
+
+    @property
+    def tweet_count(self):
+        return len(self.user_idx)
+
+
+def load_result_files(paths):
+    """
+    加载多个结果文件为 TweetArrays
+
+    Args:
+        paths (list): JSON结果文件路径列表
+
+    Returns:
+        TweetArrays: 列式数据
+    """
+    data_processor = DataProcessor()
+    numeric_cache = {}
+
+    def to_number(value):
+        # 互动数大量重复（如 "0"、"1"），缓存转换结果
+        key = str(value)
+        cached = numeric_cache.get(key)
+        if cached is None:
+            cached = data_processor.convert_to_numeric(key)
+            numeric_cache[key] = cached
+        return cached
+
+    usernames, display_names, followers = [], [], []
+    user_idx, is_retweet = [], []
+    likes, retweets, replies, views, days = [], [], [], [], []
+
+    for path in paths:
+        for user in iter_users(path):
+            if not isinstance(user, dict):
+                continue
+            idx = len(usernames)
+            usernames.append(user.get('username') or user.get('url') or '')
+            # display_name 抓取时包含 "\n@username"，只保留第一行
+            display_names.append((user.get('display_name') or '').split('\n')[0])
+            followers.append(to_number(user.get('followers', '0')))
+
+            tweets = user.get('recent_tweets') or []
+            if any('date_iso' not in tweet for tweet in tweets):
+                # 旧结果文件没有 date_iso：已按日期重排，只能以爬取时间推断年份
+                try:
+                    scraped_at = datetime.fromisoformat(user.get('scraped_at', ''))
+                    data_processor.normalize_timeline_dates(
+                        tweets, scraped_at, timeline_order=False, reparse_full_text=True)
+                except (TypeError, ValueError):
+                    pass
+
+            for tweet in tweets:
+                interactions = tweet.get('interactions') or {}
+                user_idx.append(idx)
+                is_retweet.append(bool(tweet.get('is_retweet', False)))
+                likes.append(to_number(interactions.get('likes', '0')))
+                retweets.append(to_number(interactions.get('retweets', '0')))
+                replies.append(to_number(interactions.get('replies', '0')))
+                views.append(to_number(interactions.get('views', '0')))
+                days.append(np.datetime64(tweet.get('date_iso') or 'NaT', 'D'))
+
+    return TweetArrays(
+        usernames=np.array(usernames, dtype=object),
+        display_names=np.array(display_names, dtype=object),
+        followers=np.array(followers, dtype=np.float64),
+        user_idx=np.array(user_idx, dtype=np.int64),
+        is_retweet=np.array(is_retweet, dtype=bool),
+        likes=np.array(likes, dtype=np.float64),
+        retweets=np.array(retweets, dtype=np.float64),
+        replies=np.array(replies, dtype=np.float64),
+        views=np.array(views, dtype=np.float64),
+        days=np.array(days, dtype='datetime64[D]'),
+    )
+
+
+def _grouped_percentile(values, user_idx, user_count, q):
+    """
+    向量化的分组百分位数（线性插值）
+
+    Args:
+        values (np.ndarray): 推文级数值
+        user_idx (np.ndarray): 每条推文所属用户下标
+        user_count (int): 用户总数
+        q (float): 百分位 0-100
+
+    Returns:
+        np.ndarray: 每个用户的百分位值，无推文的用户为 NaN
+    """
+    result = np.full(user_count, np.nan)
+    if len(values) == 0:
+        return result
+    order = np.lexsort((values, user_idx))
+    sorted_values = values[order]
+    counts = np.bincount(user_idx, minlength=user_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has_data = counts > 0
+
+    position = starts[has_data] + (counts[has_data] - 1) * (q / 100.0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    weight = position - lower
+    result[has_data] = sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+    return result
+
+
+def compute_user_metrics(arrays):
+    """
+    对所有用户做向量化统计
+
+    Args:
+        arrays (TweetArrays): 列式数据
+
+    Returns:
+        dict: 指标名 -> 用户级 np.ndarray
+    """
+    n_users = arrays.user_count
+    idx = arrays.user_idx
+
+    def per_user_sum(weights):
+        return np.bincount(idx, weights=weights, minlength=n_users)
+
+    tweets = np.bincount(idx, minlength=n_users).astype(np.float64)
+    retweet_count = per_user_sum(arrays.is_retweet.astype(np.float64))
+    engagement = arrays.likes + arrays.retweets + arrays.replies
+    engagement_sum = per_user_sum(engagement)
+    likes_sum = per_user_sum(arrays.likes)
+    views_sum = per_user_sum(arrays.views)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        retweet_ratio = np.where(tweets > 0, retweet_count / tweets * 100, 0.0)
+        engagement_per_tweet = np.where(tweets > 0, engagement_sum / tweets, 0.0)
+        views_per_like = np.where(likes_sum > 0, views_sum / likes_sum, np.nan)
+        engagement_rate = np.where(views_sum > 0, engagement_sum / views_sum * 100, np.nan)
+
+    # 发帖频率：有效日期跨度内的日均推文数
+    dated = ~np.isnat(arrays.days)
+    day_numbers = arrays.days[dated].astype(np.int64)
+    dated_idx = idx[dated]
+    first_day = np.full(n_users, np.iinfo(np.int64).max)
+    last_day = np.full(n_users, np.iinfo(np.int64).min)
+    np.minimum.at(first_day, dated_idx, day_numbers)
+    np.maximum.at(last_day, dated_idx, day_numbers)
+    dated_tweets = np.bincount(dated_idx, minlength=n_users).astype(np.float64)
+    span_days = np.where(dated_tweets > 0, last_day - first_day + 1, 0).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        posts_per_day = np.where(span_days > 0, dated_tweets / span_days, np.nan)
+
+    return {
+        'tweets': tweets,
+        'retweet_count': retweet_count,
+        'retweet_ratio': retweet_ratio,
+        'engagement_per_tweet': engagement_per_tweet,
+        'engagement_p50': _grouped_percentile(engagement, idx, n_users, 50),
+        'engagement_p90': _grouped_percentile(engagement, idx, n_users, 90),
+        'views_per_like': views_per_like,
+        'engagement_rate': engagement_rate,
+        'posts_per_day': posts_per_day,
+        'followers': arrays.followers,
+    }
+
+
+def build_summary_table(arrays, metrics, sort_by='engagement_per_tweet'):
+    """
+    构建排名汇总表
+
+    Args:
+        arrays (TweetArrays): 列式数据
+        metrics (dict): compute_user_metrics 的结果
+        sort_by (str): 排序列（降序）
+
+    Returns:
+        pandas.DataFrame: 带排名与百分位排名的汇总表
+    """
+    table = pd.DataFrame({
+        'username': arrays.usernames,
+        'display_name': arrays.display_names,
+        **metrics,
+    })
+    table[['tweets', 'retweet_count']] = table[['tweets', 'retweet_count']].astype(np.int64)
+    # 排序指标在所有用户中的百分位排名（0-100）
+    table['percentile'] = table[sort_by].rank(pct=True, na_option='keep') * 100
+    table = table.sort_values(sort_by, ascending=False, na_position='last').reset_index(drop=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
+
+
+def describe_percentiles(metrics, percentiles=(50, 90, 99)):
+    """
+    计算各指标在所有用户上的分位数
+
+    Returns:
+        pandas.DataFrame: 行为指标，列为分位数
+    """
+    rows = {}
+    for name, values in metrics.items():
+        valid = values[~np.isnan(values)]
+        rows[name] = [np.percentile(valid, p) if len(valid) else np.nan for p in percentiles]
+    return pd.DataFrame.from_dict(rows, orient='index', columns=[f'p{p}' for p in percentiles])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KOL结果文件向量化分析')
+    parser.add_argument('paths', nargs='*', help='结果JSON文件，默认 results/ 下所有结果文件')
+    parser.add_argument('--sort-by', default='engagement_per_tweet', choices=SORT_COLUMNS)
+    parser.add_argument('--top', type=int, default=30, help='控制台显示前N名')
+    parser.add_argument('--csv', help='将完整汇总表保存为CSV')
+    parser.add_argument('--profile', action='store_true', help='剖析各阶段耗时与内存，报告写入 results/')
+    args = parser.parse_args()
+
+    paths = args.paths or result_file_paths('results')
+    if not paths:
+        print("❌ 未找到结果文件")
+        return
+
+    with profile_run('kol_analytics_profile', enabled=args.profile) as profiler:
+        arrays = load_result_files(paths)
+        if profiler:
+            profiler.checkpoint('load_result_files')
+        metrics = compute_user_metrics(arrays)
+        if profiler:
+            profiler.checkpoint('compute_user_metrics')
+        table = build_summary_table(arrays, metrics, args.sort_by)
+
+    print(f"📊 已加载 {len(paths)} 个文件: {arrays.user_count} 个用户, {arrays.tweet_count} 条推文")
+    print("=" * 60)
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:.2f}'.format):
+        print(table.head(args.top).to_string(index=False))
+        print("\n📈 指标分位数:")
+        print(describe_percentiles(metrics).to_string())
+
+    if args.csv:
+        table.to_csv(args.csv, index=False, encoding='utf-8-sig')
+        print(f"\n📁 汇总表已保存: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能剖析模块
+用 cProfile 记录整次运行的函数耗时（导航、用户信息、推文获取、结果写入等 tracing 阶段各自单独剖析），
+并在用户之间（或处理阶段之间）用 tracemalloc 拍内存快照，结束时在 results/ 下输出：
+  - <name>_<时间>.prof          整次运行的 pstats 原始数据（可用 snakeviz / python -m pstats 查看）
+  - <name>_<时间>_<阶段>.prof   各阶段的 pstats 原始数据（只写出运行中出现过的阶段）
+  - <name>_<时间>_profile.txt   热点函数 + 按模块汇总的耗时 + 各阶段热点函数
+  - <name>_<时间>_memory.txt    各检查点内存占用、存活 WebElement 数与增长最多的代码行
+"""
+
+import cProfile
+import gc
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.tracing import tracer
+
+# 单独剖析的阶段：按 span 名称或分类匹配 utils.tracing 中的区间
+DEFAULT_STAGES = ('navigation', 'user_info', 'get_user_tweets', 'output')
+
+
+def _module_group(filename):
+    """把源文件归到模块组（项目模块按 包.模块，第三方与标准库按顶层包）"""
+    if filename.startswith('~') or filename.startswith('<'):
+        return 'builtins'
+    path = filename.replace('\\', '/')
+    for marker in ('/site-packages/', '/dist-packages/'):
+        if marker in path:
+            return path.split(marker, 1)[1].split('/', 1)[0]
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))).replace('\\', '/')
+    if path.startswith(project_root + '/'):
+        return os.path.splitext(path[len(project_root) + 1:])[0].replace('/', '.')
+    return 'stdlib'
+
+
+def _count_live_web_elements():
+    """统计存活的 WebElement 对象数（跨用户持续增长说明有引用泄漏）"""
+    return sum(1 for obj in gc.get_objects() if type(obj).__name__ == 'WebElement')
+
+
+class RunProfiler:
+    """一次运行的CPU与内存剖析"""
+
+    def __init__(self, name, output_dir='results', top=40, memory_frames=10, stages=DEFAULT_STAGES):
+        """
+        Args:
+            name (str): 报告文件名前缀
+            output_dir (str): 报告目录
+            top (int): 报告中列出的热点函数/内存增长行数
+            memory_frames (int): tracemalloc 保存的调用栈深度
+            stages (tuple): 单独剖析的 span 名称或分类
+        """
+        self.name = name
+        self.output_dir = output_dir
+        self.top = top
+        self.memory_frames = memory_frames
+        self.stages = tuple(stages or ())
+        self.profiler = cProfile.Profile()
+        self.stage_profilers = {}
+        self.checkpoints = []
+        self._previous_snapshot = None
+        self._started = None
+        # 同一时刻只能有一个 cProfile 生效：进入阶段 span 时切换到该阶段的剖析器，退出时切回
+        self._active = self.profiler
+        self._stack = []
+        self._thread = None
+
+    def start(self):
+        """开始剖析"""
+        tracemalloc.start(self.memory_frames)
+        self._previous_snapshot = tracemalloc.take_snapshot()
+        self._started = time.perf_counter()
+        self._thread = threading.get_ident()
+        if self.stages:
+            tracer.add_listener(self)
+        self._active = self.profiler
+        self.profiler.enable()
+
+    def _switch(self, profile):
+        """停用当前剖析器并启用另一个"""
+        if profile is self._active:
+            return
+        self._active.disable()
+        self._active = profile
+        profile.enable()
+
+    def span_started(self, name, cat):
+        """tracing 回调：进入阶段 span 时切换到该阶段的剖析器（只剖析主线程）"""
+        if self._started is None or threading.get_ident() != self._thread:
+            return
+        self._stack.append(self._active)
+        stage = name if name in self.stages else cat if cat in self.stages else None
+        if stage:
+            self._switch(self.stage_profilers.setdefault(stage, cProfile.Profile()))
+
+    def span_finished(self, name, cat):
+        """tracing 回调：退出 span 时切回进入前的剖析器"""
+        if self._started is None or threading.get_ident() != self._thread or not self._stack:
+            return
+        self._switch(self._stack.pop())
+
+    def checkpoint(self, label):
+        """
+        记录一个内存检查点（与上一个检查点比较）
+
+        Args:
+            label (str): 检查点名，如 'after @username'
+        """
+        if self._started is None:
+            return
+        active = self._active
+        active.disable()
+        try:
+            gc.collect()
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            growth = snapshot.compare_to(self._previous_snapshot, 'lineno')
+            self.checkpoints.append({
+                'label': label,
+                'elapsed': time.perf_counter() - self._started,
+                'current': current,
+                'peak': peak,
+                'web_elements': _count_live_web_elements(),
+                'growth': [stat for stat in growth if stat.size_diff > 0][:self.top],
+            })
+            self._previous_snapshot = snapshot
+        finally:
+            active.enable()
+
+    def stop(self):
+        """
+        结束剖析并写出报告
+
+        Returns:
+            list: 写出的文件路径
+        """
+        if self._started is None:
+            return []
+        self._active.disable()
+        tracer.remove_listener(self)
+        self._active = self.profiler
+        self._stack = []
+        self.checkpoint('end')
+        self.profiler.disable()
+        tracemalloc.stop()
+        self._started = None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        prof_path = prefix + '.prof'
+        self.stats().dump_stats(prof_path)
+        stage_paths = []
+        for stage, profile in self.stage_profilers.items():
+            stage_paths.append(f"{prefix}_{stage}.prof")
+            profile.dump_stats(stage_paths[-1])
+
+        profile_path = prefix + '_profile.txt'
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            f.write(self.format_profile())
+        memory_path = prefix + '_memory.txt'
+        with open(memory_path, 'w', encoding='utf-8') as f:
+            f.write(self.format_memory())
+        return [prof_path, *stage_paths, profile_path, memory_path]
+
+    def stats(self, stream=None):
+        """整次运行的统计（合并各阶段剖析器）"""
+        stats = pstats.Stats(self.profiler, stream=stream)
+        for profile in self.stage_profilers.values():
+            stats.add(profile)
+        return stats
+
+    def module_breakdown(self, stats=None):
+        """
+        按模块汇总自身耗时（tottime）
+
+        Args:
+            stats (pstats.Stats): 要汇总的统计，默认整次运行
+
+        Returns:
+            list: [(模块组, 自身耗时秒, 调用次数)]，按耗时降序
+        """
+        stats = stats or self.stats()
+        groups = {}
+        for (filename, _, _), (_, ncalls, tottime, _, _) in stats.stats.items():
+            entry = groups.setdefault(_module_group(filename), [0.0, 0])
+            entry[0] += tottime
+            entry[1] += ncalls
+        return sorted(((name, t, n) for name, (t, n) in groups.items()), key=lambda row: row[1], reverse=True)
+
+    def format_profile(self):
+        """热点函数与模块耗时报告"""
+        out = io.StringIO()
+        breakdown = self.module_breakdown()
+        total = sum(t for _, t, _ in breakdown) or 1
+        out.write(f"按模块汇总（自身耗时）\n{'=' * 60}\n")
+        for name, seconds, calls in breakdown:
+            out.write(f"{name:<40} {seconds:>9.3f}s {seconds / total * 100:5.1f}% {calls:>10} 次调用\n")
+        out.write(f"\n热点函数（累计耗时前{self.top}）\n{'=' * 60}\n")
+        stats = self.stats(stream=out)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        out.write(f"\n热点函数（自身耗时前{self.top}）\n{'=' * 60}\n")
+        stats.sort_stats('tottime').print_stats(self.top)
+        for stage, profile in self.stage_profilers.items():
+            stage_stats = pstats.Stats(profile, stream=out)
+            out.write(f"\n[阶段 {stage}] 按模块汇总（自身耗时，共 {stage_stats.total_tt:.3f}s）\n{'=' * 60}\n")
+            for name, seconds, calls in self.module_breakdown(stage_stats)[:10]:
+                out.write(f"{name:<40} {seconds:>9.3f}s {calls:>10} 次调用\n")
+            out.write(f"\n[阶段 {stage}] 热点函数（自身耗时前{self.top}）\n")
+            stage_stats.sort_stats('tottime').print_stats(self.top)
+        return out.getvalue()
+
+    def format_memory(self):
+        """内存检查点报告"""
+        out = io.StringIO()
+        out.write(f"内存检查点\n{'=' * 60}\n")
+        out.write(f"{'检查点':<32} {'耗时(s)':>9} {'当前(MB)':>9} {'峰值(MB)':>9} {'WebElement':>10}\n")
+        for cp in self.checkpoints:
+            out.write(f"{cp['label'][:32]:<32} {cp['elapsed']:>9.1f} {cp['current'] / 1e6:>9.2f} "
+                      f"{cp['peak'] / 1e6:>9.2f} {cp['web_elements']:>10}\n")
+        for cp in self.checkpoints:
+            if not cp['growth']:
+                continue
+            out.write(f"\n[{cp['label']}] 相比上一检查点增长最多的代码行\n")
+            for stat in cp['growth']:
+                out.write(f"  {stat}\n")
+        return out.getvalue()
+
+
+@contextmanager
+def profile_run(name, enabled=True, output_dir='results'):
+    """
+    在 with 块内剖析运行；未启用时产出 None
+
+    Args:
+        name (str): 报告文件名前缀
+        enabled (bool): 是否启用
+        output_dir (str): 报告目录
+
+    Yields:
+        RunProfiler or None: 可调用 checkpoint() 记录阶段内存
+    """
+    if not enabled:
+        yield None
+        return
+    profiler = RunProfiler(name, output_dir)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        paths = profiler.stop()
+        print("🔬 剖析报告已保存:")
+        for path in paths:
+            print(f"  {path}")
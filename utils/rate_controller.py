@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全局速率控制模块
+用自适应间隔代替固定的用户间等待：连续成功时逐步缩短间隔，遇到限流（429 / 限流提示页）时成倍拉长，
+遇到“出错了，请重试”页面时适度拉长，从而在站点可承受的范围内尽量快地运行。
+同时提供页面内重试用的指数退避时长。
+"""
+
+import random
+import threading
+import time
+
+from utils.tracing import span
+
+
+class RateController:
+    """自适应用户间隔（乘性增加 / 乘性减少）"""
+
+    def __init__(self, initial_delay=5.0, min_delay=1.0, max_delay=300.0,
+                 decrease_factor=0.85, increase_factor=2.0, backoff_base=5.0, backoff_cap=120.0):
+        """
+        Args:
+            initial_delay (float): 初始用户间隔（秒）
+            min_delay (float): 最短间隔
+            max_delay (float): 最长间隔
+            decrease_factor (float): 每次成功后间隔乘以该系数
+            increase_factor (float): 每次限流后间隔乘以该系数
+            backoff_base (float): 页面内重试的首次退避时长（秒）
+            backoff_cap (float): 单次退避上限（秒）
+        """
+        self.delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.decrease_factor = decrease_factor
+        self.increase_factor = increase_factor
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.events = {'success': 0, 'rate_limited': 0, 'page_error': 0}
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        """一个用户顺利完成：缩短间隔"""
+        with self._lock:
+            self.events['success'] += 1
+            self.delay = max(self.min_delay, self.delay * self.decrease_factor)
+
+    def record_rate_limit(self, retry_after=None):
+        """
+        遇到限流（429或限流提示页）：成倍拉长间隔
+
+        Args:
+            retry_after (float): 站点给出的建议等待秒数
+        """
+        with self._lock:
+            self.events['rate_limited'] += 1
+            self.delay = min(self.max_delay, max(self.delay * self.increase_factor, retry_after or 0))
+            if retry_after:
+                self._cooldown_until = max(self._cooldown_until, time.time() + retry_after)
+
+    def record_page_error(self):
+        """遇到“出错了，请重试”页面（常与限流相伴）：适度拉长间隔"""
+        with self._lock:
+            self.events['page_error'] += 1
+            self.delay = min(self.max_delay, self.delay * (1 + self.increase_factor) / 2)
+
+    def backoff_delay(self, attempt):
+        """
+        页面内第 attempt 次（从0开始）重试前的指数退避时长（带±20%抖动）
+
+        Returns:
+            float: 秒数
+        """
+        return min(self.backoff_cap, self.backoff_base * (2 ** attempt)) * random.uniform(0.8, 1.2)
+
+    def next_delay(self):
+        """下一次用户间等待的秒数（包含限流冷却的剩余时间）"""
+        with self._lock:
+            return max(self.delay, self._cooldown_until - time.time())
+
+    def wait(self):
+        """
+        执行用户间等待
+
+        Returns:
+            float: 实际等待秒数
+        """
+        seconds = self.next_delay()
+        with span('sleep:between_users', cat='sleep', seconds=round(seconds, 2)):
+            time.sleep(seconds)
+        return seconds
+
+
+# 进程级默认速率控制器（各服务在检测到限流时反馈到这里）
+rate_controller = RateController()
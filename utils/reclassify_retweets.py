@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线转发重分类
+使用与在线检测相同的转发规则，重新判定结果文件中每条推文的 is_retweet，并重算 retweet_stats
+修改检测规则后无需重新爬取
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+if __package__ in (None, ''):
+    # 以脚本方式运行时，将项目根目录加入路径
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.data_processor import DataProcessor
+from utils.profiling import profile_run
+from utils.result_reader import iter_users, result_file_paths, write_users
+
+
+def reclassify_user(user, data_processor, stats):
+    """
+    重新判定单个用户的推文类型
+
+    Args:
+        user (dict): 结果文件中的用户数据（原地修改）
+        data_processor (DataProcessor): 数据处理器
+        stats (dict): 累计统计（原地更新）
+
+    Returns:
+        dict: 修改后的用户数据
+    """
+    tweets = user.get('recent_tweets') or []
+    for tweet in tweets:
+        full_text = tweet.get('full_text')
+        if not full_text:
+            # 未保存 full_text 的推文无法离线判定，保留原值
+            stats['skipped'] += 1
+            continue
+        is_retweet = data_processor.detect_retweet_from_full_text(full_text, tweet.get('text', ''))
+        if is_retweet != bool(tweet.get('is_retweet', False)):
+            stats['to_retweet' if is_retweet else 'to_original'] += 1
+            tweet['is_retweet'] = is_retweet
+        stats['tweets'] += 1
+
+    if 'retweet_stats' in user or tweets:
+        user['retweet_stats'] = data_processor.calculate_retweet_ratio(tweets)
+    stats['users'] += 1
+    return user
+
+
+def reclassify_file(path, output_path=None, dry_run=False):
+    """
+    重分类单个结果文件（流式读写，逐个用户处理）
+
+    Args:
+        path (str): 结果文件路径
+        output_path (str): 输出路径，默认覆盖原文件
+        dry_run (bool): 只统计不写出
+
+    Returns:
+        dict: 统计信息
+    """
+    data_processor = DataProcessor()
+    stats = {'users': 0, 'tweets': 0, 'to_retweet': 0, 'to_original': 0, 'skipped': 0}
+    users = (reclassify_user(user, data_processor, stats) for user in iter_users(path))
+
+    if dry_run:
+        for _ in users:
+            pass
+    else:
+        write_users(output_path or path, users)
+    return stats
+
+
+def _reclassify_job(args):
+    return reclassify_file(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线转发重分类')
+    parser.add_argument('paths', nargs='*', help='结果JSON文件，默认 results/ 下所有结果文件')
+    parser.add_argument('--dry-run', action='store_true', help='只统计变化，不写回文件')
+    parser.add_argument('--output-dir', help='输出到指定目录，而不是覆盖原文件')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认CPU核数')
+    parser.add_argument('--profile', action='store_true',
+                        help='单进程运行并剖析耗时与内存（每个文件一个检查点），报告写入 results/')
+    args = parser.parse_args()
+
+    paths = args.paths or result_file_paths('results')
+    if not paths:
+        print("❌ 未找到结果文件")
+        return
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [
+        (path, os.path.join(args.output_dir, os.path.basename(path)) if args.output_dir else None, args.dry_run)
+        for path in paths
+    ]
+
+    # 剖析只覆盖当前进程，因此剖析时不使用进程池
+    workers = 1 if args.profile else min(args.workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        with profile_run('reclassify_profile', enabled=args.profile) as profiler:
+            results = []
+            for job in jobs:
+                results.append(_reclassify_job(job))
+                if profiler:
+                    profiler.checkpoint(os.path.basename(job[0]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_reclassify_job, jobs))
+
+    print("🔍 离线转发重分类" + ("（dry-run）" if args.dry_run else ""))
+    print("=" * 60)
+    for path, stats in zip(paths, results):
+        print(f"📁 {path}")
+        print(f"  用户: {stats['users']}, 推文: {stats['tweets']}, 跳过(无full_text): {stats['skipped']}")
+        print(f"  原创→转发: {stats['to_retweet']}, 转发→原创: {stats['to_original']}")
+
+
+if __name__ == "__main__":
+    main()
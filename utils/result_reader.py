@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结果文件读写模块
+流式解析结果JSON的顶层数组（逐个用户产出），并提供带缓存的多进程文件扫描
+"""
+
+import glob
+import gzip
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖：只有读写 .zst 文件时才需要
+    zstandard = None
+
+
+DEFAULT_CACHE_PATH = os.path.join('results', '.scan_cache.json')
+RESULT_SUFFIXES = ('.json', '.json.gz', '.json.zst')
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+
+def result_file_paths(results_dir='results'):
+    """列出结果目录下的所有结果文件（含 gzip / zstd 压缩文件），按路径排序"""
+    paths = []
+    for suffix in RESULT_SUFFIXES:
+        paths.extend(glob.glob(os.path.join(results_dir, '*' + suffix)))
+    return sorted(paths)
+
+
+def open_result_file(path, mode='r', compression=None):
+    """
+    按扩展名打开结果文件（.gz 使用gzip，.zst 使用zstd，其余为普通文本）
+
+    Args:
+        path (str): 文件路径
+        mode (str): 'r' 或 'w'
+        compression (str): 指定压缩格式 'gzip' / 'zstd'，默认由扩展名推断
+
+    Returns:
+        文本文件对象（utf-8）
+    """
+    if compression is None:
+        if path.endswith('.gz'):
+            compression = 'gzip'
+        elif path.endswith('.zst'):
+            compression = 'zstd'
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("读写 .zst 文件需要安装 zstandard: pip install zstandard")
+        return zstandard.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def compression_suffix(compression):
+    """压缩格式对应的文件扩展名"""
+    return {None: '', 'gzip': '.gz', 'zstd': '.zst'}[compression]
+
+
+def iter_users(path, chunk_size=1 << 16):
+    """
+    流式读取结果文件（支持 .gz / .zst），逐个产出顶层数组中的元素（通常为用户dict）
+
+    内存占用只与单个用户的数据量相关，而与文件大小无关
+
+    Args:
+        path (str): 结果JSON文件路径
+        chunk_size (int): 每次读取的字符数
+
+    Yields:
+        object: 顶层数组中的元素；顶层不是数组的文件不产出任何元素（与原先跳过非数组文件一致）
+    """
+    with open_result_file(path) as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill(min_size):
+            nonlocal buffer, pos, eof
+            chunk = f.read(max(chunk_size, min_size))
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill(0)
+
+        skip_whitespace()
+        if pos >= len(buffer):
+            return
+        if buffer[pos] != '[':
+            # 非数组文档不是结果文件，跳过
+            return
+        pos += 1
+
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"{path}: 顶层数组未闭合")
+            if buffer[pos] == ']':
+                return
+            if buffer[pos] == ',':
+                pos += 1
+                continue
+
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # 当前元素不完整：读取更多数据（按已缓冲长度倍增，避免大元素反复解析）
+                fill(len(buffer) - pos)
+                continue
+            if not eof and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+                # 元素后面不是分隔符：数字在块边界处被截断（如 "-1500." | "0"），补充数据后重新解析
+                fill(len(buffer) - pos)
+                continue
+            pos = end
+            yield item
+
+
+def load_results(path):
+    """
+    读取整个结果文件（支持 .gz / .zst），返回与 json.load 相同的用户dict列表
+
+    Args:
+        path (str): 结果文件路径
+
+    Returns:
+        list: 用户dict列表
+    """
+    return list(iter_users(path))
+
+
+def write_users(path, users, indent=2):
+    """
+    流式写出结果文件（格式与 json.dump(..., indent=2) 一致），先写临时文件再原子替换
+
+    Args:
+        path (str): 目标文件路径，以 .gz / .zst 结尾时压缩输出
+        users (iterable): 用户dict的可迭代对象（可以是 iter_users 的生成器）
+        indent (int): 缩进；None 表示紧凑输出（适合压缩归档）
+
+    Returns:
+        int: 写出的用户数
+    """
+    tmp_path = path + '.tmp'
+    count = 0
+    try:
+        compression = 'gzip' if path.endswith('.gz') else 'zstd' if path.endswith('.zst') else None
+        with open_result_file(tmp_path, 'w', compression) as f:
+            f.write('[')
+            for user in users:
+                if indent is None:
+                    f.write(',' if count else '')
+                    f.write(json.dumps(user, ensure_ascii=False, separators=(',', ':')))
+                else:
+                    text = json.dumps(user, ensure_ascii=False, indent=indent)
+                    pad = ' ' * indent
+                    f.write((',\n' if count else '\n') + pad)
+                    f.write(text.replace('\n', '\n' + pad))
+                count += 1
+            f.write('\n]' if count and indent is not None else ']')
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _summarizer_name(summarize):
+    return f"{summarize.__module__}.{summarize.__qualname__}"
+
+
+def _summarizer_version(summarize):
+    """
+    汇总函数的版本：所在模块与本模块源码的哈希，再加上可选的 summarize.cache_version
+    （汇总函数、同模块的辅助函数或流式解析改动后，旧缓存自动失效）
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for source in (inspect.getsourcefile(summarize), __file__):
+        try:
+            with open(source, 'rb') as f:
+                digest.update(f.read())
+        except (OSError, TypeError):
+            # 取不到源码时退回函数字节码
+            digest.update(summarize.__code__.co_code)
+    digest.update(str(getattr(summarize, 'cache_version', '')).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path, cache):
+    directory = os.path.dirname(cache_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+def scan_files(paths, summarize, workers=None, cache_path=DEFAULT_CACHE_PATH):
+    """
+    对多个结果文件执行汇总函数，未变化的文件直接使用缓存
+
+    缓存以 (文件路径, 汇总函数及其版本) 为键，并校验 mtime 与文件大小；
+    汇总函数代码变化后旧版本的缓存整体丢弃
+
+    Args:
+        paths (list): 结果文件路径列表
+        summarize (callable): 模块级函数 summarize(path) -> 可JSON序列化的汇总结果
+        workers (int): 进程数，默认 CPU 核数；为 1 时在当前进程内执行
+        cache_path (str): 缓存文件路径，None 表示不使用缓存
+
+    Returns:
+        list: 与 paths 顺序一致的 (path, summary) 列表
+    """
+    name = _summarizer_name(summarize)
+    key_name = f"{name}@{_summarizer_version(summarize)}"
+    cache = _load_cache(cache_path) if cache_path else {}
+    for stale in [k for k in cache if k != key_name and (k == name or k.startswith(name + '@'))]:
+        del cache[stale]
+    entries = cache.setdefault(key_name, {})
+
+    summaries = {}
+    signatures = {}
+    pending = []
+    for path in paths:
+        key = os.path.abspath(path)
+        signatures[key] = list(_file_signature(path))
+        cached = entries.get(key)
+        if cached and cached.get('signature') == signatures[key]:
+            summaries[key] = cached['summary']
+        else:
+            pending.append(path)
+
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        workers = min(workers, len(pending))
+        if workers <= 1:
+            computed = [summarize(path) for path in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                computed = list(executor.map(summarize, pending))
+
+        for path, summary in zip(pending, computed):
+            key = os.path.abspath(path)
+            summaries[key] = summary
+            entries[key] = {'signature': signatures[key], 'summary': summary}
+
+        if cache_path:
+            # 清理已不存在的文件的缓存
+            for key in [k for k in entries if not os.path.exists(k)]:
+                del entries[key]
+            _save_cache(cache_path, cache)
+
+    return [(path, summaries[os.path.abspath(path)]) for path in paths]
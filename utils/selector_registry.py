@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+选择器注册表模块
+搜索框、用户链接、资料页字段等都用一长串候选选择器按顺序尝试，每次未命中都是一次多余的WebDriver往返。
+注册表按“选择器链”记录每个选择器的命中情况（指数滑动平均得分），下次按得分从高到低尝试，
+常见情况下第一次就命中；学到的顺序保存在 results/.selector_stats.json，跨运行保留。
+排名第一的选择器未命中而不得不往后回落时，说明页面DOM可能已改版，打印提示并计入回落次数。
+链末尾的宽泛兜底选择器（如 '.css-1rynq56'、'[data-testid="UserCell"] a'）可能命中无关元素，
+调用方以 fallbacks 标出：它们只统计命中、不参与排序，始终按原顺序排在具体选择器之后，
+否则一次兜底命中（如没有简介的资料页）就会把它提到前面，之后每个用户都取到无关文本。
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from selenium.webdriver.common.by import By
+
+from utils.crawl_metrics import metrics
+
+DEFAULT_STATS_PATH = os.path.join('results', '.selector_stats.json')
+
+# 未知选择器的初始得分；得分相同时保持链中原有顺序
+_INITIAL_SCORE = 0.5
+# 每次结果在得分中的权重（越大越快适应DOM变化）
+_SCORE_WEIGHT = 0.3
+
+
+class SelectorRegistry:
+    """按命中率排序选择器链并持久化"""
+
+    def __init__(self, path=DEFAULT_STATS_PATH):
+        """
+        Args:
+            path (str): 统计文件路径，None 表示不读写文件
+        """
+        self.path = path
+        self.stats = {}
+        self.fallthroughs = {}
+        self._fallbacks = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            self.stats = {}
+
+    def ordered(self, chain, keys, fallbacks=()):
+        """
+        按学习到的得分排序（兜底选择器不参与排序，按原顺序排在最后）
+
+        Args:
+            chain (str): 选择器链名称（如 'navigation.search_box'）
+            keys (list): 链中的选择器（或带占位符的选择器模板），按原有优先顺序
+            fallbacks (iterable): keys 中的宽泛兜底选择器
+
+        Returns:
+            list: 排序后的选择器
+        """
+        fallbacks = set(fallbacks)
+        with self._lock:
+            self._ensure_loaded()
+            if fallbacks:
+                self._fallbacks[chain] = fallbacks
+            entries = self.stats.get(chain, {})
+            scored = [(-entries.get(key, {}).get('score', _INITIAL_SCORE), index, key)
+                      for index, key in enumerate(keys) if key not in fallbacks]
+        return [key for _, _, key in sorted(scored)] + [key for key in keys if key in fallbacks]
+
+    def record(self, chain, tried, hit):
+        """
+        记录一次查找：tried 中 hit 之前的选择器都未命中
+
+        Args:
+            chain (str): 选择器链名称
+            tried (list): 实际按顺序尝试过的选择器
+            hit (str): 命中的选择器，None 表示整条链都未命中
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entries = self.stats.setdefault(chain, {})
+            now = datetime.now().isoformat(timespec='seconds')
+            for key in tried:
+                entry = entries.setdefault(key, {'score': _INITIAL_SCORE, 'hits': 0, 'misses': 0})
+                is_hit = key == hit
+                entry['score'] = round((1 - _SCORE_WEIGHT) * entry['score'] + _SCORE_WEIGHT * is_hit, 4)
+                if is_hit:
+                    entry['hits'] += 1
+                    entry['last_hit'] = now
+                    break
+                entry['misses'] += 1
+
+            # 排名第一且曾经命中的选择器这次没有命中、靠后面的具体选择器才找到：DOM可能已改版
+            # （整条链都未命中或只有兜底选择器命中，通常只是页面上没有该字段，如未填写位置/简介，不算回落）
+            first = entries.get(tried[0]) if tried else None
+            is_fallback = hit in self._fallbacks.get(chain, ())
+            if hit and hit != tried[0] and not is_fallback and first and first['hits'] > 0:
+                self.fallthroughs[chain] = self.fallthroughs.get(chain, 0) + 1
+                metrics.selector_fallthrough(chain)
+                print(f"⚠️ 选择器链 {chain} 回落: {tried[0]} 未命中，改用 {hit}（页面结构可能已变化）")
+
+    def find(self, driver, chain, selectors, accept=None, keys=None, max_elements=None, fallbacks=()):
+        """
+        按学习到的顺序尝试选择器链，返回第一个被接受的结果
+
+        Args:
+            driver: selenium WebDriver（或用于在其内部查找的 WebElement）
+            chain (str): 选择器链名称
+            selectors (list): CSS选择器，按原有优先顺序
+            accept (callable): 对每个元素调用，返回真值即视为命中并作为结果返回；默认接受第一个元素
+            keys (list): 与 selectors 一一对应的统计键（选择器中含用户名等变化部分时传入模板）
+            max_elements (int): 每个选择器最多检查的元素数
+            fallbacks (iterable): 宽泛的兜底选择器（keys 中的值），不参与排序
+
+        Returns:
+            object or None: accept 的返回值（默认为元素），整条链都未命中时为None
+        """
+        keys = keys or selectors
+        by_key = dict(zip(keys, selectors))
+        tried = []
+        for key in self.ordered(chain, keys, fallbacks):
+            tried.append(key)
+            try:
+                elements = driver.find_elements(By.CSS_SELECTOR, by_key[key])
+            except Exception:
+                continue
+            for element in elements[:max_elements]:
+                try:
+                    value = accept(element) if accept else element
+                except Exception:
+                    value = None
+                if value:
+                    self.record(chain, tried, key)
+                    return value
+        self.record(chain, tried, None)
+        return None
+
+    def report(self):
+        """
+        各选择器链的摘要
+
+        Returns:
+            str: 每条链排名第一的选择器、命中率与回落次数
+        """
+        lines = []
+        with self._lock:
+            self._ensure_loaded()
+            for chain in sorted(self.stats):
+                entries = self.stats[chain]
+                fallbacks = self._fallbacks.get(chain, ())
+                ranked = [key for key in entries if key not in fallbacks] or list(entries)
+                best = max(ranked, key=lambda key: entries[key]['score'])
+                hits = sum(entry['hits'] for entry in entries.values())
+                misses = sum(entry['misses'] for entry in entries.values())
+                line = f"  {chain}: 首选 {best}（命中 {hits} 次，多余尝试 {misses} 次"
+                if self.fallthroughs.get(chain):
+                    line += f"，本次运行回落 {self.fallthroughs[chain]} 次"
+                lines.append(line + '）')
+        return '\n'.join(lines)
+
+    def save(self):
+        """写回统计文件"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._loaded:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+# 进程级默认注册表（导航与用户信息提取共用，批量运行结束时保存）
+selector_registry = SelectorRegistry()
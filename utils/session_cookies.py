@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+登录会话导出/导入模块
+从手动登录的调试Chrome（start_chrome.py，端口9222）导出 x.com 的 Cookie 与 localStorage，
+注入到 setup_driver() 创建的无头浏览器（或Chrome实例池中的实例），使额外的爬取进程无需再手动登录。
+分发前检查 auth_token / ct0 是否即将过期。
+
+注意：导出文件包含登录凭据，仅保存在本机（已加入 .gitignore），不要提交或分享。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+DEFAULT_SESSION_FILE = 'x_session.json'
+SESSION_DOMAINS = ('x.com', 'twitter.com')
+SESSION_ORIGIN = 'https://x.com'
+# 登录态必需的Cookie
+REQUIRED_COOKIES = ('auth_token', 'ct0')
+
+# Network.setCookies 接受的 CookieParam 字段
+_COOKIE_PARAM_KEYS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+
+def _is_session_domain(domain):
+    domain = (domain or '').lstrip('.')
+    return any(domain == d or domain.endswith('.' + d) for d in SESSION_DOMAINS)
+
+
+def export_session(driver, path=DEFAULT_SESSION_FILE):
+    """
+    导出当前浏览器的 x.com 登录会话
+
+    Args:
+        driver: 已登录的 WebDriver（通常为 connect_to_existing_chrome(9222)）
+        path (str): 输出文件
+
+    Returns:
+        dict: 会话数据（cookies / local_storage / user_agent）
+    """
+    cookies = driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+    session = {
+        'exported_at': datetime.now().isoformat(),
+        'user_agent': driver.execute_script('return navigator.userAgent'),
+        'cookies': [c for c in cookies if _is_session_domain(c.get('domain'))],
+        'local_storage': {},
+    }
+    # localStorage 按源隔离，只在当前页面位于 x.com 时读取（不打断用户正在使用的页面）
+    current = urlparse(driver.current_url)
+    if _is_session_domain(current.hostname):
+        origin = f"{current.scheme}://{current.hostname}"
+        session['local_storage'][origin] = driver.execute_script(
+            'var d = {}; for (var i = 0; i < localStorage.length; i++) {'
+            ' var k = localStorage.key(i); d[k] = localStorage.getItem(k); } return d;')
+    else:
+        print("⚠️ 当前页面不在 x.com，未导出 localStorage（仅导出Cookie）")
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(session, f, ensure_ascii=False, indent=2)
+    return session
+
+
+def load_session(path=DEFAULT_SESSION_FILE):
+    """读取导出的会话文件"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_session_expiry(session, min_valid_seconds=3600, now=None):
+    """
+    检查登录Cookie是否存在且在 min_valid_seconds 内不会过期
+
+    Args:
+        session (dict): 会话数据
+        min_valid_seconds (int): 至少还需有效的秒数
+        now (float): 当前时间戳（默认 time.time()）
+
+    Returns:
+        tuple: (是否可用, 说明)
+    """
+    now = time.time() if now is None else now
+    by_name = {c['name']: c for c in session.get('cookies', []) if _is_session_domain(c.get('domain'))}
+    missing = [name for name in REQUIRED_COOKIES if name not in by_name]
+    if missing:
+        return False, f"缺少登录Cookie: {', '.join(missing)}"
+    expiring = []
+    for name in REQUIRED_COOKIES:
+        expires = by_name[name].get('expires', -1)
+        # expires <= 0 表示会话Cookie（随浏览器关闭失效），导出后仍可使用
+        if expires and expires > 0 and expires - now < min_valid_seconds:
+            expiring.append(f"{name}（{datetime.fromtimestamp(expires):%Y-%m-%d %H:%M}）")
+    if expiring:
+        return False, f"登录Cookie即将或已经过期: {', '.join(expiring)}"
+    return True, "登录Cookie有效"
+
+
+def import_session(driver, session):
+    """
+    把会话注入到浏览器：设置UA与Cookie，再在 x.com 源下写入 localStorage
+
+    Args:
+        driver: 新建的 WebDriver（无头或实例池中的实例）
+        session (dict): 会话数据
+
+    Returns:
+        int: 注入的Cookie数
+    """
+    driver.execute_cdp_cmd('Network.enable', {})
+    user_agent = session.get('user_agent')
+    if user_agent:
+        # 与导出时的浏览器保持一致，避免无头UA触发风控
+        driver.execute_cdp_cmd('Network.setUserAgentOverride',
+                               {'userAgent': user_agent.replace('HeadlessChrome', 'Chrome')})
+    cookies = [{k: c[k] for k in _COOKIE_PARAM_KEYS if k in c} for c in session.get('cookies', [])]
+    for cookie in cookies:
+        # 会话Cookie不带 expires
+        if cookie.get('expires', -1) <= 0:
+            cookie.pop('expires', None)
+    driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+
+    for origin, items in (session.get('local_storage') or {}).items():
+        if not items:
+            continue
+        # localStorage 只能在同源页面中写入，robots.txt 是该源下最轻的页面
+        driver.get(f"{origin}/robots.txt")
+        driver.execute_script(
+            'var items = arguments[0]; for (var k in items) { localStorage.setItem(k, items[k]); }', items)
+    return len(cookies)
+
+
+def setup_session_driver(path=DEFAULT_SESSION_FILE, min_valid_seconds=3600, driver=None):
+    """
+    创建（或使用给定的）浏览器并注入登录会话；会话过期时不分发
+
+    Args:
+        path (str): 会话文件
+        min_valid_seconds (int): 登录Cookie至少还需有效的秒数
+        driver: 已有的 WebDriver（如实例池中的实例）；默认调用 setup_driver() 新建无头浏览器
+
+    Returns:
+        webdriver.Chrome or None: 已登录的浏览器驱动
+    """
+    try:
+        session = load_session(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法读取会话文件 {path}: {e}")
+        return None
+    ok, message = check_session_expiry(session, min_valid_seconds)
+    if not ok:
+        print(f"❌ {message}，请在调试Chrome中重新登录后再导出")
+        return None
+
+    if driver is None:
+        from utils.browser_utils import setup_driver
+        driver = setup_driver()
+        if not driver:
+            return None
+    try:
+        count = import_session(driver, session)
+        print(f"✅ 已注入登录会话（{count} 个Cookie）")
+        return driver
+    except Exception as e:
+        print(f"❌ 注入登录会话失败: {e}")
+        driver.quit()
+        return None
+
+
+def is_logged_in(driver, timeout=15):
+    """打开首页并检查是否处于登录状态（账户切换按钮存在）"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(f"{SESSION_ORIGIN}/home")
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located(
+            (By.CSS_SELECTOR, '[data-testid="SideNav_AccountSwitcher_Button"]')))
+        return True
+    except Exception:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出/检查/验证 x.com 登录会话')
+    sub = parser.add_subparsers(dest='command', required=True)
+    export_parser = sub.add_parser('export', help='从调试Chrome导出Cookie与localStorage')
+    export_parser.add_argument('--port', type=int, default=9222)
+    export_parser.add_argument('--output', default=DEFAULT_SESSION_FILE)
+    check_parser = sub.add_parser('check', help='检查登录Cookie是否即将过期')
+    check_parser.add_argument('session', nargs='?', default=DEFAULT_SESSION_FILE)
+    check_parser.add_argument('--min-valid-hours', type=float, default=1.0)
+    verify_parser = sub.add_parser('verify', help='在新的无头浏览器中注入会话并确认已登录')
+    verify_parser.add_argument('session', nargs='?', default=DEFAULT_SESSION_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        from utils.browser_utils import connect_to_existing_chrome
+        driver = connect_to_existing_chrome(args.port)
+        if not driver:
+            sys.exit(1)
+        session = export_session(driver, args.output)
+        ok, message = check_session_expiry(session)
+        print(f"📁 已导出 {len(session['cookies'])} 个Cookie到 {args.output}")
+        print(f"{'✅' if ok else '⚠️'} {message}")
+        sys.exit(0 if ok else 1)
+
+    if args.command == 'check':
+        ok, message = check_session_expiry(load_session(args.session), int(args.min_valid_hours * 3600))
+        print(f"{'✅' if ok else '❌'} {message}")
+        sys.exit(0 if ok else 1)
+
+    driver = setup_session_driver(args.session)
+    if not driver:
+        sys.exit(1)
+    try:
+        logged_in = is_logged_in(driver)
+        print("✅ 无头浏览器已处于登录状态" if logged_in else "❌ 注入后仍未登录")
+    finally:
+        driver.quit()
+    sys.exit(0 if logged_in else 1)
+
+
+if __name__ == "__main__":
+    main()
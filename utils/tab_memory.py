@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标签页内存治理模块
+长批次（上百个用户、每个用户上千次滚动）中同一个标签页的JS堆与DOM节点持续增长，滚动与提取随之变慢。
+通过 CDP Performance.getMetrics 在滚动过程中与用户之间采样 JSHeapUsedSize / Nodes：
+  - 滚动中超过阈值：触发一次垃圾回收（HeapProfiler.collectGarbage），不打断当前用户的时间线位置
+  - 用户之间超过阈值：导航到 about:blank 释放页面；仍然超标时关闭并重开标签页（换新的渲染进程）
+爬取在启动时打开的专用标签页中进行，回收只关闭爬取标签页，用户自己（已登录）的调试标签页始终保留。
+每次采样与回收写入JSONL历史，便于观察整批运行中的内存曲线。
+"""
+
+import json
+import threading
+import time
+
+from utils.crawl_metrics import metrics
+from utils.tracing import tracer
+
+
+def sample_page_memory(driver):
+    """
+    读取当前标签页的内存指标
+
+    Returns:
+        dict: js_heap_used / js_heap_total / nodes / documents / listeners
+    """
+    driver.execute_cdp_cmd('Performance.enable', {})
+    values = {m['name']: m['value'] for m in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+    return {
+        'js_heap_used': int(values.get('JSHeapUsedSize', 0)),
+        'js_heap_total': int(values.get('JSHeapTotalSize', 0)),
+        'nodes': int(values.get('Nodes', 0)),
+        'documents': int(values.get('Documents', 0)),
+        'listeners': int(values.get('JSEventListeners', 0)),
+    }
+
+
+class TabMemoryGovernor:
+    """按阈值回收标签页并记录内存历史"""
+
+    def __init__(self, driver, max_heap_mb=400, max_nodes=100000, scroll_sample_every=20,
+                 history_path=None):
+        """
+        Args:
+            driver: selenium WebDriver
+            max_heap_mb (float): JS堆（已用）阈值，MB
+            max_nodes (int): DOM节点数阈值
+            scroll_sample_every (int): 滚动中每隔多少次迭代采样一次
+            history_path (str): 内存历史JSONL文件（None 表示不写文件）
+        """
+        self.driver = driver
+        self.max_heap_bytes = int(max_heap_mb * 1024 * 1024)
+        self.max_nodes = max_nodes
+        self.scroll_sample_every = max(1, scroll_sample_every)
+        self.history_path = history_path
+        self.recycles = 0
+        self.gc_runs = 0
+        self.last_sample = None
+        self.home_handle = None
+        self.crawl_handle = None
+        self._lock = threading.Lock()
+        if history_path:
+            # 每次运行重新开始记录
+            open(history_path, 'w', encoding='utf-8').close()
+
+    def open_crawl_tab(self):
+        """
+        打开专用的爬取标签页并切换过去（启动时调用；当前标签页记为用户标签页，之后不再导航或关闭它）
+
+        Returns:
+            str: 爬取标签页句柄
+        """
+        if self.home_handle is None:
+            self.home_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        self.crawl_handle = self.driver.current_window_handle
+        return self.crawl_handle
+
+    def over_threshold(self, sample):
+        """是否超过任一阈值"""
+        return sample['js_heap_used'] > self.max_heap_bytes or sample['nodes'] > self.max_nodes
+
+    def sample(self, phase, user=None, **fields):
+        """
+        采样并记录一次内存
+
+        Args:
+            phase (str): scroll / between_users / after_recycle ...
+            user (str): 当前用户
+
+        Returns:
+            dict or None: 采样结果（读取失败时为None）
+        """
+        try:
+            sample = sample_page_memory(self.driver)
+        except Exception as e:
+            self._write({'phase': phase, 'user': user, 'error': str(e)})
+            return None
+        self.last_sample = sample
+        metrics.set_page_memory(sample['js_heap_used'], sample['nodes'])
+        self._write({'phase': phase, 'user': user, **fields, **sample})
+        return sample
+
+    def on_scroll(self, attempt, user=None):
+        """
+        滚动迭代中调用：按间隔采样，超过阈值时强制垃圾回收（不离开当前页面）
+
+        Args:
+            attempt (int): 当前用户的滚动次数
+            user (str): 当前用户（默认取追踪上下文中的用户）
+        """
+        if attempt % self.scroll_sample_every:
+            return
+        user = user or tracer.context.get('user')
+        sample = self.sample('scroll', user, attempt=attempt)
+        if sample and self.over_threshold(sample):
+            try:
+                self.driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+                self.gc_runs += 1
+                self.sample('after_gc', user, attempt=attempt)
+            except Exception as e:
+                self._write({'phase': 'gc_failed', 'user': user, 'error': str(e)})
+
+    def between_users(self, user=None):
+        """
+        用户之间调用：超过阈值时回收标签页
+
+        Returns:
+            str or None: 回收方式（blank / new_tab），未回收为None
+        """
+        sample = self.sample('between_users', user)
+        if not sample or not self.over_threshold(sample):
+            return None
+        return self.recycle(user)
+
+    def recycle(self, user=None):
+        """
+        回收标签页：先导航到 about:blank，仍超标则关闭并重开标签页（只关闭爬取标签页）
+
+        Returns:
+            str: 实际使用的回收方式
+        """
+        old_handle = self.driver.current_window_handle
+        if self.home_handle is None or old_handle == self.home_handle:
+            # 仍在用户自己的标签页上：不导航也不关闭它，改用新的爬取标签页
+            self.open_crawl_tab()
+            method = 'new_tab'
+            self.sample('after_new_tab', user)
+        else:
+            self.driver.get('about:blank')
+            method = 'blank'
+            after = self.sample('after_blank', user)
+            if after is None or self.over_threshold(after):
+                # 看门狗恢复后爬取标签页可能已换成新的，这里以当前标签页为准
+                new_handle = self.open_crawl_tab()
+                self.driver.switch_to.window(old_handle)
+                self.driver.close()
+                self.driver.switch_to.window(new_handle)
+                method = 'new_tab'
+                self.sample('after_new_tab', user)
+        self.recycles += 1
+        metrics.tab_recycled(method)
+        print(f"♻️ 标签页内存超过阈值，已回收（{method}）")
+        return method
+
+    def _write(self, record):
+        if not self.history_path:
+            return
+        record = {'ts': round(time.time(), 3), **record}
+        with self._lock:
+            with open(self.history_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
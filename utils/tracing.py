@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阶段级耗时追踪模块
+记录导航、用户信息、滚动迭代、等待、结果写入等阶段的时间区间（span），
+导出为 Chrome trace-event JSON，可直接在 chrome://tracing 或 Perfetto 中打开。
+未启用时 span 为空操作，不影响正常爬取。
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Tracer:
+    """时间区间记录器（trace-event 'X' 完整事件）"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.context = {}
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def enable(self):
+        """开始记录"""
+        self.enabled = True
+
+    @property
+    def active(self):
+        """是否需要进入span（记录事件或有监听器）"""
+        return self.enabled or bool(self.listeners)
+
+    def add_listener(self, listener):
+        """
+        注册span监听器（如按阶段切换的性能剖析），未启用记录时也会收到回调
+
+        Args:
+            listener: 实现 span_started(name, cat) 与 span_finished(name, cat) 的对象
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """移除span监听器"""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def set_context(self, **kwargs):
+        """设置附加到之后所有span的参数（如当前用户），值为None时移除"""
+        for key, value in kwargs.items():
+            if value is None:
+                self.context.pop(key, None)
+            else:
+                self.context[key] = value
+
+    @contextmanager
+    def span(self, name, cat='crawl', **args):
+        """
+        记录一个时间区间
+
+        Args:
+            name (str): 区间名
+            cat (str): 分类（trace查看器中可按分类筛选）
+            **args: 附加参数
+        """
+        if not self.active:
+            yield
+            return
+        listeners = list(self.listeners)
+        for listener in listeners:
+            listener.span_started(name, cat)
+        start_us = time.perf_counter_ns() // 1000
+        try:
+            yield
+        finally:
+            end_us = time.perf_counter_ns() // 1000
+            for listener in reversed(listeners):
+                listener.span_finished(name, cat)
+            if self.enabled:
+                event = {
+                    'name': name,
+                    'cat': cat,
+                    'ph': 'X',
+                    'ts': start_us,
+                    'dur': end_us - start_us,
+                    'pid': self._pid,
+                    'tid': threading.get_ident(),
+                    'args': {**self.context, **args},
+                }
+                with self._lock:
+                    self.events.append(event)
+
+    def export(self, path):
+        """
+        导出为 Chrome trace-event JSON
+
+        Args:
+            path (str): 输出文件路径
+
+        Returns:
+            int: 写出的事件数
+        """
+        with self._lock:
+            events = list(self.events)
+        metadata = [
+            {'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': 'twitter crawl'}},
+        ]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return len(events)
+
+
+# 进程级默认追踪器
+tracer = Tracer()
+
+
+def span(name, cat='crawl', **args):
+    """在默认追踪器上记录一个时间区间（未启用时为空操作）"""
+    return tracer.span(name, cat, **args)
+
+
+def traced(name=None, cat='crawl'):
+    """
+    装饰器：把整个函数调用记录为一个时间区间
+
+    Args:
+        name (str): 区间名，默认使用 类名.函数名
+        cat (str): 分类
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.active:
+                return func(*args, **kwargs)
+            with tracer.span(span_name, cat):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
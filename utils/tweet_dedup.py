@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文去重模块
+原先以完整的 (正文, 是否转发) 元组作为唯一键：编辑过的推文、“显示更多”截断不同的同一推文会重复收录，
+而正文相同的两条不同推文会被合并。这里改为：
+  - 有状态ID时以 (状态ID, 是否转发) 为键；没有时退回规范化正文的 blake2b 64位哈希（固定大小）
+  - 可选的 SimHash 近重复检测：同一用户时间线内，或整批用户之间（有容量上限，超出后淘汰最早的指纹）
+SimHash 指纹（64位）按 最大海明距离+1 段建桶：距离不超过阈值的两个指纹至少有一段完全相同，查找只比较同桶候选。
+"""
+
+import hashlib
+import re
+from collections import deque
+
+from utils.tracing import tracer
+
+_URL_RE = re.compile(r'https?://\S+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_SPACE_RE = re.compile(r'\s+')
+
+SIMHASH_BITS = 64
+
+
+def normalize_text(text):
+    """规范化正文：去掉链接（t.co短链每次不同）、“显示更多”、标点与多余空白，转小写"""
+    text = _URL_RE.sub('', text or '')
+    text = text.replace('Show more', '').replace('显示更多', '')
+    text = _PUNCT_RE.sub('', text)
+    return _SPACE_RE.sub(' ', text).strip().lower()
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def content_hash(text):
+    """规范化正文的64位 blake2b 哈希"""
+    return _hash64(normalize_text(text))
+
+
+def simhash(text, shingle=4):
+    """
+    计算正文的64位 SimHash（字符 shingle 作为特征，中日文与英文都适用）
+
+    Returns:
+        int or None: 指纹；正文过短时为None（短文本近重复判断不可靠）
+    """
+    text = normalize_text(text)
+    if len(text) < shingle * 2:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for i in range(len(text) - shingle + 1):
+        feature = _hash64(text[i:i + shingle])
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if feature >> bit & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+class NearDuplicateIndex:
+    """有容量上限的 SimHash 近重复索引"""
+
+    def __init__(self, max_distance=6, capacity=100000):
+        """
+        Args:
+            max_distance (int): 视为近重复的最大海明距离
+            capacity (int): 最多保留的指纹数，超出后淘汰最早加入的
+        """
+        self.max_distance = max_distance
+        self.capacity = capacity
+        # 分段：段数 = 最大距离+1，每段 (起始位, 掩码)，最后一段包含余下的位
+        bands = max_distance + 1
+        width = SIMHASH_BITS // bands
+        self._bands = [(i * width, (1 << (width if i < bands - 1 else SIMHASH_BITS - i * width)) - 1)
+                       for i in range(bands)]
+        self._buckets = {}
+        self._order = deque()
+
+    def __len__(self):
+        return len(self._order)
+
+    def find(self, fingerprint, is_retweet=False, exclude_owner=None):
+        """
+        查找近重复
+
+        Args:
+            fingerprint (int): SimHash 指纹
+            is_retweet (bool): 只与同类（原创/转发）比较
+            exclude_owner (str): 忽略该所有者自己的指纹（如重访同一用户）
+
+        Returns:
+            str or None: 近重复指纹的所有者，没有时为None
+        """
+        for key in self._band_keys(fingerprint):
+            for other, other_retweet, owner in self._buckets.get(key, ()):
+                if other_retweet != is_retweet or (exclude_owner and owner == exclude_owner):
+                    continue
+                if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return owner or ''
+        return None
+
+    def add(self, fingerprint, is_retweet=False, owner=None):
+        """加入指纹，超出容量时淘汰最早的"""
+        entry = (fingerprint, is_retweet, owner)
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, []).append(entry)
+        self._order.append(entry)
+        while len(self._order) > self.capacity:
+            self._evict(self._order.popleft())
+
+    def _band_keys(self, fingerprint):
+        return [(shift, fingerprint >> shift & mask) for shift, mask in self._bands]
+
+    def _evict(self, entry):
+        for key in self._band_keys(entry[0]):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.remove(entry)
+                if not bucket:
+                    del self._buckets[key]
+
+
+class TweetDeduper:
+    """单个用户一次获取过程中的去重"""
+
+    def __init__(self, near_duplicates=False, batch_index=None, max_distance=6, owner=None):
+        """
+        Args:
+            near_duplicates (bool): 是否在该用户时间线内做近重复检测
+            batch_index (NearDuplicateIndex): 整批共享的近重复索引，None 表示不做跨用户检测
+            max_distance (int): 用户内近重复的最大海明距离
+            owner (str): 当前用户（默认取追踪上下文中的用户），跨用户检测时忽略其自身的指纹
+        """
+        self._seen = set()
+        self._user_index = NearDuplicateIndex(max_distance) if near_duplicates else None
+        self._batch_index = batch_index
+        self.owner = owner or tracer.context.get('user')
+        self.skipped = {}
+
+    def keys(self, tweet):
+        """
+        去重键：(状态ID, 是否转发) 与 (正文哈希, 是否转发)，原创与转发可共存
+
+        Returns:
+            tuple: (状态ID键或None, 正文哈希键)
+        """
+        is_retweet = bool(tweet.get('is_retweet', False))
+        status_id = tweet.get('status_id')
+        hash_key = ('hash', content_hash(tweet.get('text', '')), is_retweet)
+        return (('id', int(status_id), is_retweet) if status_id else None), hash_key
+
+    def check_and_add(self, tweet):
+        """
+        判断推文是否重复，不重复时登记
+
+        有状态ID时只按ID判断（同文本的不同推文各自保留）；没有时按正文哈希与已登记的全部推文比较
+
+        Returns:
+            str or None: 重复原因（status_id / content_hash / near_duplicate / batch_near_duplicate），新推文为None
+        """
+        id_key, hash_key = self.keys(tweet)
+        is_retweet = hash_key[2]
+        reason = None
+        fingerprint = None
+        if id_key is not None and id_key in self._seen:
+            reason = 'status_id'
+        elif id_key is None and hash_key in self._seen:
+            reason = 'content_hash'
+        elif self._user_index is not None or self._batch_index is not None:
+            fingerprint = simhash(tweet.get('text', ''))
+            if fingerprint is not None:
+                if self._user_index is not None and self._user_index.find(fingerprint, is_retweet) is not None:
+                    reason = 'near_duplicate'
+                elif (self._batch_index is not None
+                      and self._batch_index.find(fingerprint, is_retweet, exclude_owner=self.owner) is not None):
+                    reason = 'batch_near_duplicate'
+
+        if reason:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+            return reason
+        if id_key is not None:
+            self._seen.add(id_key)
+        self._seen.add(hash_key)
+        if fingerprint is not None:
+            if self._user_index is not None:
+                self._user_index.add(fingerprint, is_retweet)
+            if self._batch_index is not None:
+                self._batch_index.add(fingerprint, is_retweet, self.owner)
+        return None
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver 看门狗模块
+Selenium 默认没有命令超时，一个卡住的 .text / find_elements 就能让整批任务无声地停住。
+  - 命令超时：给 HTTP 连接、页面加载与脚本执行设置超时
+  - 卡死检测：后台线程监视正在执行的命令，超时未返回时视为渲染进程卡死，
+    通过 DevTools HTTP 接口（/json/close）关闭该标签页，使阻塞的命令立即出错返回
+  - 用户截止时间：TweetExtractor 在终止条件中协作检查；超过截止时间仍未结束时后续命令直接中止
+  - 恢复：关闭卡死的标签页并新开标签页，必要时重新连接浏览器；由调用方把该用户重新排队
+
+发生故障后，后续命令抛出 WatchdogAbort（继承 BaseException，与 asyncio.CancelledError 相同），
+不会被提取代码中的 `except Exception` 吞掉，而是直接回到批量循环中处理。
+"""
+
+import json
+import threading
+import time
+import urllib.request
+
+import urllib3
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+
+class WatchdogAbort(BaseException):
+    """看门狗判定当前用户已无法继续（命令超时、渲染卡死、超过截止时间）"""
+
+
+def set_command_timeout(driver, seconds):
+    """
+    设置WebDriver命令超时
+
+    Args:
+        driver: selenium WebDriver
+        seconds (float): 页面加载与脚本的超时；HTTP读取超时比它多10秒，让浏览器侧的超时先生效
+    """
+    # RemoteConnection 的超时是类级别设置，已建立的连接池需要重建才会生效
+    RemoteConnection.set_timeout(seconds + 10)
+    executor = driver.command_executor
+    if hasattr(executor, '_conn'):
+        executor._conn = executor._get_connection_manager()
+    driver.set_page_load_timeout(seconds)
+    driver.set_script_timeout(seconds)
+
+
+def _devtools_request(port, path, method='GET', timeout=5):
+    """调用 DevTools HTTP 接口（浏览器进程直接响应，渲染进程卡死时仍可用）"""
+    request = urllib.request.Request(f'http://127.0.0.1:{port}{path}', method=method)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read().decode('utf-8')
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body
+
+
+def _target_id(window_handle):
+    """chromedriver 的窗口句柄即 DevTools target id（旧版带 CDwindow- 前缀）"""
+    return (window_handle or '').replace('CDwindow-', '')
+
+
+class CrawlWatchdog:
+    """命令超时、卡死检测与恢复"""
+
+    def __init__(self, debug_port=9222, command_timeout=60, user_deadline=900, poll_interval=1.0):
+        """
+        Args:
+            debug_port (int): Chrome调试端口（用于 /json/close、/json/new）
+            command_timeout (float): 单条命令超时（秒）
+            user_deadline (float): 单个用户的截止时间（秒），0 表示不限
+            poll_interval (float): 后台检查间隔（秒）
+        """
+        self.debug_port = debug_port
+        self.command_timeout = command_timeout
+        self.user_deadline = user_deadline
+        self.poll_interval = poll_interval
+        self.incidents = []
+        self._incident = None
+        self._in_flight = None
+        self._username = None
+        self._deadline = None
+        self._target_id = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def install(self, driver):
+        """
+        在driver上启用命令超时与监视（重新连接后对新driver再次调用）
+
+        Args:
+            driver: selenium WebDriver
+        """
+        set_command_timeout(driver, self.command_timeout)
+        if not getattr(driver, '_crawl_watchdog', None):
+            original_execute = driver.execute
+
+            def guarded_execute(driver_command, params=None):
+                if self._incident:
+                    raise WatchdogAbort(self._incident['reason'])
+                with self._lock:
+                    self._in_flight = (driver_command, time.monotonic())
+                try:
+                    return original_execute(driver_command, params)
+                except urllib3.exceptions.HTTPError as e:
+                    reason = 'command_timeout' if isinstance(e, urllib3.exceptions.TimeoutError) else 'driver_lost'
+                    self._flag(reason, driver_command)
+                    raise WatchdogAbort(reason) from e
+                except Exception as e:
+                    # 卡死的标签页被看门狗关闭后，阻塞中的命令以错误返回
+                    if self._incident:
+                        raise WatchdogAbort(self._incident['reason']) from e
+                    raise
+                finally:
+                    with self._lock:
+                        self._in_flight = None
+
+            driver.execute = guarded_execute
+            driver._crawl_watchdog = self
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._monitor, name='crawl-watchdog', daemon=True)
+            self._thread.start()
+
+    def begin_user(self, driver, username):
+        """开始一个用户：记录截止时间与当前标签页"""
+        self._incident = None
+        self._username = username
+        self._deadline = time.monotonic() + self.user_deadline if self.user_deadline else None
+        try:
+            self._target_id = _target_id(driver.current_window_handle)
+        except Exception:
+            self._target_id = None
+
+    def end_user(self):
+        """
+        结束当前用户
+
+        Returns:
+            dict or None: 本用户期间发生的故障（reason / command / user）
+        """
+        self._username = None
+        self._deadline = None
+        return self._incident
+
+    def expired(self):
+        """当前用户是否已超过截止时间（供终止条件协作检查）"""
+        return self._deadline is not None and time.monotonic() > self._deadline
+
+    def recover(self, driver):
+        """
+        故障后恢复：关闭卡死的标签页并切换到新标签页；浏览器连接失效时重新连接
+
+        Args:
+            driver: 当前 WebDriver
+
+        Returns:
+            WebDriver or None: 可继续使用的driver（可能是新连接），无法恢复时为None
+        """
+        incident, self._incident = self._incident, None
+        reason = incident['reason'] if incident else None
+        if reason != 'driver_lost':
+            try:
+                self._close_target(self._target_id)
+                new_target = _devtools_request(self.debug_port, '/json/new?about:blank', method='PUT')
+                handle = next(h for h in driver.window_handles if _target_id(h) == new_target['id'])
+                driver.switch_to.window(handle)
+                driver.execute_script('return 1')
+                print(f"🔁 已关闭卡住的标签页并切换到新标签页（{reason}）")
+                return driver
+            except (Exception, WatchdogAbort) as e:
+                self._incident = None
+                print(f"⚠️ 切换标签页失败（{e}），尝试重新连接浏览器...")
+
+        from utils.browser_utils import connect_to_existing_chrome
+        new_driver = connect_to_existing_chrome(self.debug_port)
+        if new_driver:
+            self.install(new_driver)
+        return new_driver
+
+    def close(self):
+        """停止后台线程"""
+        self._stop_event.set()
+
+    def _flag(self, reason, command=None):
+        with self._lock:
+            if self._incident is None:
+                self._incident = {'reason': reason, 'command': command, 'user': self._username,
+                                  'at': time.time()}
+                self.incidents.append(self._incident)
+                print(f"⏰ 看门狗: @{self._username} {reason}（{command}）")
+
+    def _close_target(self, target_id):
+        if not target_id:
+            return
+        try:
+            _devtools_request(self.debug_port, f'/json/close/{target_id}')
+        except Exception:
+            # 标签页可能已经不存在
+            pass
+
+    def _monitor(self):
+        while not self._stop_event.wait(self.poll_interval):
+            now = time.monotonic()
+            with self._lock:
+                in_flight = self._in_flight
+            if self._incident:
+                continue
+            if in_flight and now - in_flight[1] > self.command_timeout + 15:
+                # HTTP超时也没能让命令返回：视为渲染进程卡死，关闭标签页使命令出错返回
+                self._flag('renderer_hang', in_flight[0])
+                self._close_target(self._target_id)
+            elif self._deadline is not None and now > self._deadline + self.command_timeout:
+                # 超过截止时间且终止条件没有生效（如正在逐条提取大量元素），后续命令直接中止
+                self._flag('user_deadline', in_flight[0] if in_flight else None)
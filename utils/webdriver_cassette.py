@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver 录制/回放模块
+录制：包装 driver.command_executor.execute，把真实爬取时发往 chromedriver 的每条命令
+（命令名 + 参数）及其原始响应按用户分段保存为 cassette 文件（.json / .json.gz / .json.zst）。
+回放：ReplayDriver 是不连接浏览器的 WebDriver，按 (命令, 参数) 先进先出地返回录制的响应，
+WebElement、异常等仍由 selenium 正常构造。这样提取逻辑（去重、日期解析、互动数分配、终止条件）
+可以在没有浏览器和网络的机器上确定性地运行，用于基准测试与回归比对。
+
+注意：回放要求被测代码发出的命令是录制时命令的子集；新增的命令（如新的页面脚本）需要重新录制。
+"""
+
+import json
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from utils.result_reader import open_result_file
+
+CASSETTE_VERSION = 1
+
+
+def _request_key(command, params):
+    """(命令, 参数) 的规范化键；sessionId 在录制与回放时不同，不参与匹配"""
+    params = {k: v for k, v in (params or {}).items() if k != 'sessionId'}
+    return command + '\n' + json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class CassetteMiss(Exception):
+    """回放时遇到未录制（或已用完）的命令"""
+
+
+class CassetteRecorder:
+    """录制器：记录 command_executor 层的命令与原始响应"""
+
+    def __init__(self):
+        self.interactions = []
+        self.users = []
+        self.meta = {'recorded_at': datetime.now().isoformat()}
+        self._current_user = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def install(cls, driver, recorder=None):
+        """
+        在driver上开始录制
+
+        Args:
+            driver: selenium WebDriver
+            recorder (CassetteRecorder): 沿用的录制器（重新连接浏览器后继续录制到同一卡带），默认新建
+
+        Returns:
+            CassetteRecorder: 录制器
+        """
+        recorder = recorder or cls()
+        executor = driver.command_executor
+        original_execute = executor.execute
+
+        def recording_execute(command, params=None):
+            response = original_execute(command, params)
+            with recorder._lock:
+                recorder.interactions.append({
+                    'command': command,
+                    'params': {k: v for k, v in (params or {}).items() if k != 'sessionId'},
+                    # WebDriver.execute 随后会把 value 原地替换为 WebElement，这里保存原始响应的副本
+                    'response': dict(response) if isinstance(response, dict) else response,
+                })
+            return response
+
+        executor.execute = recording_execute
+        return recorder
+
+    def begin_user(self, username, max_tweets):
+        """开始一个用户的分段"""
+        with self._lock:
+            self._current_user = {'username': username, 'max_tweets': max_tweets,
+                                  'started_at': datetime.now().isoformat(),
+                                  'start': len(self.interactions)}
+
+    def end_user(self, result=None):
+        """
+        结束当前用户的分段
+
+        Args:
+            result (dict): search_user_and_get_tweets 的返回值，用于记录推文数与终止原因
+        """
+        with self._lock:
+            if self._current_user is None:
+                return
+            segment = self._current_user
+            segment['end'] = len(self.interactions)
+            if isinstance(result, dict):
+                segment['tweets_count'] = result.get('tweets_count')
+                segment['stop_reason'] = result.get('stop_reason')
+            self.users.append(segment)
+            self._current_user = None
+
+    def save(self, path):
+        """
+        保存cassette（按扩展名压缩）
+
+        Returns:
+            int: 命令条数
+        """
+        with self._lock:
+            data = {
+                'version': CASSETTE_VERSION,
+                'meta': dict(self.meta),
+                'users': list(self.users),
+                'interactions': list(self.interactions),
+            }
+        with open_result_file(path, 'w') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        return len(data['interactions'])
+
+
+def load_cassette(path):
+    """读取cassette文件"""
+    with open_result_file(path) as f:
+        data = json.load(f)
+    if data.get('version') != CASSETTE_VERSION:
+        raise ValueError(f"不支持的cassette版本: {data.get('version')}")
+    return data
+
+
+class ReplayExecutor:
+    """按 (命令, 参数) 先进先出返回录制响应的 command_executor"""
+
+    def __init__(self, interactions, strict=True):
+        self.strict = strict
+        self.misses = 0
+        self.served = 0
+        self._queues = defaultdict(deque)
+        self.load(interactions)
+
+    def load(self, interactions):
+        """替换可回放的命令（通常为某个用户的分段）"""
+        self._queues.clear()
+        for item in interactions:
+            self._queues[_request_key(item['command'], item['params'])].append(item['response'])
+
+    def remaining(self):
+        """尚未被回放的命令数"""
+        return sum(len(q) for q in self._queues.values())
+
+    def execute(self, command, params=None):
+        if command == Command.NEW_SESSION:
+            return {'value': {'sessionId': 'replay', 'capabilities': {'browserName': 'chrome'}}}
+        if command == Command.QUIT:
+            return {'value': None}
+        queue = self._queues.get(_request_key(command, params))
+        if queue:
+            self.served += 1
+            # 返回副本：WebDriver.execute 会原地改写响应，重复回放时录制数据需保持原样
+            return dict(queue.popleft())
+        self.misses += 1
+        if self.strict:
+            raise CassetteMiss(f"未录制的命令: {command} {json.dumps(params, ensure_ascii=False, default=str)[:200]}")
+        return {'value': None}
+
+
+class ReplayDriver(WebDriver):
+    """不连接浏览器的回放WebDriver"""
+
+    def __init__(self, cassette, strict=True):
+        """
+        Args:
+            cassette (dict): load_cassette 的结果
+            strict (bool): 遇到未录制命令时抛出 CassetteMiss（否则返回空值）
+        """
+        self.cassette = cassette
+        super().__init__(command_executor=ReplayExecutor([], strict), options=Options())
+
+    def use_user(self, index):
+        """
+        切换到第 index 个用户的录制分段
+
+        Returns:
+            dict: 该用户的分段信息（username / max_tweets / tweets_count / stop_reason）
+        """
+        segment = self.cassette['users'][index]
+        self.command_executor.load(self.cassette['interactions'][segment['start']:segment['end']])
+        return segment
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        """与 ChromiumDriver 相同的CDP命令接口（同样从录制中回放）"""
+        return self.execute('executeCdpCommand', {'cmd': cmd, 'params': cmd_args})['value']